@@ -0,0 +1,5 @@
+# makes the tik_manager package importable when the tests are run from anywhere
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
@@ -0,0 +1,146 @@
+import os
+import errno
+import shutil
+import tempfile
+import unittest
+
+from tik_manager import copyEngine
+
+CHUNK = 1024 * 1024
+
+
+class CopyChunksTest(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.source = os.path.join(self.tempDir, "source.bin")
+        self.target = os.path.join(self.tempDir, "target.bin")
+        with open(self.source, "wb") as f:
+            f.write(os.urandom(3 * CHUNK))
+        self._copyFileRange = getattr(os, "copy_file_range", None)
+
+    def tearDown(self):
+        if self._copyFileRange:
+            os.copy_file_range = self._copyFileRange
+        shutil.rmtree(self.tempDir)
+
+    def _copy(self):
+        with open(self.source, "rb") as sourceFile, open(self.target, "wb") as targetFile:
+            return sum(copyEngine.copyChunks(sourceFile, targetFile, bufferSize=CHUNK))
+
+    def _assertSame(self, copied):
+        with open(self.source, "rb") as a, open(self.target, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+        self.assertEqual(copied, os.path.getsize(self.source))
+
+    def _patchCopyFileRange(self, failAfter, error=None, result=None):
+        calls = []
+        original = self._copyFileRange
+
+        def fake(src, dst, count, offsetSrc=None, offsetDst=None):
+            calls.append(offsetSrc)
+            if len(calls) > failAfter:
+                if error:
+                    raise OSError(error, os.strerror(error))
+                return result
+            return original(src, dst, count, offsetSrc, offsetDst)
+        os.copy_file_range = fake
+
+    def test_plainCopy(self):
+        self._assertSame(self._copy())
+
+    @unittest.skipUnless(hasattr(os, "copy_file_range"), "needs copy_file_range")
+    def test_fallbackAfterPartialKernelCopy(self):
+        self._patchCopyFileRange(1, error=errno.EXDEV)
+        self._assertSame(self._copy())
+
+    @unittest.skipUnless(hasattr(os, "copy_file_range"), "needs copy_file_range")
+    def test_zeroAtStartFallsBack(self):
+        self._patchCopyFileRange(0, result=0)
+        self._assertSame(self._copy())
+
+    @unittest.skipUnless(hasattr(os, "copy_file_range"), "needs copy_file_range")
+    def test_ioErrorPropagates(self):
+        self._patchCopyFileRange(1, error=errno.EIO)
+        with self.assertRaises(OSError):
+            self._copy()
+
+    def test_hashedCopy(self):
+        hasher = copyEngine.hashlib.new(copyEngine.HASH_NAME)
+        with open(self.source, "rb") as sourceFile, open(self.target, "wb") as targetFile:
+            copied = sum(copyEngine.copyChunks(sourceFile, targetFile, bufferSize=CHUNK, hasher=hasher))
+        self._assertSame(copied)
+        self.assertEqual(hasher.hexdigest(), copyEngine.fileDigest(self.source))
+
+
+class CopyEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.source = os.path.join(self.tempDir, "source.bin")
+        with open(self.source, "wb") as f:
+            f.write(os.urandom(CHUNK))
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def test_copyAndSkip(self):
+        destination = os.path.join(self.tempDir, "out", "source.bin")
+        for expected in (copyEngine.COPIED, copyEngine.SKIPPED):
+            engine = copyEngine.CopyEngine(workers=1)
+            job = engine.addJob(self.source, destination)
+            engine.run()
+            self.assertEqual(job.status, expected)
+        self.assertEqual(os.path.getsize(destination), CHUNK)
+
+    def test_shortCopyFails(self):
+        destination = os.path.join(self.tempDir, "short.bin")
+        engine = copyEngine.CopyEngine(workers=1)
+        job = engine.addJob(self.source, destination)
+        # file shrinks after it is added
+        with open(self.source, "wb") as f:
+            f.write(b"x" * 10)
+        engine.run()
+        self.assertEqual(job.status, copyEngine.FAILED)
+        self.assertFalse(os.path.exists(destination))
+        self.assertFalse(os.path.exists(destination + ".part"))
+
+    def test_cancelledVerifyCompletesProgress(self):
+        engine = copyEngine.CopyEngine(workers=1, bufferSize=CHUNK // 4, hashName=copyEngine.HASH_NAME,
+                                       verify=True)
+        job = engine.addJob(self.source, self.source, expectedDigest=copyEngine.fileDigest(self.source))
+        addBytes = engine._addBytes
+
+        def cancelAfterFirstChunk(job, count):
+            addBytes(job, count)
+            engine.cancel()
+        engine._addBytes = cancelAfterFirstChunk
+        engine.run()
+        self.assertEqual(job.status, copyEngine.CANCELLED)
+        progress = engine.progress()
+        self.assertEqual(progress["bytesDone"], progress["bytesTotal"])
+
+
+class WorkerCountTest(unittest.TestCase):
+    def setUp(self):
+        self._isNetworkPath = copyEngine.isNetworkPath
+
+    def tearDown(self):
+        copyEngine.isNetworkPath = self._isNetworkPath
+
+    def test_localDestination(self):
+        copyEngine.isNetworkPath = lambda path: False
+        self.assertEqual(copyEngine.workerCount("/local/folder", 8), 1)
+
+    def test_networkOrUnknownDestination(self):
+        for answer in (True, None):
+            copyEngine.isNetworkPath = lambda path: answer
+            self.assertEqual(copyEngine.workerCount("/share/folder", 8), 8)
+
+    def test_missingFolderUsesParent(self):
+        if not os.path.isfile("/proc/mounts"):
+            self.skipTest("no /proc/mounts")
+        missing = os.path.join(tempfile.gettempdir(), "missing", "folder")
+        self.assertEqual(copyEngine.isNetworkPath(missing), copyEngine.isNetworkPath(tempfile.gettempdir()))
+
+
+if __name__ == "__main__":
+    unittest.main()
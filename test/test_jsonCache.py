@@ -0,0 +1,73 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+from tik_manager.SmRoot import JsonCache, RootManager
+from tik_manager.sqliteCache import RACY_WINDOW
+
+PAST = time.time() - 10 * RACY_WINDOW
+
+
+class JsonCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.manager = RootManager.__new__(RootManager)
+        self.manager._jsonCache = JsonCache(maxEntries=2)
+        self.manager._sceneIndex = None
+        self.manager._userSettings = {}
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def _write(self, name, data, mtime=PAST):
+        filePath = os.path.join(self.tempDir, name)
+        with open(filePath, "w") as f:
+            json.dump(data, f)
+        if mtime is not None:
+            os.utime(filePath, (mtime, mtime))
+        return filePath
+
+    def test_hitReturnsFreshCopy(self):
+        filePath = self._write("a.json", {"Versions": []})
+        first = self.manager._loadJson(filePath)
+        first["Versions"].append("modified by the caller")
+        self.assertEqual(self.manager._loadJson(filePath), {"Versions": []})
+        self.assertEqual(self.manager.getJsonCacheStats()["hits"], 1)
+
+    def test_changedFileIsReadAgain(self):
+        filePath = self._write("a.json", {"Name": "a"})
+        self.manager._loadJson(filePath)
+        self._write("a.json", {"Name": "changed"}, mtime=PAST + 1)
+        self.assertEqual(self.manager._loadJson(filePath), {"Name": "changed"})
+
+    def test_dumpDiscards(self):
+        filePath = self._write("a.json", {"Name": "a"})
+        self.manager._loadJson(filePath)
+        self.manager._dumpJson({"Name": "b"}, filePath)
+        self.assertEqual(self.manager._loadJson(filePath), {"Name": "b"})
+
+    def test_racyFileIsNotCached(self):
+        now = time.time()
+        filePath = self._write("a.json", {"Name": "a"}, mtime=now)
+        self.manager._loadJson(filePath)
+        # same size and the same timestamp
+        self._write("a.json", {"Name": "b"}, mtime=now)
+        self.assertEqual(self.manager._loadJson(filePath), {"Name": "b"})
+
+    def test_leastRecentlyUsedIsEvicted(self):
+        files = [self._write("%s.json" % name, {"Name": name}) for name in "abc"]
+        self.manager._loadJson(files[0])
+        self.manager._loadJson(files[1])
+        self.manager._loadJson(files[0])
+        self.manager._loadJson(files[2])
+        cache = self.manager._jsonCache
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertIsNone(cache.get(files[1], os.stat(files[1])))
+        self.assertIsNotNone(cache.get(files[0], os.stat(files[0])))
+
+
+if __name__ == "__main__":
+    unittest.main()
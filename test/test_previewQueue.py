@@ -0,0 +1,66 @@
+import os
+import json
+import time
+import sys
+import shutil
+import tempfile
+import unittest
+
+from tik_manager import previewQueue
+
+
+class ResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.queueDir = tempfile.mkdtemp()
+        self.queue = previewQueue.PreviewQueue(self.queueDir)
+        self.converted = []
+
+    def tearDown(self):
+        shutil.rmtree(self.queueDir)
+
+    def _writeJob(self, jobId, job):
+        # left from a closed session
+        jobFile = os.path.join(self.queueDir, "%s.1.job" % jobId)
+        with open(jobFile, "w") as f:
+            json.dump(job, f)
+        past = time.time() - previewQueue.STALE_AGE - 1
+        os.utime(jobFile, (past, past))
+        return jobFile
+
+    def _wait(self):
+        for _ in range(100):
+            if not self.queue.pending():
+                return
+            time.sleep(0.05)
+
+    def test_olderJobIsSkipped(self):
+        jobFile = self._writeJob("old", {"Id": "old", "Command": ["true"], "Output": "old.mp4"})
+        self.assertEqual(self.queue.resume(self.converted.append), 0)
+        self.assertFalse(os.path.exists(jobFile))
+        self.assertEqual(os.listdir(self.queueDir), [])
+
+    def test_newerJobIsLeft(self):
+        jobFile = self._writeJob("new", {"Id": "new", "JobVersion": previewQueue.JOB_VERSION + 1})
+        self.assertEqual(self.queue.resume(self.converted.append), 0)
+        self.assertTrue(os.path.exists(jobFile))
+
+    def test_currentJobIsResumed(self):
+        self._writeJob("current", {"Id": "current", "JobVersion": previewQueue.JOB_VERSION,
+                                   "Command": [sys.executable, "-c", "pass"], "Outputs": []})
+        self.assertEqual(self.queue.resume(self.converted.append), 1)
+        self._wait()
+        self.assertEqual([job["Id"] for job in self.converted], ["current"])
+        self.assertEqual(self.queue.takeFailures(), [])
+
+    def test_failureIsReported(self):
+        self.queue.submit({"Command": [sys.executable, "-c", "import sys; sys.exit(1)"], "Outputs": []},
+                          self.converted.append)
+        self._wait()
+        failures = self.queue.takeFailures()
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(self.converted, [])
+        self.assertEqual(self.queue.takeFailures(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
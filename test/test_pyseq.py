@@ -0,0 +1,132 @@
+import os
+import random
+import doctest
+import shutil
+import tempfile
+import unittest
+
+from tik_manager import pyseq
+
+NAMES = ["file.%04d.jpg" % frame for frame in (1, 2, 3, 6, 7)]
+
+
+class CompactSequenceTest(unittest.TestCase):
+    def test_baseStateIsInitialized(self):
+        seq = pyseq.CompactSequence(NAMES)
+        for attribute in ("_Sequence__missing", "_Sequence__dirty", "_Sequence__frames"):
+            self.assertIn(attribute, seq.__dict__)
+
+    def test_sameAsSequence(self):
+        compact = pyseq.CompactSequence(NAMES)
+        regular = pyseq.Sequence(NAMES)
+        self.assertEqual(len(compact), len(regular))
+        self.assertEqual(compact.frames(), regular.frames())
+        self.assertEqual(compact.missing(), regular.missing())
+        self.assertEqual(compact.format("%h%p%t %R"), regular.format("%h%p%t %R"))
+        self.assertEqual([item.name for item in compact], [item.name for item in regular])
+        self.assertEqual(compact[0].frame, 1)
+        self.assertEqual(compact[-1].frame, 7)
+
+    def test_append(self):
+        seq = pyseq.CompactSequence(NAMES[:1])
+        seq.append(NAMES[1])
+        self.assertEqual(seq.frames(), [1, 2])
+        self.assertRaises(pyseq.SequenceError, seq.append, "other.0003.jpg")
+        self.assertRaises(pyseq.SequenceError, seq.__setitem__, 0, NAMES[0])
+
+    def test_fromFrames(self):
+        seq = pyseq.CompactSequence.from_frames(".", "file.", 4, ".jpg", [1, 2, 3, 6, 7])
+        self.assertEqual(seq.format("%h%p%t %R"), pyseq.Sequence(NAMES).format("%h%p%t %R"))
+        self.assertEqual(seq.expand().frames(), [1, 2, 3, 6, 7])
+
+
+# test files of the upstream pyseq, listed in the get_sequences and iget_sequences doctests
+CORPUS = (["012_vb_110_v%03d.%04d.png" % (v, f) for v in (1, 2) for f in range(1, 11)] +
+          ["a.%03d.tga" % f for f in range(1, 15)] +
+          ["alpha.txt", "file.info.03.rgb", "file_02.tif"] +
+          ["bnc01_TinkSO_tx_%d_ty_%d.%04d.tif" % (x, y, f) for x in (0, 1) for y in (0, 1) for f in range(101, 106)] +
+          ["file.%02d.tif" % f for f in (1, 2)] +
+          ["file01.%04d.j2k" % f for f in range(1, 5)] +
+          ["file01_%04d.rgb" % f for f in range(40, 44)] +
+          ["file02_%04d.rgb" % f for f in range(44, 48)] +
+          ["file%d.03.rgb" % f for f in range(1, 5)] +
+          ["fileA.%04d.%s" % (f, ext) for ext in ("jpg", "png") for f in range(1, 4)] +
+          ["%s.%04d.png" % (name, f) for name in ("z1_001_v1", "z1_002_v1", "z1_002_v2") for f in range(1, 5)])
+
+
+def referenceSequences(names):
+    """Previous get_sequences grouping. Every item is tested against all sequences found so far, newest first"""
+    seqs = []
+    for name in sorted(names, key=str):
+        item = pyseq.Item(name)
+        for seq in seqs[::-1]:
+            if seq.includes(item):
+                seq.append(item)
+                break
+        else:
+            seqs.append(pyseq.Sequence([item]))
+    return seqs
+
+
+def randomNames(rand):
+    """Name list mixing digit groups, paddings, duplicates and extensions"""
+    heads = ["shot", "a", "beauty_", "file", "v", "z1_", "bnc01_tx_"]
+    separators = ["", ".", "_", "-"]
+    extensions = [".exr", ".jpg", ".rgb", ".tif", ""]
+    names = []
+    for _ in range(rand.randint(1, 60)):
+        parts = [rand.choice(heads)]
+        for _ in range(rand.randint(0, 3)):
+            number = rand.randint(0, 120)
+            parts.append("%0*d" % (rand.choice([1, 2, 3, 4]), number))
+            parts.append(rand.choice(separators))
+        parts.append(rand.choice(extensions))
+        names.append("".join(parts))
+    # duplicates
+    names += rand.sample(names, rand.randint(0, len(names) // 4))
+    return names
+
+
+def describe(seqs):
+    return [([item.path for item in seq], seq.frames(), seq.pad, seq.head(), seq.tail()) for seq in seqs]
+
+
+class GetSequencesTest(unittest.TestCase):
+    def test_corpus(self):
+        names = [os.path.join("files", name) for name in CORPUS]
+        expected = describe(referenceSequences(names))
+        self.assertEqual(describe(pyseq.get_sequences(names)), expected)
+        self.assertEqual(describe(pyseq.get_sequences(names, compact=True)), expected)
+
+    def test_randomized(self):
+        rand = random.Random(1357)
+        for _ in range(500):
+            names = randomNames(rand)
+            expected = describe(referenceSequences(names))
+            self.assertEqual(describe(pyseq.get_sequences(names)), expected, names)
+            self.assertEqual(describe(pyseq.get_sequences(names, compact=True)), expected, names)
+
+
+class DoctestTest(unittest.TestCase):
+    def setUp(self):
+        # ./tests/files of the doctests
+        self.cwd = os.getcwd()
+        self.tempDir = tempfile.mkdtemp()
+        filesDir = os.path.join(self.tempDir, "tests", "files")
+        os.makedirs(filesDir)
+        for name in CORPUS:
+            open(os.path.join(filesDir, name), "w").close()
+        os.chdir(self.tempDir)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tempDir)
+
+    def test_moduleDoctests(self):
+        result = doctest.testmod(pyseq)
+        self.assertGreater(result.attempted, 0)
+        self.assertEqual(result.failed, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
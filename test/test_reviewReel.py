@@ -0,0 +1,49 @@
+import unittest
+
+from tik_manager.SmRoot import RootManager
+
+LUT = {"videoCodec": "-c:v libx264", "compression": "-crf 23", "audioCodec": "-c:a aac -b:a 128k"}
+
+
+def probe(audio):
+    video = ("h264", "High", "4.0", "yuv420p", "1920", "1080", "25", "12800")
+    return video + (("aac", "48000", "stereo") if audio else (None, None, None))
+
+
+class ReelFormatTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = RootManager.__new__(RootManager)
+        self.manager.loadConversionLUT = lambda: LUT
+        self.manager.checkFFMPEG = lambda: "ffmpeg"
+
+    def _converted(self, probes):
+        target = self.manager._reelFormat(probes)
+        return target, [self.manager._reelConversionCommand("clip.mp4", p, target, "out.mp4")
+                        for p in probes if p != target]
+
+    def test_mostlySilentClips(self):
+        probes = [probe(False), probe(True), probe(False), probe(False)]
+        target, commands = self._converted(probes)
+        self.assertEqual(target[8:], (None, None, None))
+        # only the clip with audio is converted, its audio is dropped
+        self.assertEqual(len(commands), 1)
+        self.assertIn("-an", commands[0])
+        self.assertNotIn("anullsrc=channel_layout=stereo:sample_rate=48000", commands[0])
+
+    def test_mostlyClipsWithAudio(self):
+        probes = [probe(True), probe(False), probe(True)]
+        target, commands = self._converted(probes)
+        self.assertEqual(target[8:], ("aac", "48000", "stereo"))
+        # only the silent clip is converted, with a silent track
+        self.assertEqual(len(commands), 1)
+        self.assertIn("anullsrc=channel_layout=stereo:sample_rate=48000", commands[0])
+        self.assertNotIn("-an", commands[0])
+
+    def test_allSilent(self):
+        target, commands = self._converted([probe(False), probe(False)])
+        self.assertEqual(target[8:], (None, None, None))
+        self.assertEqual(commands, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+from tik_manager.sceneIndex import SceneIndex
+from tik_manager.sqliteCache import RACY_WINDOW
+
+# stamps older than the racy window
+PAST = time.time() - 10 * RACY_WINDOW
+
+
+class SceneIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.category = os.path.join(self.tempDir, "Model")
+        os.makedirs(self.category)
+        self.index = SceneIndex(os.path.join(self.tempDir, "sceneIndex.db"))
+        self.loaded = []
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tempDir)
+
+    def _loader(self, jsonFile):
+        self.loaded.append(os.path.basename(jsonFile))
+        with open(jsonFile) as f:
+            return json.load(f)
+
+    def _writeScene(self, name, note, mtime=PAST):
+        jsonFile = os.path.join(self.category, "%s.json" % name)
+        with open(jsonFile, "w") as f:
+            json.dump({"Name": name, "Versions": [{"Note": note}]}, f)
+        if mtime is not None:
+            os.utime(jsonFile, (mtime, mtime))
+        return jsonFile
+
+    def _stampFolder(self, mtime=PAST):
+        os.utime(self.category, (mtime, mtime))
+
+    def test_unchangedFolderIsNotRead(self):
+        self._writeScene("shotA", "a")
+        self._writeScene("shotB", "b")
+        self._stampFolder()
+        self.assertEqual(sorted(self.index.scanFolder(self.category, self._loader)), ["shotA", "shotB"])
+        self.assertEqual(sorted(self.loaded), ["shotA.json", "shotB.json"])
+        del self.loaded[:]
+        self.assertEqual(sorted(self.index.scanFolder(self.category, self._loader)), ["shotA", "shotB"])
+        self.assertEqual(self.loaded, [])
+
+    def test_changedAndDeletedFiles(self):
+        jsonFile = self._writeScene("shotA", "a")
+        self._writeScene("shotB", "b")
+        self._stampFolder()
+        self.index.scanFolder(self.category, self._loader)
+        del self.loaded[:]
+        self._writeScene("shotA", "changed note", mtime=PAST + 1)
+        os.remove(os.path.join(self.category, "shotB.json"))
+        self._stampFolder(PAST + 1)
+        self.assertEqual(list(self.index.scanFolder(self.category, self._loader)), ["shotA"])
+        self.assertEqual(self.loaded, ["shotA.json"])
+        self.assertEqual(self.index.getSceneInfo(jsonFile, self._loader)["Versions"][0]["Note"], "changed note")
+
+    def test_sceneInfoServedFromIndex(self):
+        jsonFile = self._writeScene("shotA", "a")
+        self.index.getSceneInfo(jsonFile, self._loader)
+        self.assertEqual(self.index.getSceneInfo(jsonFile, self._loader)["Versions"][0]["Note"], "a")
+        self.assertEqual(self.loaded, ["shotA.json"])
+
+    def test_racyFileIsReadAgain(self):
+        now = time.time()
+        jsonFile = self._writeScene("shotA", "a", mtime=now)
+        self.index.getSceneInfo(jsonFile, self._loader)
+        # same size and the same timestamp
+        self._writeScene("shotA", "b", mtime=now)
+        self.assertEqual(self.index.getSceneInfo(jsonFile, self._loader)["Versions"][0]["Note"], "b")
+
+    def test_racyFolderIsListedAgain(self):
+        now = time.time()
+        self._writeScene("shotA", "a")
+        self._stampFolder(now)
+        self.assertEqual(list(self.index.scanFolder(self.category, self._loader)), ["shotA"])
+        self._writeScene("shotB", "b")
+        self._stampFolder(now)
+        self.assertEqual(sorted(self.index.scanFolder(self.category, self._loader)), ["shotA", "shotB"])
+
+    def test_digests(self):
+        jsonFile = self._writeScene("shotA", "a")
+        stat = os.stat(jsonFile)
+        self.index.setDigests([(jsonFile, stat.st_mtime, stat.st_size, "md5", "abc")])
+        self.assertEqual(self.index.getDigest(jsonFile, stat, "md5"), "abc")
+        self.assertIsNone(self.index.getDigest(jsonFile, stat, "sha1"))
+        self._writeScene("shotA", "b", mtime=PAST + 1)
+        self.assertIsNone(self.index.getDigest(jsonFile, os.stat(jsonFile), "md5"))
+
+    def test_racyDigestIsNotServed(self):
+        jsonFile = self._writeScene("shotA", "a", mtime=time.time())
+        stat = os.stat(jsonFile)
+        self.index.setDigests([(jsonFile, stat.st_mtime, stat.st_size, "md5", "abc")])
+        # same size and the same timestamp
+        self._writeScene("shotA", "b", mtime=stat.st_mtime)
+        self.assertIsNone(self.index.getDigest(jsonFile, os.stat(jsonFile), "md5"))
+
+    def test_brokenIndexFallsBack(self):
+        with open(self.index.cacheFile, "w") as f:
+            f.write("not a database")
+        jsonFile = self._writeScene("shotA", "a")
+        self.assertEqual(self.index.getSceneInfo(jsonFile, self._loader)["Name"], "shotA")
+        self.assertFalse(self.index.enabled)
+        self.assertIsNone(self.index.scanFolder(self.category, self._loader))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+
+from tik_manager.SmRoot import RootManager
+
+
+def makeManager(useJournal):
+    """RootManager with only the state needed by the scene database functions"""
+    manager = RootManager.__new__(RootManager)
+    manager._userSettings = {"useVersionJournal": useJournal}
+    manager._sceneIndex = None
+    return manager
+
+
+def version(number):
+    return {"RelativePath": "scenes/shot/v%03d.ma" % number, "Note": "", "Preview": {}}
+
+
+class SceneJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.databaseFile = os.path.join(self.tempDir, "shot.json")
+        with open(self.databaseFile, "w") as f:
+            json.dump({"Name": "shot", "ReferenceFile": None, "ReferencedVersion": None,
+                       "Versions": [version(1)]}, f)
+        self.journal = makeManager(True)
+        self.full = makeManager(False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def _addVersion(self, manager, sceneInfo):
+        sceneInfo["Versions"].append(version(len(sceneInfo["Versions"]) + 1))
+        manager._writeSceneDatabase(self.databaseFile, sceneInfo, versionNumber=len(sceneInfo["Versions"]))
+
+    def test_journalMerge(self):
+        sceneInfo = self.journal._loadSceneDatabase(self.databaseFile)
+        self._addVersion(self.journal, sceneInfo)
+        sceneInfo["Versions"][0]["Note"] = "changed"
+        self.journal._writeSceneDatabase(self.databaseFile, sceneInfo, versionNumber=1, versionKeys=["Note"])
+        with open(self.databaseFile) as f:
+            self.assertEqual(len(json.load(f)["Versions"]), 1)
+        loaded = self.journal._loadSceneDatabase(self.databaseFile)
+        self.assertEqual(len(loaded["Versions"]), 2)
+        self.assertEqual(loaded["Versions"][0]["Note"], "changed")
+
+    def test_tornJournalLine(self):
+        sceneInfo = self.journal._loadSceneDatabase(self.databaseFile)
+        self._addVersion(self.journal, sceneInfo)
+        with open(self.journal._getJournalFiles(self.databaseFile)[0], "a") as f:
+            f.write('\n{"Version": 3, "VersionDa')
+        self.assertEqual(len(self.journal._loadSceneDatabase(self.databaseFile)["Versions"]), 2)
+
+    def test_compaction(self):
+        sceneInfo = self.journal._loadSceneDatabase(self.databaseFile)
+        self._addVersion(self.journal, sceneInfo)
+        self.journal.compactSceneJournal(self.databaseFile)
+        for journalFile in self.journal._getJournalFiles(self.databaseFile):
+            self.assertFalse(os.path.exists(journalFile))
+        with open(self.databaseFile) as f:
+            self.assertEqual(len(json.load(f)["Versions"]), 2)
+
+    def test_mixedWriters(self):
+        # both sessions load the same state
+        fullInfo = self.full._loadSceneDatabase(self.databaseFile)
+        journalInfo = self.journal._loadSceneDatabase(self.databaseFile)
+        # journaling session adds a version, full write session edits a note afterwards
+        self._addVersion(self.journal, journalInfo)
+        fullInfo["Versions"][0]["Note"] = "full write"
+        self.full._writeSceneDatabase(self.databaseFile, fullInfo, versionNumber=1, versionKeys=["Note"])
+
+        for manager in (self.full, self.journal):
+            loaded = manager._loadSceneDatabase(self.databaseFile)
+            self.assertEqual(len(loaded["Versions"]), 2)
+            self.assertEqual(loaded["Versions"][0]["Note"], "full write")
+        # merged into the snapshot, nothing left aside
+        self.assertFalse(os.path.exists(self.journal._getJournalFiles(self.databaseFile)[1]))
+
+    def test_mixedWritersSameVersion(self):
+        fullInfo = self.full._loadSceneDatabase(self.databaseFile)
+        journalInfo = self.journal._loadSceneDatabase(self.databaseFile)
+        journalInfo["Versions"][0]["Preview"] = {"persp": "a.mp4"}
+        self.journal._writeSceneDatabase(self.databaseFile, journalInfo, versionNumber=1, versionKeys=["Preview"])
+        fullInfo["Versions"][0]["Note"] = "note"
+        self.full._writeSceneDatabase(self.databaseFile, fullInfo, versionNumber=1, versionKeys=["Note"])
+        loaded = self.journal._loadSceneDatabase(self.databaseFile)
+        self.assertEqual(loaded["Versions"][0]["Preview"], {"persp": "a.mp4"})
+        self.assertEqual(loaded["Versions"][0]["Note"], "note")
+
+    def _previewJob(self, name):
+        return {"DatabaseFile": self.databaseFile, "RelativePath": version(1)["RelativePath"],
+                "Previews": {name: "%s.mp4" % name}, "Play": None}
+
+    def test_previewRegisteredDuringFullWrite(self):
+        guiInfo = self.full._loadSceneDatabase(self.databaseFile)
+        # conversion finishes after the GUI loaded the data
+        self.full._onPreviewConverted(self._previewJob("persp"))
+        guiInfo["Versions"][0]["Note"] = "note"
+        self.full._writeSceneDatabase(self.databaseFile, guiInfo, versionNumber=1, versionKeys=["Note"])
+        loaded = self.full._loadSceneDatabase(self.databaseFile)
+        self.assertEqual(loaded["Versions"][0]["Preview"], {"persp": "persp.mp4"})
+        self.assertEqual(loaded["Versions"][0]["Note"], "note")
+
+    def test_concurrentPreviewRegistration(self):
+        names = ["cam%s" % i for i in range(16)]
+        threads = [threading.Thread(target=self.full._onPreviewConverted, args=(self._previewJob(name),))
+                   for name in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        loaded = self.full._loadSceneDatabase(self.databaseFile)
+        self.assertEqual(sorted(loaded["Versions"][0]["Preview"]), sorted(names))
+
+
+if __name__ == "__main__":
+    unittest.main()
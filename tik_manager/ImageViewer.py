@@ -41,6 +41,8 @@ Double clicking on the seguence will execute the file on the defined application
 
 import os
 import sys
+import time
+import threading
 
 # ---------------
 # GET ENVIRONMENT
@@ -151,6 +153,8 @@ import datetime
 from shutil import copyfile
 from tik_manager.SmRoot import RootManager
 # from SmRoot import RootManager
+from tik_manager.sequenceCache import SequenceCache
+from tik_manager import copyEngine
 
 
 import logging
@@ -283,6 +287,8 @@ class MainUI(QtWidgets.QMainWindow):
                 self.rootPath = self.projectPath
 
         self.databaseDir = os.path.normpath(os.path.join(self.projectPath, "smDatabase"))
+        # sqlite locking is not reliable on network shares, the cache stays on the local disk
+        self.cacheFile = os.path.join(self.imageViewer._pathsDict["userSettingsDir"], "sequenceCache.db")
 
         if not os.path.isdir(self.databaseDir):
             msg = ["Nothing to view", "No Scene Manager Database",
@@ -300,8 +306,9 @@ class MainUI(QtWidgets.QMainWindow):
 
         self.recursiveInitial = recursive
 
-        self._generator = None
-        self._timerId = None
+        self._scanner = None
+        self._scanCount = 0
+        self._retiredScanners = []
 
         # self.sequenceData = []
         self.sequenceData = {}
@@ -511,6 +518,7 @@ class MainUI(QtWidgets.QMainWindow):
         self.sequences_treeWidget.setToolTip((""))
         self.sequences_treeWidget.setStatusTip((""))
         self.sequences_treeWidget.setSortingEnabled(True)
+        self.sequences_treeWidget.sortByColumn(1, QtCore.Qt.AscendingOrder)  # 1 is Date Column
         header = QtWidgets.QTreeWidgetItem(["Name", "Date"])
         self.sequences_treeWidget.setColumnWidth(0, 250)
         self.sequences_treeWidget.setHeaderItem(header)
@@ -593,13 +601,16 @@ class MainUI(QtWidgets.QMainWindow):
 
         rcAction_2 = QtWidgets.QAction('Show Root Folder in Explorer', self)
         rcAction_3 = QtWidgets.QAction('Show Transfer Folder in Explorer', self)
+        rcAction_5 = QtWidgets.QAction('Verify Transfer...', self)
         self.popMenuLabels.addAction(rcAction_2)
         self.popMenuLabels.addAction(rcAction_3)
+        self.popMenuLabels.addAction(rcAction_5)
 
         ## SIGNAL CONNECTIONS
         rcAction_0.triggered.connect(self.onShowInExplorer)
         rcAction_1.triggered.connect(self.onTransferFiles)
         rcAction_4.triggered.connect(self.onImportSequence)
+        rcAction_5.triggered.connect(self.onVerifyTransfer)
 
 
         # rcAction_2.triggered.connect(lambda: self.onShowInExplorer(path=unicode(self.rootFolder_lineEdit.text())))
@@ -626,6 +637,7 @@ class MainUI(QtWidgets.QMainWindow):
         # PyInstaller and Standalone version compatibility
 
         shortcutRefresh = QtWidgets.QShortcut(QtGui.QKeySequence("F5"), self, self.populate)
+        shortcutStop = QtWidgets.QShortcut(QtGui.QKeySequence("Esc"), self, self.stop)
 
         self.populate()
 
@@ -752,11 +764,37 @@ class MainUI(QtWidgets.QMainWindow):
             # raise Exception([101], "No sequence selected")
             return
 
+        seqCopy = getattr(self, "seqCopy", None)
+        if seqCopy and seqCopy.engine and not seqCopy.engine.isFinished():
+            self.infoPop(textTitle="Cannot Continue", textHeader="Another transfer is in progress")
+            return
+
         logPath = os.path.join(self.databaseDir, "transferLogs")
         self.imageViewer._folderCheck(logPath)
 
-        seqCopy = SeqCopyProgress()
-        seqCopy.copysequence(self.sequenceData, selectedItemNames, self.tLocation, logPath, self.rootPath)
+        # keep a reference, copying continues in the background
+        self.seqCopy = SeqCopyProgress()
+        self.seqCopy.copysequence(self.sequenceData, selectedItemNames, self.tLocation, logPath, self.rootPath,
+                                  workers=self.imageViewer._userSettings.get("transferWorkers", 4))
+
+    def onVerifyTransfer(self):
+        """Checks the files of a previous transfer against its manifest"""
+        seqCopy = getattr(self, "seqCopy", None)
+        if seqCopy and seqCopy.engine and not seqCopy.engine.isFinished():
+            self.infoPop(textTitle="Cannot Continue", textHeader="Another transfer is in progress")
+            return
+
+        logPath = os.path.join(self.databaseDir, "transferLogs")
+        manifestFile = QtWidgets.QFileDialog.getOpenFileName(self, "Select Transfer Manifest", logPath,
+                                                             "Transfer Manifests (fileTransferManifest_*.json)")
+        if isinstance(manifestFile, tuple):
+            manifestFile = manifestFile[0]
+        if not manifestFile:  # if dialog is canceled
+            return
+
+        self.seqCopy = SeqCopyProgress()
+        self.seqCopy.verifyManifest(os.path.normpath(str(manifestFile)),
+                                    workers=self.imageViewer._userSettings.get("transferWorkers", 4))
 
     def onImportSequence(self):
         """Executes the import sequence command"""
@@ -823,39 +861,39 @@ class MainUI(QtWidgets.QMainWindow):
         else:
             rec = 1
 
-        # convert filterList to tuple
-        filter = (f for f in self.filterList)
-        # create a generator
-        # genList = seq.walk(pathList[0], level=rec, includes=filter)
-        genList = [seq.walk(path, level=rec, includes=filter) for path in pathList]
-
-        self.stop()  # Stop any existing Timer
-        self._generator = self.listingLoop(genList)  # start the loop
-        self._timerId = self.startTimer(0)  # idle timer
-
-
-    def listingLoop(self, genList):
-        """Add found sequences to the List widget"""
-        for gen in genList:
-            for x in gen:
-                for i in x[2]:
-                    QtWidgets.QApplication.processEvents(QtCore.QEventLoop.ExcludeUserInputEvents)
-                    # filtertest
-                    filterWord = str(self.nameFilter_lineEdit.text())
-                    if filterWord != "" and filterWord.lower() not in i.lower():
-                        continue
-
-                    itemName = i.format('%h%t %R')
-                    self.sequenceData[itemName] = i
-                    # self.sequenceData.append(i)
-                    # self.sequences_listWidget.addItem(i.format('%h%t %R'))
-                    firstImagePath = os.path.join(os.path.normpath(i.dirname), i.name)
-                    timestamp = os.path.getmtime(firstImagePath)
-                    timestampFormatted = datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-                    item = QtWidgets.QTreeWidgetItem(self.sequences_treeWidget, [itemName, str(timestampFormatted)])
-                    self.sequences_treeWidget.sortItems(1, QtCore.Qt.AscendingOrder)  # 1 is Date Column, 0 is Ascending order
-
-                    yield
+        self.stop()  # Cancel any running scan
+
+        self._scanCount += 1
+        self._scanner = SequenceScanner(self._scanCount, pathList, level=rec, includes=tuple(self.filterList),
+                                        nameFilter=str(self.nameFilter_lineEdit.text()), cacheFile=self.cacheFile)
+        self._scanner.batchReady.connect(self.onScanBatch)
+        self._scanner.scanFinished.connect(self.onScanFinished)
+        self.statusBar().showMessage("Scanning...")
+        self._scanner.start()
+
+    def onScanBatch(self, scanId, batch, visited):
+        """Adds a batch of found sequences coming from the scanner to the tree widget"""
+        if scanId != self._scanCount:
+            # leftover from a cancelled scan
+            return
+        if batch:
+            items = []
+            for itemName, timestampFormatted, sequence in batch:
+                self.sequenceData[itemName] = sequence
+                items.append(QtWidgets.QTreeWidgetItem([itemName, timestampFormatted]))
+            # sort once for the whole batch instead of once for every item
+            self.sequences_treeWidget.setSortingEnabled(False)
+            self.sequences_treeWidget.addTopLevelItems(items)
+            self.sequences_treeWidget.setSortingEnabled(True)
+        self.statusBar().showMessage("Scanning... %s folders visited, %s sequences found"
+                                     % (visited, len(self.sequenceData)))
+
+    def onScanFinished(self, scanId, visited):
+        """Updates the status bar and releases the scanner thread"""
+        if scanId == self._scanCount:
+            self.statusBar().showMessage("%s folders visited, %s sequences found" % (visited, len(self.sequenceData)))
+            self._scanner = None
+        self._retiredScanners = [s for s in self._retiredScanners if s.isRunning()]
 
     def onRunItem(self):
         """Execute the sequence"""
@@ -869,19 +907,22 @@ class MainUI(QtWidgets.QMainWindow):
 
     def stop(self):  # Connect to Stop-button clicked()
         """Stops the search progress for sequences"""
-        if self._timerId is not None:
-            self.killTimer(self._timerId)
-        self._generator = None
-        self._timerId = None
-
-    def timerEvent(self, event):
-        # This is called every time the GUI is idle.
-        if self._generator is None:
+        if self._scanner is None:
             return
-        try:
-            next(self._generator)  # Run the next iteration
-        except StopIteration:
-            self.stop()  # Iteration has finshed, kill the timer
+        self._scanner.cancel()
+        if self._scanner.isRunning():
+            # the thread finishes after the directory it is listing. Keep a reference until then
+            self._retiredScanners.append(self._scanner)
+        self._scanCount += 1
+        self._scanner = None
+        self.statusBar().showMessage("Scan cancelled")
+
+    def closeEvent(self, event):
+        self.stop()
+        for scanner in self._retiredScanners:
+            scanner.wait()
+        self._retiredScanners = []
+        super(MainUI, self).closeEvent(event)
 
     # def _loadJson(self, file):
     #     """Loads the given json file"""
@@ -978,6 +1019,79 @@ class DeselectableTreeView(QtWidgets.QTreeView):
         QtWidgets.QTreeView.mousePressEvent(self, event)
 
 
+class SequenceScanner(QtCore.QThread):
+    """
+    Walks the given folders for image sequences in a worker thread.
+    Found sequences are sent in batches as (itemName, formattedDate, sequence) tuples together with
+    the number of folders visited so far. Cancelling takes effect after the folder being listed.
+    If a cache file is given, unchanged folders are served from the sequence cache.
+    """
+    # PyInstaller and Standalone version compatibility
+    if FORCE_QT5:
+        batchReady = QtCore.pyqtSignal(int, object, int)
+        scanFinished = QtCore.pyqtSignal(int, int)
+    else:
+        batchReady = QtCore.Signal(int, object, int)
+        scanFinished = QtCore.Signal(int, int)
+
+    def __init__(self, scanId, pathList, level=-1, includes=(), nameFilter="", cacheFile=None, batchSize=500,
+                 interval=0.2):
+        super(SequenceScanner, self).__init__()
+        self.scanId = scanId
+        self.pathList = pathList
+        self.level = level
+        self.includes = includes
+        self.nameFilter = nameFilter.lower()
+        self.cacheFile = cacheFile
+        self.batchSize = batchSize
+        self.interval = interval
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def isCancelled(self):
+        return self._cancelled.is_set()
+
+    def run(self):
+        visited = 0
+        batch = []
+        lastEmit = time.time()
+        # sqlite connections are bound to the thread creating them
+        cache = SequenceCache(self.cacheFile) if self.cacheFile else None
+        try:
+            for path in self.pathList:
+                if cache and cache.enabled:
+                    walker = cache.walk(path, level=self.level, includes=self.includes, workers=4)
+                else:
+                    walker = seq.walk(path, level=self.level, includes=self.includes, compact=True, workers=4)
+                try:
+                    for root, dirs, sequences in walker:
+                        if self.isCancelled():
+                            return
+                        visited += 1
+                        for sequence in sequences:
+                            itemName = sequence.format('%h%t %R')
+                            if self.nameFilter and self.nameFilter not in itemName.lower():
+                                continue
+                            # stat of the first image comes from the directory listing
+                            timestamp = sequence[0].mtime
+                            timestampFormatted = datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+                            batch.append((itemName, timestampFormatted, sequence))
+                        if len(batch) >= self.batchSize or time.time() - lastEmit >= self.interval:
+                            self.batchReady.emit(self.scanId, batch, visited)
+                            batch = []
+                            lastEmit = time.time()
+                finally:
+                    walker.close()
+            if batch:
+                self.batchReady.emit(self.scanId, batch, visited)
+        finally:
+            if cache:
+                cache.close()
+            self.scanFinished.emit(self.scanId, visited)
+
+
 class SeqCopyProgress(QtWidgets.QWidget, RootManager):
     """Custom Widget for visualizing progress of file transfer"""
 
@@ -986,13 +1100,17 @@ class SeqCopyProgress(QtWidgets.QWidget, RootManager):
         self.logger = None
         self.src = src
         self.dest = dest
+        self.engine = None
         self.build_ui()
         self.terminated = False
         self.cancelAll = False
         self.errorFlag = False
-        # self.copyfileobj(src=self.src, dst=self.dest)
         self.currentPlatform = self.getPlatform()
 
+        self._progressTimer = QtCore.QTimer(self)
+        self._progressTimer.setInterval(100)
+        self._progressTimer.timeout.connect(self.updateProgress)
+
         dirname = os.path.dirname(os.path.abspath(__file__))
         stylesheetFile = os.path.join(dirname, "CSS", "tikManager.qss")
 
@@ -1005,9 +1123,9 @@ class SeqCopyProgress(QtWidgets.QWidget, RootManager):
 
         vbox = QtWidgets.QHBoxLayout()
 
-        lbl_src = QtWidgets.QLabel('Source: ')
-        lbl_dest = QtWidgets.QLabel('Destination: ')
-        lbl_overall = QtWidgets.QLabel('Overall Progress:')
+        self.lbl_src = QtWidgets.QLabel('Source: ')
+        self.lbl_dest = QtWidgets.QLabel('Destination: ')
+        self.lbl_overall = QtWidgets.QLabel('Overall Progress:')
         self.pb = QtWidgets.QProgressBar()
         self.pbOverall = QtWidgets.QProgressBar()
         self.cancelButton = QtWidgets.QPushButton("Cancel")
@@ -1021,10 +1139,10 @@ class SeqCopyProgress(QtWidgets.QWidget, RootManager):
         self.pbOverall.setMaximum(100)
         self.pbOverall.setValue(0)
 
-        hbox.addWidget(lbl_src)
-        hbox.addWidget(lbl_dest)
+        hbox.addWidget(self.lbl_src)
+        hbox.addWidget(self.lbl_dest)
         hbox.addWidget(self.pb)
-        hbox.addWidget(lbl_overall)
+        hbox.addWidget(self.lbl_overall)
         hbox.addWidget(self.pbOverall)
         vbox.addWidget(self.cancelButton)
         vbox.addWidget(self.cancelAllButton)
@@ -1035,7 +1153,7 @@ class SeqCopyProgress(QtWidgets.QWidget, RootManager):
         self.cancelAllButton.clicked.connect(lambda: self.terminate(all=True))
         self.show()
 
-    def results_ui(self, status, success=True, logPath=None, destPath=None):
+    def results_ui(self, status, success=True, logPath=None, destPath=None, manifestFile=None, retryPaths=None):
 
         self.msgDialog = QtWidgets.QDialog(parent=self)
         self.msgDialog.setModal(True)
@@ -1058,6 +1176,16 @@ class SeqCopyProgress(QtWidgets.QWidget, RootManager):
             showLogButton = QtWidgets.QPushButton("Show Log File")
             layoutH.addWidget(showLogButton)
             showLogButton.clicked.connect(lambda: self.executeFile(logPath))
+        if manifestFile and retryPaths:
+            retryButton = QtWidgets.QPushButton("Re-run Failed (%s)" % len(retryPaths))
+            layoutH.addWidget(retryButton)
+            retryButton.clicked.connect(self.msgDialog.close)
+            retryButton.clicked.connect(lambda: self.retryManifest(manifestFile, retryPaths, workers=self.engine.workers))
+        elif manifestFile:
+            verifyButton = QtWidgets.QPushButton("Verify")
+            layoutH.addWidget(verifyButton)
+            verifyButton.clicked.connect(self.msgDialog.close)
+            verifyButton.clicked.connect(lambda: self.verifyManifest(manifestFile, workers=self.engine.workers))
         showInExplorer = QtWidgets.QPushButton("Show in Explorer")
         layoutH.addWidget(showInExplorer)
         okButton = QtWidgets.QPushButton("OK")
@@ -1076,12 +1204,20 @@ class SeqCopyProgress(QtWidgets.QWidget, RootManager):
 
     def closeEvent(self, *args, **kwargs):
         """Override close behaviour"""
-        self.terminated = True
+        if self.engine and not self.engine.isFinished():
+            self.terminate(all=True)
 
     def terminate(self, all=False):
         """Terminate the progress"""
         self.terminated = True
         self.cancelAll = all
+        if not self.engine:
+            return
+        if all:
+            self.engine.cancel()
+        else:
+            # skip the sequence being copied
+            self.engine.cancel(group=self.engine.progress()["group"])
 
     def safeLog(self, msg):
         try:
@@ -1089,77 +1225,164 @@ class SeqCopyProgress(QtWidgets.QWidget, RootManager):
         except AttributeError:
             pass
 
-    def copyfileobj(self, src, dst):
-
-        self.pb.setValue(0)
-        self.terminated = False  # reset the termination status
-        totalCount = len(src)
-        current = 0
-
-        for i in src:
-            targetPath = os.path.join(dst, os.path.basename(i))
-            try:
-                copyfile(i, targetPath)
-            except:
-                self.errorFlag = True
-                self.safeLog("FAILED - unknown error")
-            percent = (100 * current) / totalCount
-            self.pb.setValue(percent)
-            current += 1
-            QtWidgets.QApplication.processEvents()
-            self.safeLog("Success - {0}".format(targetPath))
-            if self.terminated or self.cancelAll:
-                self.errorFlag = True
-                self.safeLog("FAILED - skipped by user")
-                break
-
-    def copysequence(self, sequenceData, selectionList, destination, logPath, root):
+    def copysequence(self, sequenceData, selectionList, destination, logPath, root, workers=4):
         """
-        Copies the sequences to the destination
+        Copies the sequences to the destination in the background. A transfer manifest with the
+        hashes of the copied files is saved next to the log file
         :param sequenceData: (Dictionary) Dictionary of sequences - Usually all found sequences
         :param selectionList: (List) Name list of selected sequences to iterate
         :param destination: (String) Absolute Path of remote destination
         :param logPath: (String) Absolute folder Path for log file
         :param root: (String) Root path of the images. Difference between sequence file folder
                         and root path will be used as the folder structure at remote location
+        :param workers: (Integer) Number of files copied at the same time. Local destinations are
+                        copied with one worker
         :return:
         """
         now = datetime.datetime.now()
         logName = "fileTransferLog_{0}.txt".format(now.strftime("%Y.%m.%d.%H.%M"))
-        logFile = os.path.join(logPath, logName)
-        self.logger = self.setupLogger(logFile)
-        totalCount = len(selectionList)
-        current = 0
+        self.logFile = os.path.join(logPath, logName)
+        self.manifestFile = os.path.join(logPath, "fileTransferManifest_{0}.json".format(now.strftime("%Y.%m.%d.%H.%M")))
+        currentDate = now.strftime("%y%m%d")
+        self.destination = os.path.join(destination, currentDate)
+
+        workers = copyEngine.workerCount(self.destination, workers)
+        engine = copyEngine.CopyEngine(workers=workers, hashName=copyEngine.HASH_NAME)
         for sel in selectionList:
-            if self.cancelAll:
-                self.safeLog("ALL CANCELED")
-                break
-            self.logger.debug(
-                "---------------------------------------------\n"
-                "Copy Progress - {0}\n"
-                "---------------------------------------------".format(
-                    sequenceData[str(sel)]))
-            percent = (100 * current) / totalCount
-            self.pbOverall.setValue(percent)
-            current += 1
-            tFilesList = [i.path for i in sequenceData[str(sel)]]
-            subPath = os.path.split(os.path.relpath(tFilesList[0], root))[0]  ## get the relative path
-            currentDate = now.strftime("%y%m%d")
-            targetPath = os.path.join(destination, currentDate, subPath)
-            if not os.path.isdir(os.path.normpath(targetPath)):
-                os.makedirs(os.path.normpath(targetPath))
-            self.copyfileobj(src=tFilesList, dst=targetPath)
+            sequence = sequenceData[str(sel)]
+            subPath = os.path.split(os.path.relpath(sequence[0].path, root))[0]  ## get the relative path
+            targetPath = os.path.normpath(os.path.join(self.destination, subPath))
+            for item in sequence:
+                engine.addJob(item.path, os.path.join(targetPath, item.name), group=str(sel))
+
+        self.startEngine(engine, self.finishTransfer)
 
+    def verifyManifest(self, manifestFile, workers=4):
+        """
+        Checks the transferred files against the given manifest in the background
+        :param manifestFile: (String) Absolute path of the transfer manifest
+        :param workers: (Integer) Number of files checked at the same time
+        :return:
+        """
+        self.manifestFile = manifestFile
+        self.manifest = copyEngine.loadManifest(manifestFile)
+        self.destination = self.manifest["Destination"]
+        self.logFile = manifestFile.replace("fileTransferManifest_", "fileVerifyLog_").replace(".json", ".txt")
+        self.startEngine(copyEngine.verifyEngine(self.manifest, workers=workers), self.finishVerify,
+                         title="Verify Files")
+
+    def retryManifest(self, manifestFile, paths, workers=4):
+        """
+        Copies the given files of the manifest again and updates the manifest
+        :param manifestFile: (String) Absolute path of the transfer manifest
+        :param paths: (List) Relative paths of the files in the manifest
+        :param workers: (Integer) Number of files copied at the same time
+        :return:
+        """
+        self.manifestFile = manifestFile
+        self.manifest = copyEngine.loadManifest(manifestFile)
+        self.destination = self.manifest["Destination"]
+        workers = copyEngine.workerCount(self.destination, workers)
+        self.startEngine(copyEngine.retryEngine(self.manifest, paths, workers=workers), self.finishRetry)
+
+    def startEngine(self, engine, finishCallback, title="File copy"):
+        """Starts the engine and follows its progress until the finish callback"""
+        self.engine = engine
+        self._finishCallback = finishCallback
+        self.terminated = False
+        self.cancelAll = False
+        self.errorFlag = False
+        self.pb.setValue(0)
+        self.pbOverall.setValue(0)
+        self.setWindowTitle(title)
+        self.lbl_dest.setText("Destination: %s" % self.destination)
+        self.show()
+        self.engine.start()
+        self._progressTimer.start()
+
+    def updateProgress(self):
+        """Updates the progress bars from the copy engine. Called by the timer"""
+        progress = self.engine.progress()
+        if progress["groupTotal"]:
+            self.pb.setValue(int(100 * progress["groupDone"] / progress["groupTotal"]))
+        if progress["bytesTotal"]:
+            self.pbOverall.setValue(int(100 * progress["bytesDone"] / progress["bytesTotal"]))
+        if progress["group"]:
+            self.lbl_src.setText("Source: %s" % progress["group"])
+        self.lbl_overall.setText("Overall Progress: {0:.1f} / {1:.1f} MB ({2:.1f} MB/s)".format(
+            progress["bytesDone"] / 1048576.0, progress["bytesTotal"] / 1048576.0, progress["speed"] / 1048576.0))
+        if self.engine.isFinished():
+            self._progressTimer.stop()
+            self._finishCallback()
+
+    def writeLog(self, header):
+        """Writes the job results of the engine into the log file"""
+        self.logger = self.setupLogger(self.logFile)
+        self.safeLog(header)
+        currentGroup = None
+        for job in self.engine.jobs:
+            if job.group != currentGroup:
+                currentGroup = job.group
+                self.logger.debug(
+                    "---------------------------------------------\n"
+                    "Copy Progress - {0}\n"
+                    "---------------------------------------------".format(currentGroup))
+            if job.status == copyEngine.COPIED:
+                self.safeLog("Success - {0}".format(job.destination))
+            elif job.status in (copyEngine.SKIPPED, copyEngine.VERIFIED):
+                self.safeLog("{0} - {1} - {2}".format(job.status, job.message, job.destination))
+            else:
+                self.errorFlag = True
+                self.safeLog("FAILED - {0} - {1}".format(job.message, job.destination))
+        counts = self.engine.progress()["counts"]
+        self.safeLog("\n" + ", ".join("{0}: {1}".format(k, v) for k, v in sorted(counts.items()) if v))
+        if self.cancelAll:
+            self.safeLog("ALL CANCELED")
         self.deleteLogger(self.logger)
 
+    def finishTransfer(self):
+        """Writes the log and manifest files and shows the results"""
+        copyEngine.writeManifest(self.engine, self.manifestFile, self.destination)
+        self.writeLog("Manifest: {0}".format(self.manifestFile))
         self.close()
         if self.cancelAll:
-            self.results_ui("Canceled by user", success=False, logPath=logFile, destPath=destination)
+            self.results_ui("Canceled by user", success=False, logPath=self.logFile, destPath=self.destination)
         elif self.errorFlag:
-            self.results_ui("Check log file for errors", success=False, logPath=logFile, destPath=destination)
+            self.results_ui("Check log file for errors", success=False, logPath=self.logFile, destPath=self.destination,
+                            manifestFile=self.manifestFile)
         else:
-            self.results_ui("Transfer Successfull", success=True, logPath=logFile, destPath=destination)
-        pass
+            self.results_ui("Transfer Successfull", success=True, logPath=self.logFile, destPath=self.destination,
+                            manifestFile=self.manifestFile)
+
+    def finishVerify(self):
+        """Shows the verification results with the option to copy the failed files again"""
+        self.writeLog("Verify: {0}".format(self.manifestFile))
+        self.close()
+        failedPaths = [os.path.relpath(job.destination, self.destination) for job in self.engine.jobs
+                       if job.status == copyEngine.FAILED]
+        if self.cancelAll:
+            self.results_ui("Canceled by user", success=False, logPath=self.logFile, destPath=self.destination)
+        elif failedPaths:
+            self.results_ui("%s files failed verification" % len(failedPaths), success=False, logPath=self.logFile,
+                            destPath=self.destination, manifestFile=self.manifestFile, retryPaths=failedPaths)
+        else:
+            self.results_ui("All files verified", success=True, logPath=self.logFile, destPath=self.destination)
+
+    def finishRetry(self):
+        """Updates the manifest with the copied files and shows the results"""
+        copyEngine.updateManifest(self.manifest, self.engine)
+        copyEngine.saveManifest(self.manifest, self.manifestFile)
+        self.logFile = self.manifestFile.replace("fileTransferManifest_", "fileRetryLog_").replace(".json", ".txt")
+        self.writeLog("Retry: {0}".format(self.manifestFile))
+        self.close()
+        if self.cancelAll:
+            self.results_ui("Canceled by user", success=False, logPath=self.logFile, destPath=self.destination)
+        elif self.errorFlag:
+            self.results_ui("Check log file for errors", success=False, logPath=self.logFile, destPath=self.destination,
+                            manifestFile=self.manifestFile)
+        else:
+            self.results_ui("Transfer Successfull", success=True, logPath=self.logFile, destPath=self.destination,
+                            manifestFile=self.manifestFile)
 
     def setupLogger(self, handlerPath):
         """Prepares logger to write into log file"""
@@ -180,10 +180,11 @@ class MaxManager(RootManager, MaxCoreFunctions):
             referenceFile = os.path.join(shotPath, "{0}.{1}".format(referenceName, sceneFormat))
             ## relativity update
             relReferenceFile = os.path.relpath(referenceFile, start=projectPath)
-            shutil.copyfile(sceneFile, referenceFile)
+            referenceDigests = self._copyReference(sceneFile, referenceFile)
             jsonInfo["ReferenceFile"] = relReferenceFile
             jsonInfo["ReferencedVersion"] = version
         else:
+            referenceDigests = None
             jsonInfo["ReferenceFile"] = None
             jsonInfo["ReferencedVersion"] = None
 
@@ -214,6 +215,8 @@ class MaxManager(RootManager, MaxCoreFunctions):
              }
         ]
         jsonInfo["SubProject"] = self._subProjectsList[subProjectIndex]
+        if referenceDigests:
+            jsonInfo["Versions"][0]["Digest"], jsonInfo["ReferenceDigest"] = referenceDigests
         self._dumpJson(jsonInfo, jsonFile)
         # return jsonInfo
         self.progressLogger("save", sceneFile)
@@ -265,7 +268,7 @@ class MaxManager(RootManager, MaxCoreFunctions):
 
         if sceneInfo: ## getCurrentJson returns None if the resolved json path is missing
             jsonFile = sceneInfo["jsonFile"]
-            jsonInfo = self._loadJson(jsonFile)
+            jsonInfo = self._loadSceneDatabase(jsonFile)
             if jsonInfo == -1:
                 msg = "Database file is corrupted"
                 return -1, msg
@@ -307,10 +310,12 @@ class MaxManager(RootManager, MaxCoreFunctions):
                 relReferenceFile = os.path.join(jsonInfo["Path"], "{0}.{1}".format(referenceName, sceneFormat))
                 referenceFile = os.path.join(sceneInfo["projectPath"], relReferenceFile)
 
-                shutil.copyfile(sceneFile, referenceFile)
+                jsonInfo["Versions"][currentVersion-1]["Digest"], jsonInfo["ReferenceDigest"] = \
+                    self._copyReference(sceneFile, referenceFile)
                 jsonInfo["ReferenceFile"] = relReferenceFile
                 jsonInfo["ReferencedVersion"] = currentVersion
-            self._dumpJson(jsonInfo, jsonFile)
+            self._writeSceneDatabase(jsonFile, jsonInfo, versionNumber=currentVersion,
+                                     sceneKeys=["ReferenceFile", "ReferencedVersion", "ReferenceDigest"] if makeReference else [])
         else:
             msg = "This is not a base scene (Json file cannot be found)"
             logger.warning(msg)
@@ -359,7 +364,7 @@ class MaxManager(RootManager, MaxCoreFunctions):
                 logger.warning(msg)
                 return -1, msg
 
-        jsonInfo = self._loadJson(openSceneInfo["jsonFile"])
+        jsonInfo = self._loadSceneDatabase(openSceneInfo["jsonFile"])
         if jsonInfo == -1:
             msg = "Database file is corrupted"
             return -1, msg
@@ -460,20 +465,24 @@ class MaxManager(RootManager, MaxCoreFunctions):
 
         # shutil.copy(sourceClip, playBlastFile)
 
-        if pbSettings["ConvertMP4"]:
-            convertedFile = self._convertPreview(playBlastFile, overwrite=True, deleteAfter=False, crf=pbSettings["CrfValue"])
-            relPlayBlastFile = os.path.relpath(convertedFile, start=openSceneInfo["projectPath"])
-            # os.startfile(convertedFile)
-        else:
-            relPlayBlastFile = os.path.relpath(playBlastFile, start=openSceneInfo["projectPath"])
+        # raw preview is registered until the conversion is done
+        relPlayBlastFile = os.path.relpath(playBlastFile, start=openSceneInfo["projectPath"])
 
         ## find this version in the json data
 
-        for version in jsonInfo["Versions"]:
+        versionNumber = None
+        for number, version in enumerate(jsonInfo["Versions"], 1):
             if relVersionName == version["RelativePath"]:
                 version["Preview"][currentCam] = relPlayBlastFile
+                versionNumber = number
+
+        self._writeSceneDatabase(openSceneInfo["jsonFile"], jsonInfo, versionNumber=versionNumber, versionKeys=["Preview"])
 
-        self._dumpJson(jsonInfo, openSceneInfo["jsonFile"])
+        if pbSettings["ConvertMP4"]:
+            # converted in the background. Database is updated when it is ready
+            self._queuePreviewConversion(playBlastFile, openSceneInfo["jsonFile"], relVersionName, currentCam,
+                                         projectPath=openSceneInfo["projectPath"], deleteAfter=False,
+                                         crf=pbSettings["CrfValue"])
         return 0, ""
 
 
@@ -619,7 +628,8 @@ class MaxManager(RootManager, MaxCoreFunctions):
         # except IndexError: # if this is an older file without thumbnail
         #     self._currentSceneInfo["Versions"][self.currentVersionIndex-1].append(filePath)
 
-        self._dumpJson(self._currentSceneInfo, self.currentDatabasePath)
+        self._writeSceneDatabase(self.currentDatabasePath, self._currentSceneInfo,
+                                 versionNumber=self.currentVersionIndex, versionKeys=["Thumb"])
 
     def compareVersions(self):
         """Compares the versions of current session and database version at cursor position"""
@@ -741,6 +751,16 @@ class MaxManager(RootManager, MaxCoreFunctions):
     def _killCallbacks(self, callbackIDList):
         logger.warning("_killCallbacks Function not yet implemented")
 
+# manager instance of the after save hook. Created on the first save and reused afterwards
+_callbackManager = None
+
+def saveCallback(*args):
+    """Entry point for the after save hook. Updates the reference file of the saved base scene"""
+    global _callbackManager
+    if not _callbackManager:
+        _callbackManager = MaxManager()
+    _callbackManager.saveCallback()
+
 class MainUI(baseUI):
     def __init__(self):
         super(MainUI, self).__init__()
@@ -200,10 +200,11 @@ class HoudiniManager(RootManager, HoudiniCoreFunctions):
             referenceFile = os.path.join(shotPath, "{0}.{1}".format(referenceName, sceneFormat))
             ## relativity update
             relReferenceFile = os.path.relpath(referenceFile, start=projectPath)
-            shutil.copyfile(absSceneFile, referenceFile)
+            referenceDigests = self._copyReference(absSceneFile, referenceFile)
             jsonInfo["ReferenceFile"] = relReferenceFile
             jsonInfo["ReferencedVersion"] = version
         else:
+            referenceDigests = None
             jsonInfo["ReferenceFile"] = None
             jsonInfo["ReferencedVersion"] = None
 
@@ -225,6 +226,8 @@ class HoudiniManager(RootManager, HoudiniCoreFunctions):
              }
         ]
         jsonInfo["SubProject"] = self._subProjectsList[subProjectIndex]
+        if referenceDigests:
+            jsonInfo["Versions"][0]["Digest"], jsonInfo["ReferenceDigest"] = referenceDigests
         self._dumpJson(jsonInfo, jsonFile)
         # return jsonInfo
         self.progressLogger("save", absSceneFile)
@@ -280,7 +283,7 @@ class HoudiniManager(RootManager, HoudiniCoreFunctions):
 
         if sceneInfo: ## getCurrentJson returns None if the resolved json path is missing
             jsonFile = sceneInfo["jsonFile"]
-            jsonInfo = self._loadJson(jsonFile)
+            jsonInfo = self._loadSceneDatabase(jsonFile)
 
             currentVersion = len(jsonInfo["Versions"]) + 1
             ## Naming Dictionary
@@ -330,10 +333,12 @@ class HoudiniManager(RootManager, HoudiniCoreFunctions):
                 relReferenceFile = os.path.join(jsonInfo["Path"], "{0}.{1}".format(referenceName, sceneFormat))
                 referenceFile = os.path.join(sceneInfo["projectPath"], relReferenceFile)
 
-                shutil.copyfile(absSceneFile, referenceFile)
+                jsonInfo["Versions"][currentVersion-1]["Digest"], jsonInfo["ReferenceDigest"] = \
+                    self._copyReference(absSceneFile, referenceFile)
                 jsonInfo["ReferenceFile"] = relReferenceFile
                 jsonInfo["ReferencedVersion"] = currentVersion
-            self._dumpJson(jsonInfo, jsonFile)
+            self._writeSceneDatabase(jsonFile, jsonInfo, versionNumber=currentVersion,
+                                     sceneKeys=["ReferenceFile", "ReferencedVersion", "ReferenceDigest"] if makeReference else [])
         else:
             msg = "This is not a base scene (Json file cannot be found)"
             return -1, msg
@@ -360,7 +365,7 @@ class HoudiniManager(RootManager, HoudiniCoreFunctions):
 
         selection = self._getSelection()
         hou.clearAllSelected()
-        jsonInfo = self._loadJson(openSceneInfo["jsonFile"])
+        jsonInfo = self._loadSceneDatabase(openSceneInfo["jsonFile"])
         #
 
         scene_view = toolutils.sceneViewer()
@@ -399,24 +404,28 @@ class HoudiniManager(RootManager, HoudiniCoreFunctions):
         flip_options.resolution((pbSettings["Resolution"][0], pbSettings["Resolution"][1]))
         scene_view.flipbook(viewport, flip_options)
 
-        if pbSettings["ConvertMP4"]:
-            nonVarPBfile = playBlastFile.replace("_$F4", "_0001")
-            convertedFile = self._convertPreview(nonVarPBfile, overwrite=True, deleteAfter=True, crf=pbSettings["CrfValue"])
-            relPlayBlastFile = os.path.relpath(convertedFile, start=openSceneInfo["projectPath"])
-            os.startfile(convertedFile)
-        else:
-            relPlayBlastFile = os.path.relpath(playBlastFile, start=openSceneInfo["projectPath"])
+        # raw flipbook is registered until the conversion is done
+        relPlayBlastFile = os.path.relpath(playBlastFile, start=openSceneInfo["projectPath"])
 
 
         ## find this version in the json data
-        for version in jsonInfo["Versions"]:
+        versionNumber = None
+        for number, version in enumerate(jsonInfo["Versions"], 1):
             if relVersionName == version["RelativePath"]:
                 # replace the houdini variable with first frame
                 nonVarPBfile = relPlayBlastFile.replace("_$F4", "_0001")
                 # version["Preview"][currentCam] = nonVarPBfile
                 version["Preview"][currentCam] = relPlayBlastFile
+                versionNumber = number
+
+        self._writeSceneDatabase(openSceneInfo["jsonFile"], jsonInfo, versionNumber=versionNumber, versionKeys=["Preview"])
 
-        self._dumpJson(jsonInfo, openSceneInfo["jsonFile"])
+        if pbSettings["ConvertMP4"]:
+            # converted in the background. Database is updated and the mp4 is played when it is ready
+            nonVarPBfile = playBlastFile.replace("_$F4", "_0001")
+            self._queuePreviewConversion(nonVarPBfile, openSceneInfo["jsonFile"], relVersionName, currentCam,
+                                         projectPath=openSceneInfo["projectPath"], deleteAfter=True,
+                                         crf=pbSettings["CrfValue"], play=True)
         # return 0, ""
 
 
@@ -543,7 +552,8 @@ class HoudiniManager(RootManager, HoudiniCoreFunctions):
             filePath = self.createThumbnail(useCursorPosition=True)
 
         self._currentSceneInfo["Versions"][self.currentVersionIndex-1]["Thumb"]=filePath
-        self._dumpJson(self._currentSceneInfo, self.currentDatabasePath)
+        self._writeSceneDatabase(self.currentDatabasePath, self._currentSceneInfo,
+                                 versionNumber=self.currentVersionIndex, versionKeys=["Thumb"])
 
     def compareVersions(self):
 
@@ -678,6 +688,16 @@ class HoudiniManager(RootManager, HoudiniCoreFunctions):
 
         return None, None
 
+# manager instance of the after save hook. Created on the first save and reused afterwards
+_callbackManager = None
+
+def saveCallback(*args):
+    """Entry point for the after save hook. Updates the reference file of the saved base scene"""
+    global _callbackManager
+    if not _callbackManager:
+        _callbackManager = HoudiniManager()
+    _callbackManager.saveCallback()
+
 class MainUI(baseUI):
     def __init__(self):
         super(MainUI, self).__init__()
@@ -198,10 +198,11 @@ class MayaManager(RootManager, MayaCoreFunctions):
             referenceFile = os.path.join(shotPath, "{0}{1}".format(referenceName, ext))
             ## relativity update
             relReferenceFile = os.path.relpath(referenceFile, start=projectPath)
-            shutil.copyfile(sceneFile, referenceFile)
+            referenceDigests = self._copyReference(sceneFile, referenceFile)
             jsonInfo["ReferenceFile"] = relReferenceFile
             jsonInfo["ReferencedVersion"] = version
         else:
+            referenceDigests = None
             jsonInfo["ReferenceFile"] = None
             jsonInfo["ReferencedVersion"] = None
 
@@ -226,6 +227,8 @@ class MayaManager(RootManager, MayaCoreFunctions):
         ]
 
         jsonInfo["SubProject"] = self._subProjectsList[subProjectIndex]
+        if referenceDigests:
+            jsonInfo["Versions"][0]["Digest"], jsonInfo["ReferenceDigest"] = referenceDigests
         self._dumpJson(jsonInfo, jsonFile)
         self.progressLogger("save", sceneFile)
         return [0, ""]
@@ -303,7 +306,7 @@ class MayaManager(RootManager, MayaCoreFunctions):
         ## Unknown nodes Check - end
 
         jsonFile = sceneInfo["jsonFile"]
-        jsonInfo = self._loadJson(jsonFile)
+        jsonInfo = self._loadSceneDatabase(jsonFile)
 
         currentVersion = len(jsonInfo["Versions"]) + 1
         ## Naming Dictionary
@@ -346,10 +349,12 @@ class MayaManager(RootManager, MayaCoreFunctions):
             relReferenceFile = os.path.join(jsonInfo["Path"], "{0}{1}".format(referenceName, ext))
             referenceFile = os.path.join(sceneInfo["projectPath"], relReferenceFile)
 
-            shutil.copyfile(sceneFile, referenceFile)
+            jsonInfo["Versions"][currentVersion-1]["Digest"], jsonInfo["ReferenceDigest"] = \
+                self._copyReference(sceneFile, referenceFile)
             jsonInfo["ReferenceFile"] = relReferenceFile
             jsonInfo["ReferencedVersion"] = currentVersion
-        self._dumpJson(jsonInfo, jsonFile)
+        self._writeSceneDatabase(jsonFile, jsonInfo, versionNumber=currentVersion,
+                                 sceneKeys=["ReferenceFile", "ReferencedVersion", "ReferenceDigest"] if makeReference else [])
         self.progressLogger("save", sceneFile)
         return jsonInfo
 
@@ -600,7 +605,7 @@ class MayaManager(RootManager, MayaCoreFunctions):
 
         selection = self._getSelection()
         cmds.select(d=pbSettings["ClearSelection"])
-        jsonInfo = self._loadJson(openSceneInfo["jsonFile"])
+        jsonInfo = self._loadSceneDatabase(openSceneInfo["jsonFile"])
 
         if previewCam:
             currentCam = previewCam
@@ -848,21 +853,25 @@ class MayaManager(RootManager, MayaCoreFunctions):
             except TypeError: # in case nothing selected
                 pass
 
-        if pbSettings["ConvertMP4"]:
-            convertedFile = self._convertPreview(playBlastFile, overwrite=True, deleteAfter=True, crf=pbSettings["CrfValue"])
-            relPlayBlastFile = os.path.relpath(convertedFile, start=openSceneInfo["projectPath"])
-            self.executeFile(convertedFile)
-        else:
-            relPlayBlastFile = os.path.relpath(playBlastFile, start=openSceneInfo["projectPath"])
-            if self.currentPlatform == "Linux": #somehow linux pb command is not playing the file with 'v' flag
-                self.executeFile(playBlastFile)
+        # raw playblast is the preview until the conversion is done
+        relPlayBlastFile = os.path.relpath(playBlastFile, start=openSceneInfo["projectPath"])
+        if not pbSettings["ConvertMP4"] and self.currentPlatform == "Linux": #somehow linux pb command is not playing the file with 'v' flag
+            self.executeFile(playBlastFile)
 
         ## find this version in the json data
-        for version in jsonInfo["Versions"]:
+        versionNumber = None
+        for number, version in enumerate(jsonInfo["Versions"], 1):
             if relVersionName.replace("/", "\\") == version["RelativePath"].replace("/", "\\"):
                 version["Preview"][validName] = relPlayBlastFile
+                versionNumber = number
+
+        self._writeSceneDatabase(openSceneInfo["jsonFile"], jsonInfo, versionNumber=versionNumber, versionKeys=["Preview"])
 
-        self._dumpJson(jsonInfo, openSceneInfo["jsonFile"])
+        if pbSettings["ConvertMP4"]:
+            # converted in the background. Database is updated and the mp4 is played when it is ready
+            self._queuePreviewConversion(playBlastFile, openSceneInfo["jsonFile"], relVersionName, validName,
+                                         projectPath=openSceneInfo["projectPath"], deleteAfter=True,
+                                         crf=pbSettings["CrfValue"], play=True)
         return 0, ""
 
     def loadBaseScene(self, force=False):
@@ -985,7 +994,8 @@ class MayaManager(RootManager, MayaCoreFunctions):
 
         self._currentSceneInfo["Versions"][self.currentVersionIndex-1]["Thumb"]=filePath
 
-        self._dumpJson(self._currentSceneInfo, self.currentDatabasePath)
+        self._writeSceneDatabase(self.currentDatabasePath, self._currentSceneInfo,
+                                 versionNumber=self.currentVersionIndex, versionKeys=["Thumb"])
 
     def compareVersions(self):
 
@@ -1243,6 +1253,16 @@ class MayaManager(RootManager, MayaCoreFunctions):
             except WindowsError:
                 logger.warning("Cannot rename the old database folder because of windows bullshit")
 
+# manager instance of the after save hook. Created on the first save and reused afterwards
+_callbackManager = None
+
+def saveCallback(*args):
+    """Entry point for the after save hook. Updates the reference file of the saved base scene"""
+    global _callbackManager
+    if not _callbackManager:
+        _callbackManager = MayaManager()
+    _callbackManager.saveCallback()
+
 class MainUI(baseUI):
     def __init__(self, callback=None):
         super(MainUI, self).__init__()
@@ -1271,6 +1291,7 @@ class MainUI(baseUI):
     def closeEvent(self, event):
         if self.isCallback:
             self.manager._killCallbacks(self.callbackIDList)
+        super(MainUI, self).closeEvent(event)
 
     def extraMenus(self):
         imanager = QtWidgets.QAction("&Image Manager", self)
@@ -167,10 +167,11 @@ class NukeManager(RootManager, NukeCoreFunctions):
             referenceFile = os.path.join(shotPath, "{0}.{1}".format(referenceName, sceneFormat))
             ## relativity update
             relReferenceFile = os.path.relpath(referenceFile, start=projectPath)
-            shutil.copyfile(sceneFile, referenceFile)
+            referenceDigests = self._copyReference(sceneFile, referenceFile)
             jsonInfo["ReferenceFile"] = relReferenceFile
             jsonInfo["ReferencedVersion"] = version
         else:
+            referenceDigests = None
             jsonInfo["ReferenceFile"] = None
             jsonInfo["ReferencedVersion"] = None
 
@@ -194,6 +195,8 @@ class NukeManager(RootManager, NukeCoreFunctions):
         ]
 
         jsonInfo["SubProject"] = self._subProjectsList[subProjectIndex]
+        if referenceDigests:
+            jsonInfo["Versions"][0]["Digest"], jsonInfo["ReferenceDigest"] = referenceDigests
         self._dumpJson(jsonInfo, jsonFile)
         self.progressLogger("save", sceneFile)
         return [0, ""]
@@ -253,7 +256,7 @@ class NukeManager(RootManager, NukeCoreFunctions):
 
         if sceneInfo: ## getCurrentJson returns None if the resolved json path is missing
             jsonFile = sceneInfo["jsonFile"]
-            jsonInfo = self._loadJson(jsonFile)
+            jsonInfo = self._loadSceneDatabase(jsonFile)
 
             currentVersion = len(jsonInfo["Versions"]) + 1
             ## Naming Dictionary
@@ -293,10 +296,12 @@ class NukeManager(RootManager, NukeCoreFunctions):
                 relReferenceFile = os.path.join(jsonInfo["Path"], "{0}.{1}".format(referenceName, sceneFormat))
                 referenceFile = os.path.join(sceneInfo["projectPath"], relReferenceFile)
 
-                shutil.copyfile(sceneFile, referenceFile)
+                jsonInfo["Versions"][currentVersion-1]["Digest"], jsonInfo["ReferenceDigest"] = \
+                    self._copyReference(sceneFile, referenceFile)
                 jsonInfo["ReferenceFile"] = relReferenceFile
                 jsonInfo["ReferencedVersion"] = currentVersion
-            self._dumpJson(jsonInfo, jsonFile)
+            self._writeSceneDatabase(jsonFile, jsonInfo, versionNumber=currentVersion,
+                                     sceneKeys=["ReferenceFile", "ReferencedVersion", "ReferenceDigest"] if makeReference else [])
         else:
             msg = "This is not a base scene (Json file cannot be found)"
             self._exception(360, msg)
@@ -286,7 +286,7 @@ class PsManager(RootManager, PsCoreFunctions):
 
         if sceneInfo: ## getCurrentJson returns None if the resolved json path is missing
             jsonFile = sceneInfo["jsonFile"]
-            jsonInfo = self._loadJson(jsonFile)
+            jsonInfo = self._loadSceneDatabase(jsonFile)
 
             currentVersion = len(jsonInfo["Versions"]) + 1
 
@@ -353,7 +353,7 @@ class PsManager(RootManager, PsCoreFunctions):
                  }
                 )
 
-            self._dumpJson(jsonInfo, jsonFile)
+            self._writeSceneDatabase(jsonFile, jsonInfo, versionNumber=currentVersion)
         else:
             msg = "This is not a base scene (Json file cannot be found)"
             self._exception(360, msg)
@@ -34,17 +34,25 @@ import platform
 import subprocess
 import datetime
 import os
+import time
 import logging
 # import pprint
 import hashlib
 
 import shutil
+import tempfile
 from glob import glob
 import json
 import filecmp
 import re
 # import ctypes
 import socket
+import stat
+import struct
+import threading
+import atexit
+import weakref
+from collections import OrderedDict
 
 # import urllib
 try:
@@ -53,6 +61,10 @@ except:
     from urllib import urlopen ## python 2.7 compatibility
 # import tik_manager.pyseq as pyseq
 from tik_manager import pyseq
+from tik_manager.sceneIndex import SceneIndex
+from tik_manager.sqliteCache import RACY_WINDOW
+from tik_manager import copyEngine
+from tik_manager import previewQueue
 # import tik_manager._version as _version
 from tik_manager import _version
 import tik_manager.compatibility as compat
@@ -71,11 +83,96 @@ logger = logging.getLogger('smRoot')
 logger.setLevel(logging.WARNING)
 
 
+class JsonCache(object):
+    """
+    Bounded LRU cache for the raw content of json files.
+    Entries are validated by the (mtime, size) of the file, so a changed file is always read again.
+    Raw text is kept instead of the parsed data; each request parses a fresh copy, which keeps the
+    cached content safe from the callers modifying the returned dictionaries.
+    Files modified within the RACY_WINDOW are not cached, a second write with the same size inside the
+    same timestamp resolution would not change the stamp.
+    """
+    def __init__(self, maxEntries=256):
+        super(JsonCache, self).__init__()
+        self.maxEntries = maxEntries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(filePath):
+        return os.path.normcase(os.path.abspath(filePath))
+
+    def get(self, filePath, fileStat):
+        """Returns the cached text if it is still valid for the given stat result, None otherwise"""
+        key = self.key(filePath)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry and entry[0] == (fileStat.st_mtime, fileStat.st_size):
+                self._entries[key] = entry # move to the end (most recent)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def set(self, filePath, fileStat, text):
+        if time.time() - fileStat.st_mtime < RACY_WINDOW:
+            return
+        key = self.key(filePath)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = ((fileStat.st_mtime, fileStat.st_size), text)
+            while len(self._entries) > self.maxEntries:
+                self._entries.popitem(last=False)
+
+    def discard(self, filePath):
+        with self._lock:
+            self._entries.pop(self.key(filePath), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Returns the counters for diagnostics"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "maxEntries": self.maxEntries}
+
+
+# managers holding cursor changes which are not written to the currents file yet
+_pendingCurrents = weakref.WeakSet()
+
+def _flushPendingCurrents():
+    """Writes the waiting cursor changes of all managers. Registered to run at interpreter exit"""
+    for manager in list(_pendingCurrents):
+        manager.flushCurrents()
+
+atexit.register(_flushPendingCurrents)
+
+
 class RootManager(object):
     """Base of all Scene Manager Command Classes"""
+    # shared between all manager instances in the session
+    _jsonCache = JsonCache()
+    # per database file locks of the scene database writes (see _databaseLock)
+    _databaseLocks = {}
+    _databaseLocksLock = threading.Lock()
+    # resolved ffmpeg executable (see checkFFMPEG)
+    _ffmpeg = None
+
     def __init__(self):
         self.currentPlatform = self.getPlatform()
         self._pathsDict={}
+        self._sceneIndex = None
+        # write-behind state of the cursor positions (see _setCurrents)
+        self._currentsLock = threading.Lock()
+        self._currentsTimer = None
+        self._currentsDirty = False
+        self._currentsWrites = 0
+        self._currentsWritesSaved = 0
         self.fpsList=["2", "3", "4", "5", "6", "8", "10", "12", "15", "16", "20",
                       "23.976", "24", "25", "29.97", "30", "40", "47.952", "48",
                       "50", "59.94", "60", "75", "80", "100", "120", "125", "150",
@@ -106,6 +203,8 @@ class RootManager(object):
     def init_paths(self, nicename):
         """Initializes all the necessary paths"""
         logger.debug("Func: init_paths")
+        # waiting cursor changes belong to the currents file of the previous paths
+        self.flushCurrents()
         # all paths in here must be absolute paths
         self._pathsDict["userSettingsDir"] = os.path.normpath(os.path.join(self.getUserDir(), "TikManager"))
         self._folderCheck(os.path.join(self._pathsDict["userSettingsDir"], nicename))
@@ -137,6 +236,8 @@ class RootManager(object):
         self._pathsDict["exportSettingsFile"] = os.path.normpath(os.path.join(self._pathsDict["masterDir"], "exportSettings.json"))
         self._pathsDict["importSettingsFile"] = os.path.normpath(os.path.join(self._pathsDict["masterDir"], "importSettings.json"))
         self._pathsDict["categoriesFile"] = os.path.normpath(os.path.join(self._pathsDict["databaseDir"], _softwarePathsDict["categoriesFile"]))
+        # sqlite locking is not reliable on network shares. Rows are keyed by absolute paths, one local file serves all projects
+        self._pathsDict["sceneIndexFile"] = os.path.normpath(os.path.join(self._pathsDict["userSettingsDir"], "sceneIndex.db"))
         self._pathsDict["previewsRoot"] = os.path.normpath(os.path.join(self._pathsDict["projectDir"], "Playblasts")) # dont change
         self._pathsDict["previewsDir"] = os.path.normpath(os.path.join(self._pathsDict["previewsRoot"], _softwarePathsDict["niceName"])) # dont change
         self._pathsDict["pbSettingsFile"] = os.path.normpath(os.path.join(self._pathsDict["previewsRoot"], _softwarePathsDict["pbSettingsFile"]))
@@ -281,6 +382,9 @@ class RootManager(object):
         self._usersDict = self.loadUsers()
         self._currentsDict = self.loadUserPrefs()
         self._subProjectsList = self.loadSubprojects()
+        self._sceneIndex = self._initSceneIndex()
+        # conversions left from the previous sessions
+        self._previewQueue().resume(self._onPreviewConverted)
 
         # unsaved DB
         self._baseScenesInCategory = []
@@ -300,11 +404,48 @@ class RootManager(object):
 
 
     def _setCurrents(self, att, newdata):
-        """Sets the database stored cursor positions and saves them to the database file"""
+        """
+        Sets the database stored cursor positions. The file write is delayed for the duration set with
+        "currentsFlushDelay" user setting and all changes within that window are written at once.
+        """
         logger.debug("Func: _setCurrents")
 
-        self._currentsDict[att] = newdata
-        self.saveUserPrefs(self._currentsDict)
+        userSettings = getattr(self, "_userSettings", None)
+        delay = userSettings.get("currentsFlushDelay", 1.0) if isinstance(userSettings, dict) else 0
+        with self._currentsLock:
+            self._currentsDict[att] = newdata
+            if self._currentsDirty:
+                # a write is already waiting, this change will go with it
+                self._currentsWritesSaved += 1
+                return
+            self._currentsDirty = True
+            if delay > 0:
+                self._currentsTimer = threading.Timer(delay, self.flushCurrents)
+                self._currentsTimer.daemon = True
+                self._currentsTimer.start()
+                _pendingCurrents.add(self)
+        if delay <= 0:
+            self.flushCurrents()
+
+    def flushCurrents(self):
+        """Writes the waiting cursor changes to the currents file. Does nothing if there is no change"""
+        logger.debug("Func: flushCurrents")
+        with self._currentsLock:
+            if self._currentsTimer:
+                self._currentsTimer.cancel()
+                self._currentsTimer = None
+            _pendingCurrents.discard(self)
+            if not self._currentsDirty:
+                return 0, ""
+            self._currentsDirty = False
+            self._currentsWrites += 1
+            return self.saveUserPrefs(self._currentsDict)
+
+    def getCurrentsStats(self):
+        """Returns the counters of the cursor position writes"""
+        return {"writes": self._currentsWrites,
+                "writesSaved": self._currentsWritesSaved,
+                "pending": self._currentsDirty}
 
     @property
     def projectDir(self):
@@ -316,6 +457,7 @@ class RootManager(object):
     def projectDir(self, path):
         """Sets the Scene Manager Project directory to given path"""
         logger.debug("Func: projectDir/setter")
+        self.flushCurrents()
         self._pathsDict["projectDir"] = path
 
     @property
@@ -698,8 +840,47 @@ class RootManager(object):
         self.scanBaseScenes()
         return self._baseScenesInCategory
 
+    def getSceneSummaries(self, deepCheck=False, nameFilter=""):
+        """
+        Collects the list information of all base scenes under the category at cursor position.
+        Each database file is loaded only once.
+        :param deepCheck: (Bool) passed to the reference check. See checkReference
+        :param nameFilter: (String) if defined, only the base scenes containing this word (case insensitive) are collected
+        :return: (Dictionary) {baseSceneName: {"DatabaseFile", "Date", "ReferenceCode",
+                                               "ReferencedVersion", "Creator", "VersionCount"}}
+        """
+        logger.debug("Func: getSceneSummaries")
+        scenes = []
+        for name, databaseFile in self.scanBaseScenes().items():
+            if nameFilter and nameFilter.lower() not in name.lower():
+                continue
+            scenes.append((name, databaseFile, self._loadSceneDatabase(databaseFile)))
+
+        digests = None
+        if deepCheck:
+            # hash all the files of the category at once on a thread pool
+            requests = []
+            for _, _, sceneInfo in scenes:
+                requests.extend(self._referenceDigestRequests(sceneInfo))
+            digests = self._fileDigests(requests)
+
+        summaries = {}
+        for name, databaseFile, sceneInfo in scenes:
+            summary = {"DatabaseFile": databaseFile,
+                       "Date": os.path.getmtime(databaseFile),
+                       "ReferenceCode": self._referenceCode(sceneInfo, deepCheck=deepCheck, digests=digests),
+                       "ReferencedVersion": None,
+                       "Creator": "",
+                       "VersionCount": 0}
+            if sceneInfo != -2:
+                summary["ReferencedVersion"] = sceneInfo["ReferencedVersion"]
+                summary["Creator"] = sceneInfo["Creator"]
+                summary["VersionCount"] = len(sceneInfo["Versions"])
+            summaries[name] = summary
+        return summaries
+
     def getVersions(self):
-        """Returns Versions List of base scene at cursor position"""
+        """Returns Versions List of base scene at cursor position. Loaded through the scene index when the cursor is set"""
         logger.debug("Func: getVersions")
         try:
             return self._currentSceneInfo["Versions"]
@@ -1027,7 +1208,8 @@ class RootManager(object):
 
         categoryDBpath = os.path.normpath(os.path.join(databaseDirAs, category))
         self._folderCheck(categoryDBpath)
-        if not (self.currentSubIndex == 0):
+        # first sub-project is the "None" entry, living directly in the category folder
+        if subProject != self._subProjectsList[0]:
             try:
                 categorySubDBpath = os.path.normpath(os.path.join(categoryDBpath, subProject)) # category name
             except IndexError:
@@ -1039,7 +1221,10 @@ class RootManager(object):
         else:
             searchDir = categoryDBpath
 
-        self._baseScenesInCategory = {self.niceName(file):file for file in glob(os.path.join(searchDir, '*.json'))}
+        baseScenes = self._sceneIndex.scanFolder(searchDir, self._loadJson) if self._sceneIndex else None
+        if baseScenes is None:
+            baseScenes = {self.niceName(file):file for file in glob(os.path.join(searchDir, '*.json'))}
+        self._baseScenesInCategory = baseScenes
         return self._baseScenesInCategory # dictionary of json files
 
     def exportTransfers(self, name, isSelection=True, isObj=True, isAlembic=True, isFbx=True, isVrayProxy=False, isRedShiftProxy=False, timeRange=[1, 10]):
@@ -1239,6 +1424,7 @@ class RootManager(object):
                 categories = []
                 for file in dbFiles:
                     dbData = self._loadJson(file)
+                    self._mergeJournal(dbData, file)
                     users += [v["User"] for v in dbData["Versions"]]
                     workstations += [v["Workstation"] for v in dbData["Versions"]]
                     categories.append(dbData["Category"])
@@ -1347,7 +1533,8 @@ User(s): {7}
         now = datetime.datetime.now().strftime("%d/%m/%Y-%H:%M")
         self._currentNotes = "%s\n[%s] on %s\n%s\n" % (self._currentNotes, self.currentUser, now, note)
         self._currentSceneInfo["Versions"][self._currentVersionIndex-1]["Note"] = self._currentNotes
-        self._dumpJson(self._currentSceneInfo, self._baseScenesInCategory[self._currentBaseSceneName])
+        self._writeSceneDatabase(self._baseScenesInCategory[self._currentBaseSceneName], self._currentSceneInfo,
+                                 versionNumber=self._currentVersionIndex, versionKeys=["Note"])
 
     def addUser(self, fullName, initials):
         """
@@ -1470,7 +1657,8 @@ User(s): {7}
             os.remove(os.path.join(self.projectDir, self._currentPreviewsDict[self._currentPreviewCamera]))
             del self._currentPreviewsDict[self._currentPreviewCamera]
             self._currentSceneInfo["Versions"][self._currentVersionIndex-1]["Preview"] = self._currentPreviewsDict
-            self._dumpJson(self._currentSceneInfo, self._baseScenesInCategory[self.currentBaseSceneName])
+            self._writeSceneDatabase(self._baseScenesInCategory[self.currentBaseSceneName], self._currentSceneInfo,
+                                     versionNumber=self._currentVersionIndex, versionKeys=["Preview"])
             logger.info("""Preview file deleted and removed from database successfully 
             Preview Name: {0}
             Path: {1}
@@ -1487,7 +1675,11 @@ User(s): {7}
         logger.debug("Func: deleteBasescene")
 
         #ADMIN ACCESS
-        jsonInfo = self._loadJson(databaseFile)
+        journalFile, compactFile = self._getJournalFiles(databaseFile)
+        # entries from now on go to a fresh journal, which is not deleted below
+        if not os.path.isfile(compactFile) and os.path.isfile(journalFile):
+            os.rename(journalFile, compactFile)
+        jsonInfo = self._loadSceneDatabase(databaseFile)
         if jsonInfo == -2:
             return -2
         # delete all version files
@@ -1520,9 +1712,13 @@ User(s): {7}
         # delete json database file
         try:
             os.remove(os.path.join(self.projectDir, databaseFile))
+            if os.path.isfile(compactFile):
+                os.remove(compactFile)
         except:
             msg = "Cannot delete scene path %s" % (databaseFile)
             self._exception(203, msg)
+        if os.path.isfile(journalFile):
+            logger.warning("Versions saved by another session during the deletion are kept in %s" % journalFile)
         msg = "all database entries and version files of %s deleted" %databaseFile
         logger.debug(msg)
         self.errorLogger(title="Deleted Base Scene", errorMessage=msg)
@@ -1537,7 +1733,7 @@ User(s): {7}
         logger.debug("Func: deleteReference")
 
         #ADMIN ACCESS
-        jsonInfo = self._loadJson(databaseFile)
+        jsonInfo = self._loadSceneDatabase(databaseFile)
         if jsonInfo == -2:
             return -2
 
@@ -1547,7 +1743,9 @@ User(s): {7}
                 os.remove(os.path.join(self.projectDir, jsonInfo["ReferenceFile"]))
                 jsonInfo["ReferenceFile"] = None
                 jsonInfo["ReferencedVersion"] = None
-                self._dumpJson(jsonInfo, databaseFile)
+                jsonInfo["ReferenceDigest"] = None
+                self._writeSceneDatabase(databaseFile, jsonInfo,
+                                         sceneKeys=["ReferenceFile", "ReferencedVersion", "ReferenceDigest"])
                 self.errorLogger(title="Deleted Reference File", errorMessage="%s deleted" %referenceFile)
             except:
                 msg = "Cannot delete reference file %s" % (jsonInfo["ReferenceFile"])
@@ -1571,45 +1769,91 @@ User(s): {7}
         referenceName = "{0}_{1}_forReference".format(self._currentSceneInfo["Name"], self._currentSceneInfo["Category"])
         relReferenceFile = os.path.join(self._currentSceneInfo["Path"], "{0}{1}".format(referenceName, extension))
         absReferenceFile = os.path.join(self.projectDir, relReferenceFile)
-        shutil.copyfile(absVersionFile, absReferenceFile)
+        self._currentSceneInfo["Versions"][self._currentVersionIndex-1]["Digest"], \
+            self._currentSceneInfo["ReferenceDigest"] = self._copyReference(absVersionFile, absReferenceFile)
         self._currentSceneInfo["ReferenceFile"] = relReferenceFile
         # SET the referenced version as the 'VISUAL INDEX NUMBER' starting from 1
         self._currentSceneInfo["ReferencedVersion"] = self._currentVersionIndex
 
-        self._dumpJson(self._currentSceneInfo, self._baseScenesInCategory[self.currentBaseSceneName])
+        self._writeSceneDatabase(self._baseScenesInCategory[self.currentBaseSceneName], self._currentSceneInfo,
+                                 versionNumber=self._currentVersionIndex, versionKeys=["Digest"],
+                                 sceneKeys=["ReferenceFile", "ReferencedVersion", "ReferenceDigest"])
 
     def saveCallback(self):
-        """Callback function to update reference files when files saved regularly"""
+        """
+        Callback function to update reference files when files saved regularly.
+        Designed to be called from the after save hooks over and over with the same manager instance,
+        it only reads the database file of the saved scene.
+        """
+        logger.debug("Func: saveCallback")
+        sceneFile = self.getSceneFile()
+        if not sceneFile:
+            return
+        self._pathsDict["sceneFile"] = sceneFile
+        sceneFile = os.path.normpath(sceneFile)
+
+        jsonFile = self._resolveDatabaseFile(sceneFile)
+        if not jsonFile:
+            # the project may be changed since the manager is created
+            self.init_paths(self.swName)
+            jsonFile = self._resolveDatabaseFile(sceneFile)
+            if not jsonFile:
+                return
 
-        ## TODO // TEST IT
-        self._pathsDict["sceneFile"] = self.getSceneFile()
+        jsonInfo = self._loadSceneDatabase(jsonFile)
+        if not jsonInfo["ReferenceFile"]:
+            return
+        # TODO : ref => Dict
+        relVersionFile = jsonInfo["Versions"][int(jsonInfo["ReferencedVersion"]) - 1]["RelativePath"]
+        absBaseSceneVersion = os.path.normpath(os.path.join(self._pathsDict["projectDir"], relVersionFile))
+        # if the refererenced scene file is the saved file (saved or saved as)
+        if os.path.normcase(sceneFile) != os.path.normcase(absBaseSceneVersion):
+            return
+        absRefFile = os.path.normpath(os.path.join(self._pathsDict["projectDir"], jsonInfo["ReferenceFile"]))
         try:
-            openSceneInfo = self.getOpenSceneInfo()
-            if not openSceneInfo:
-                return
-        except TypeError:
+            sceneStat = os.stat(sceneFile)
+            refStat = os.stat(absRefFile)
+            # links resolve to the scene file itself as long as they are intact
+            if refStat.st_size == sceneStat.st_size and refStat.st_mtime >= sceneStat.st_mtime:
+                return # already up to date
+        except OSError:
+            pass
+        # re-create the forReference file the same way it is recorded
+        strategy = (jsonInfo.get("ReferenceDigest") or {}).get("Strategy", "copy")
+        try:
+            versionDigest, referenceDigest = self._copyReference(sceneFile, absRefFile, strategy=strategy)
+            print("Scene Manager Update:\nReference File Updated")
+        except:
             return
-        if openSceneInfo["jsonFile"]:
-            jsonInfo = self._loadJson(openSceneInfo["jsonFile"])
-            if jsonInfo["ReferenceFile"]:
-                absRefFile = os.path.join(self._pathsDict["projectDir"], jsonInfo["ReferenceFile"])
-                # TODO : ref => Dict
-                absBaseSceneVersion = os.path.join(self._pathsDict["projectDir"], jsonInfo["Versions"][int(jsonInfo["ReferencedVersion"]) - 1]["RelativePath"])
-                # if the refererenced scene file is the saved file (saved or saved as)
-                if self._pathsDict["sceneFile"] == absBaseSceneVersion:
-                    # copy over the forReference file
-                    try:
-                        shutil.copyfile(self._pathsDict["sceneFile"], absRefFile)
-                        print("Scene Manager Update:\nReference File Updated")
-                    except:
-                        pass
+        # database is not written on regular saves. Keep the new digests for the reference checks
+        if self._sceneIndex and versionDigest:
+            self._sceneIndex.setDigests([(path, record["Mtime"], record["Size"], record["Algorithm"], record["Hash"])
+                                         for path, record in ((sceneFile, versionDigest), (absRefFile, referenceDigest))])
+
+    def _resolveDatabaseFile(self, sceneFile):
+        """
+        Finds the database file of the given base scene version with path arithmetic only.
+        :param sceneFile: (String) absolute path of the scene file
+        :return: (String) absolute path of the database file or None if the scene is not a base scene of the current project
+        """
+        scenesDir = os.path.normcase(self._pathsDict["scenesDir"])
+        sceneDir = os.path.dirname(sceneFile)
+        if not os.path.normcase(sceneDir).startswith(scenesDir + os.sep):
+            return None
+        # <scenesDir>/<category>/[<subProject>/]<baseName>/<version file>
+        relParts = os.path.relpath(sceneDir, self._pathsDict["scenesDir"]).split(os.sep)
+        if not 2 <= len(relParts) <= 3:
+            return None
+        jsonFile = os.path.join(self._pathsDict["databaseDir"], *relParts) + ".json"
+        return jsonFile if os.path.isfile(jsonFile) else None
 
     def checkReference(self, databaseFile, deepCheck=False):
         """
         Checks the Reference integrity of the base scene
         :param databaseFile: (String) Absolute path of the database file of the Base Scene
-        :param deepCheck: (Bool) If True, iterates an additional checksum test. May be time
-        consuming for large files or on systems with slow network speed.
+        :param deepCheck: (Bool) If True, iterates an additional checksum test. Digests recorded at
+        save time are used as long as the size and mtime of the files are unchanged. Otherwise the
+        files are read, which may be time consuming for large files or on slow networks.
         :return: Integer Codes: -2 => Error code for corrupted database file
                                 -1 => Code Red : Reference File does not exist or checksum mismatch
                                 0 => Code Yellow : No reference file found on database file
@@ -1617,21 +1861,32 @@ User(s): {7}
         """
         logger.debug("Func: checkReference")
 
-        sceneInfo = self._loadJson(databaseFile)
+        sceneInfo = self._loadSceneDatabase(databaseFile)
+        return self._referenceCode(sceneInfo, deepCheck=deepCheck)
+
+    def _referenceCode(self, sceneInfo, deepCheck=False, digests=None):
+        """
+        Returns the checkReference integer code for the already loaded scene info
+        :param digests: (Dictionary) {absolutePath: hexDigest} collected with _fileDigests. Collected
+                        for this scene only if not given
+        """
         if sceneInfo == -2:
             return -2 # Corrupted database file
         if sceneInfo["ReferenceFile"]:
-            relVersionFile = sceneInfo["Versions"][sceneInfo["ReferencedVersion"] - 1]["RelativePath"].replace("\\", "/")
-            absVersionFile = os.path.join(self.projectDir, relVersionFile)
-            relRefFile = sceneInfo["ReferenceFile"].replace("\\", "/")
-            absRefFile = os.path.join(self.projectDir, relRefFile)
+            absVersionFile, absRefFile = self._referencePaths(sceneInfo)
 
             if not os.path.isfile(absRefFile):
                 logger.info("CODE RED: Reference File does not exist")
                 return -1 # code red
             else:
                 if deepCheck:
-                    if filecmp.cmp(absVersionFile, absRefFile):
+                    if self._isLinkedReference(sceneInfo):
+                        logger.info("CODE GREEN: Everything is OK")
+                        return 1 # code Green
+                    if digests is None:
+                        digests = self._fileDigests(self._referenceDigestRequests(sceneInfo))
+                    versionDigest = digests.get(absVersionFile)
+                    if versionDigest and versionDigest == digests.get(absRefFile):
                         logger.info("CODE GREEN: Everything is OK")
                         return 1 # code Green
                     else:
@@ -1644,6 +1899,153 @@ User(s): {7}
             logger.info("CODE YELLOW: File does not have a reference copy")
             return 0 # code yellow
 
+    def _referencePaths(self, sceneInfo):
+        """Returns the absolute paths of the referenced version and the reference file of the scene info"""
+        relVersionFile = sceneInfo["Versions"][sceneInfo["ReferencedVersion"] - 1]["RelativePath"].replace("\\", "/")
+        relRefFile = sceneInfo["ReferenceFile"].replace("\\", "/")
+        return os.path.join(self.projectDir, relVersionFile), os.path.join(self.projectDir, relRefFile)
+
+    def _referenceDigestRequests(self, sceneInfo):
+        """Returns the (absolutePath, digestRecord) pairs to be hashed for the deep reference check"""
+        if sceneInfo == -2 or not sceneInfo["ReferenceFile"] or self._isLinkedReference(sceneInfo):
+            return []
+        absVersionFile, absRefFile = self._referencePaths(sceneInfo)
+        versionRecord = sceneInfo["Versions"][sceneInfo["ReferencedVersion"] - 1].get("Digest")
+        return [(absVersionFile, versionRecord), (absRefFile, sceneInfo.get("ReferenceDigest"))]
+
+    def _copyReference(self, sceneFile, referenceFile, strategy=None):
+        """
+        Creates the forReference file of the scene file with the given strategy. Copies are hashed in the same pass.
+        :param sceneFile: (String) absolute path of the version file
+        :param referenceFile: (String) absolute path of the reference file
+        :param strategy: (String) "copy", "reflink", "hardlink" or "symlink". Defaults to the "referenceStrategy"
+                        user setting. Falls back to "copy" if not supported by the platform or the file system
+        :return: (Tuple) digest records of the version file and the reference file. The reference record
+                        holds the strategy used. Links are not hashed, their version record is None
+        """
+        if strategy is None:
+            strategy = self._userSettings.get("referenceStrategy", "copy")
+        # never write into an existing reference. It may be a link to an older version file
+        if os.path.lexists(referenceFile):
+            os.remove(referenceFile)
+
+        if strategy == "hardlink":
+            try:
+                os.link(sceneFile, referenceFile)
+                return None, {"Strategy": "hardlink"}
+            except (AttributeError, OSError) as e:
+                logger.warning("Cannot hardlink the reference file (%s). Copying instead" % e)
+        elif strategy == "symlink":
+            try:
+                try:
+                    # relative links survive the different mount points of the project
+                    linkTarget = os.path.relpath(sceneFile, os.path.dirname(referenceFile))
+                except ValueError: # different drives
+                    linkTarget = sceneFile
+                os.symlink(linkTarget, referenceFile)
+                return None, {"Strategy": "symlink"}
+            except (AttributeError, NotImplementedError, OSError) as e:
+                logger.warning("Cannot symlink the reference file (%s). Copying instead" % e)
+        elif strategy == "reflink":
+            if copyEngine.cloneFile(sceneFile, referenceFile):
+                # nothing is written. Reading the just saved file is cheap
+                digest = copyEngine.fileDigest(sceneFile)
+                return self._digestRecord(sceneFile, digest), self._digestRecord(referenceFile, digest, "reflink")
+            logger.info("File system does not support cloning. Copying the reference file instead")
+
+        hasher = hashlib.new(copyEngine.HASH_NAME)
+        with open(sceneFile, "rb") as source:
+            with open(referenceFile, "wb") as target:
+                for _ in copyEngine.copyChunks(source, target, hasher=hasher):
+                    pass
+        digest = hasher.hexdigest()
+        return self._digestRecord(sceneFile, digest), self._digestRecord(referenceFile, digest, "copy")
+
+    @staticmethod
+    def _digestRecord(filePath, digest, strategy=None):
+        """
+        Returns the digest record stored on the database. Size and mtime tell if the record is still valid.
+        Files modified within the RACY_WINDOW get no valid mtime, their digest is checked by hashing.
+        """
+        fileStat = os.stat(filePath)
+        record = {"Algorithm": copyEngine.HASH_NAME,
+                  "Hash": digest,
+                  "Size": fileStat.st_size,
+                  "Mtime": fileStat.st_mtime if time.time() - fileStat.st_mtime >= RACY_WINDOW else -1}
+        if strategy:
+            record["Strategy"] = strategy
+        return record
+
+    def _isLinkedReference(self, sceneInfo):
+        """
+        Checks the hardlink or symlink reference files with a stat only
+        :return: (Bool) True if the reference file is a valid link of the referenced version
+        """
+        strategy = (sceneInfo.get("ReferenceDigest") or {}).get("Strategy")
+        if strategy not in ("hardlink", "symlink"):
+            return False
+        absVersionFile, absRefFile = self._referencePaths(sceneInfo)
+        try:
+            if strategy == "hardlink":
+                return os.path.samefile(absVersionFile, absRefFile)
+            return os.path.islink(absRefFile) and \
+                os.path.normcase(os.path.realpath(absRefFile)) == os.path.normcase(os.path.realpath(absVersionFile))
+        except (AttributeError, OSError):
+            return False
+
+    def _fileDigests(self, requests, workers=4):
+        """
+        Collects the content digests of the files. A digest record or the scene index is used if the size
+        and mtime of the file are unchanged. The rest of the files are hashed on a thread pool.
+        :param requests: (List) (absolutePath, digestRecord or None) pairs
+        :param workers: (Integer) number of files hashed at the same time
+        :return: (Dictionary) {absolutePath: hexDigest}. None for the missing or unreadable files
+        """
+        digests = {}
+        stats = {}
+        for filePath, record in requests:
+            if filePath in digests or filePath in stats:
+                continue
+            try:
+                fileStat = os.stat(filePath)
+            except OSError:
+                digests[filePath] = None
+                continue
+            if record and record.get("Algorithm") == copyEngine.HASH_NAME and \
+                    (record.get("Size"), record.get("Mtime")) == (fileStat.st_size, fileStat.st_mtime):
+                digests[filePath] = record["Hash"]
+                continue
+            cached = self._sceneIndex.getDigest(filePath, fileStat, copyEngine.HASH_NAME) if self._sceneIndex else None
+            if cached:
+                digests[filePath] = cached
+                continue
+            stats[filePath] = fileStat
+
+        toHash = list(stats.keys())
+        if len(toHash) > 1:
+            from multiprocessing.pool import ThreadPool
+            pool = ThreadPool(min(workers, len(toHash)))
+            try:
+                hashes = pool.map(self._safeDigest, toHash)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            hashes = [self._safeDigest(filePath) for filePath in toHash]
+        digests.update(zip(toHash, hashes))
+        if self._sceneIndex:
+            self._sceneIndex.setDigests([(filePath, stats[filePath].st_mtime, stats[filePath].st_size,
+                                          copyEngine.HASH_NAME, digest)
+                                         for filePath, digest in zip(toHash, hashes) if digest])
+        return digests
+
+    @staticmethod
+    def _safeDigest(filePath):
+        try:
+            return copyEngine.fileDigest(filePath)
+        except (IOError, OSError):
+            return None
+
     def errorLogger(self, title="", errorMessage=""):
         """
         Logs the error message
@@ -1819,32 +2221,75 @@ User(s): {7}
     ## -----------------------------
 
     def _loadJson(self, file):
-        """Loads the given json file"""
-        # TODO : Is it paranoid checking?
-        if os.path.isfile(file):
-            try:
+        """Loads the given json file. Unchanged files are served from the json cache"""
+        try:
+            fileStat = os.stat(file)
+        except (OSError, TypeError):
+            fileStat = None
+        if fileStat and stat.S_ISREG(fileStat.st_mode):
+            text = self._jsonCache.get(file, fileStat)
+            if text is None:
                 with open(file, 'r') as f:
-                    data = json.load(f)
-                    return data
+                    text = f.read()
+                cache = True
+            else:
+                cache = False
+            try:
+                data = json.loads(text)
             except ValueError:
                 msg = "Corrupted JSON file => %s" % file
                 # logger.error(msg)
                 self._exception(200, msg)
+                return
                 # return -2 # code for corrupted json file
+            if cache:
+                self._jsonCache.set(file, fileStat, text)
+            return data
         else:
             msg = "File cannot be found => %s" % file
             self._exception(201, msg)
 
+    def getJsonCacheStats(self):
+        """Returns hit/miss counters of the json read cache"""
+        return self._jsonCache.stats()
+
     def _dumpJson(self, data, file):
-        """Saves the data to the json file"""
+        """
+        Saves the data to the json file. Data is written to a temporary file next to the target which
+        then replaces the target at once. Readers see either the old or the new file, never a half one.
+        "compactJson" and "fsyncJson" user settings control the encoding and the disk flush.
+        """
+        userSettings = getattr(self, "_userSettings", None)
+        if not isinstance(userSettings, dict):
+            userSettings = {}
+        if userSettings.get("compactJson"):
+            content = json.dumps(data, separators=(",", ":"))
+        else:
+            content = json.dumps(data, indent=4)
+
         # name, ext = os.path.splitext(unicode(file).encode("utf-8"))
         name, ext = os.path.splitext(compat.encode(file))
-        # tempFile = ("{0}.tmp".format(name)).decode("utf-8")
-        tempFile = ("{0}.tmp".format(name))
-        with open(tempFile, "w") as f:
-            json.dump(data, f, indent=4)
-        shutil.copyfile(tempFile, file)
-        os.remove(tempFile)
+        # unique per writer, so that two threads or sessions never share the same temp file
+        tempFile = "{0}_{1}_{2}.tmp".format(name, os.getpid(), threading.current_thread().ident)
+        try:
+            with open(tempFile, "w") as f:
+                f.write(content)
+                if userSettings.get("fsyncJson"):
+                    f.flush()
+                    os.fsync(f.fileno())
+            try:
+                compat.replace(tempFile, file)
+            except OSError:
+                # target is locked by another process (windows shares). Overwrite it in place
+                shutil.copyfile(tempFile, file)
+                os.remove(tempFile)
+        except:
+            if os.path.isfile(tempFile):
+                os.remove(tempFile)
+            raise
+        self._jsonCache.discard(file)
+        if self._sceneIndex:
+            self._sceneIndex.discard(file)
 
     def loadProjectSettings(self):
         """Loads Project Settings from file"""
@@ -2019,13 +2464,188 @@ User(s): {7}
         """Returns scene info of base scene at cursor position"""
         logger.debug("Func: loadSceneInfo")
         if not asBaseScene:
-            sceneInfo = self._loadJson(self._baseScenesInCategory[self._currentBaseSceneName])
+            sceneInfo = self._loadSceneDatabase(self._baseScenesInCategory[self._currentBaseSceneName])
             if sceneInfo == -2:
                 return -2
         else:
-            sceneInfo = self._loadJson(self._baseScenesInCategory[asBaseScene])
+            sceneInfo = self._loadSceneDatabase(self._baseScenesInCategory[asBaseScene])
         return sceneInfo
 
+    def _loadSceneDatabase(self, databaseFile):
+        """
+        Loads the base scene database file. Served from the scene index if it is enabled.
+        Changes waiting in the version journal of the scene are merged on top.
+        """
+        if self._sceneIndex:
+            sceneInfo = self._sceneIndex.getSceneInfo(databaseFile, self._loadJson)
+        else:
+            sceneInfo = self._loadJson(databaseFile)
+        if isinstance(sceneInfo, dict):
+            self._mergeJournal(sceneInfo, databaseFile)
+        return sceneInfo
+
+    def _getJournalFiles(self, databaseFile):
+        """Returns the journal file and the compaction file paths of the given base scene database file"""
+        journalFile = "%s.journal" % os.path.splitext(databaseFile)[0]
+        return journalFile, "%s.compact" % journalFile
+
+    def _mergeJournal(self, sceneInfo, databaseFile):
+        """Applies the journal entries of the base scene to the given snapshot data in place"""
+        # compaction file goes first. It holds the older entries
+        for journalFile in reversed(self._getJournalFiles(databaseFile)):
+            try:
+                with open(journalFile, "r") as f:
+                    lines = f.readlines()
+            except (IOError, OSError):
+                continue
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # line of an interrupted write. Entries are independent from each other
+                    logger.warning("Skipping corrupted journal entry in %s" % journalFile)
+                    continue
+                sceneInfo.update(entry.get("SceneData", {}))
+                versionNumber = entry.get("Version")
+                if not versionNumber:
+                    continue
+                versions = sceneInfo["Versions"]
+                if versionNumber <= len(versions):
+                    versions[versionNumber-1].update(entry["VersionData"])
+                elif versionNumber == len(versions)+1:
+                    versions.append(entry["VersionData"])
+                else:
+                    logger.warning("Journal entry for missing version %s in %s" % (versionNumber, journalFile))
+
+    def _writeSceneDatabase(self, databaseFile, sceneInfo, versionNumber=None, versionKeys=None, sceneKeys=()):
+        """
+        Saves the changes made on the base scene data.
+        If the "useVersionJournal" user setting is on, only the changed fields are appended to the journal
+        of the base scene. Otherwise the whole data is written to the database file.
+        :param databaseFile: (String) absolute path of the base scene database file
+        :param sceneInfo: (Dictionary) complete scene data with the changes applied
+        :param versionNumber: (Integer) visual number (starting from 1) of the added or changed version
+        :param versionKeys: (List) changed keys of that version. None for the whole version
+        :param sceneKeys: (List) changed top level keys
+        :return: None
+        """
+        if not self._userSettings.get("useVersionJournal"):
+            self._dumpSceneDatabase(databaseFile, sceneInfo, versionNumber, versionKeys, sceneKeys)
+            return
+
+        with self._databaseLock(databaseFile):
+            self._appendSceneJournal(databaseFile, sceneInfo, versionNumber, versionKeys, sceneKeys)
+
+    def _appendSceneJournal(self, databaseFile, sceneInfo, versionNumber=None, versionKeys=None, sceneKeys=()):
+        """Appends the changed fields to the journal of the base scene. See _writeSceneDatabase"""
+        entry = {}
+        if sceneKeys:
+            entry["SceneData"] = dict((key, sceneInfo[key]) for key in sceneKeys)
+        if versionNumber:
+            versionData = sceneInfo["Versions"][versionNumber-1]
+            if versionKeys is not None:
+                versionData = dict((key, versionData[key]) for key in versionKeys)
+            entry["Version"] = versionNumber
+            entry["VersionData"] = versionData
+        if not entry:
+            return
+
+        journalFile = self._getJournalFiles(databaseFile)[0]
+        with open(journalFile, "a") as f:
+            # entries start with a line break, so a torn line left from a crash never swallows the next one
+            f.write("\n" + json.dumps(entry, separators=(",", ":")))
+            if self._userSettings.get("fsyncJson"):
+                f.flush()
+                os.fsync(f.fileno())
+            journalSize = f.tell()
+        if journalSize >= self._userSettings.get("journalCompactSize", 65536):
+            self.compactSceneJournal(databaseFile)
+
+    def _databaseLock(self, databaseFile):
+        """
+        Returns the lock of the base scene database file. Writes of the GUI and the preview queue
+        workers to the same database are serialized with it
+        """
+        key = JsonCache.key(databaseFile)
+        with self._databaseLocksLock:
+            if key not in self._databaseLocks:
+                self._databaseLocks[key] = threading.RLock()
+            return self._databaseLocks[key]
+
+    def _dumpSceneDatabase(self, databaseFile, sceneInfo, versionNumber=None, versionKeys=None, sceneKeys=()):
+        """
+        Writes the whole scene data to the database file. The described change is applied on top of the
+        current content of the file, so the changes written in the meantime (eg. converted previews
+        registered by the preview queue) are not overwritten by the data loaded before them.
+        The journal is a per user setting, so other sessions may still be appending to the journal of the
+        same base scene. Like the compaction, the journal is moved aside first, merged and only then removed.
+        Entries appended after the move go to a fresh journal and stay there.
+        """
+        with self._databaseLock(databaseFile):
+            journalFile, compactFile = self._getJournalFiles(databaseFile)
+            journal = os.path.isfile(compactFile)
+            if not journal:
+                try:
+                    os.rename(journalFile, compactFile)
+                    journal = True
+                except OSError:
+                    # no journal
+                    pass
+            described = versionNumber or sceneKeys
+            try:
+                merged = self._loadJson(databaseFile) if described else None
+            except Exception:
+                merged = None
+            if isinstance(merged, dict):
+                # current state including the entries of the other sessions, then this change on top
+                if journal:
+                    self._mergeJournal(merged, databaseFile)
+                for key in sceneKeys:
+                    merged[key] = sceneInfo[key]
+                if versionNumber:
+                    versionData = sceneInfo["Versions"][versionNumber-1]
+                    versions = merged["Versions"]
+                    if versionNumber > len(versions):
+                        versions.append(versionData)
+                    elif versionKeys is None:
+                        versions[versionNumber-1] = versionData
+                    else:
+                        versions[versionNumber-1].update(dict((key, versionData[key]) for key in versionKeys))
+                sceneInfo.clear()
+                sceneInfo.update(merged)
+            self._dumpJson(sceneInfo, databaseFile)
+            if journal:
+                os.remove(compactFile)
+
+    def compactSceneJournal(self, databaseFile):
+        """Merges the version journal of the given base scene into its database file"""
+        logger.debug("Func: compactSceneJournal")
+        with self._databaseLock(databaseFile):
+            journalFile, compactFile = self._getJournalFiles(databaseFile)
+            # entries appended after this point go to a fresh journal and stay there.
+            # An existing compaction file is left from an interrupted compaction, finish that one first
+            if not os.path.isfile(compactFile):
+                try:
+                    os.rename(journalFile, compactFile)
+                except OSError:
+                    return
+            sceneInfo = self._loadSceneDatabase(databaseFile)
+            if not isinstance(sceneInfo, dict):
+                return
+            # entries are idempotent. Fresh journal entries merged here are safe to apply once again later
+            self._dumpJson(sceneInfo, databaseFile)
+            os.remove(compactFile)
+
+    def _initSceneIndex(self):
+        """Returns the scene index object for the current software database or None if disabled"""
+        if self._sceneIndex:
+            self._sceneIndex.close()
+        if not self._userSettings.get("useSceneIndex"):
+            return None
+        return SceneIndex(self._pathsDict["sceneIndexFile"])
+
     def loadUserPrefs(self):
         """Load Last CategoryIndex, SubProject Index, User name and Access mode from file as dictionary"""
         logger.debug("Func: loadUserPrefs")
@@ -2097,6 +2717,30 @@ User(s): {7}
             try: userSettings["inheritRanges"] # safety for pre 3.1.007 version
             except KeyError:
                 userSettings["inheritRanges"] = "Ask"
+            try: userSettings["useSceneIndex"]
+            except KeyError:
+                userSettings["useSceneIndex"] = False
+            try: userSettings["currentsFlushDelay"]
+            except KeyError:
+                userSettings["currentsFlushDelay"] = 1.0
+            try: userSettings["compactJson"]
+            except KeyError:
+                userSettings["compactJson"] = False
+            try: userSettings["fsyncJson"]
+            except KeyError:
+                userSettings["fsyncJson"] = False
+            try: userSettings["useVersionJournal"]
+            except KeyError:
+                userSettings["useVersionJournal"] = False
+            try: userSettings["journalCompactSize"]
+            except KeyError:
+                userSettings["journalCompactSize"] = 65536
+            try: userSettings["transferWorkers"]
+            except KeyError:
+                userSettings["transferWorkers"] = 4
+            try: userSettings["referenceStrategy"]
+            except KeyError:
+                userSettings["referenceStrategy"] = "copy"
             if userSettings == -2:
                 return -2
         else:
@@ -2264,6 +2908,13 @@ User(s): {7}
         return platform.system()
 
     def checkFFMPEG(self):
+        """Returns the ffmpeg executable or False if it cannot be found. Resolved once per session"""
+        if not RootManager._ffmpeg:
+            # failures are not cached, ffmpeg can be installed while the session is open
+            RootManager._ffmpeg = self._findFFMPEG()
+        return RootManager._ffmpeg
+
+    def _findFFMPEG(self):
         platform = self.getPlatform()
         if platform == "Windows":
             ffmpeg = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ffmpeg.exe")
@@ -2278,8 +2929,23 @@ User(s): {7}
             except OSError:
                 return False
 
+    def _previewProfile(self, presetLUT):
+        """Returns the output list of the active conversion profile. Older LUT files fall back to a single mp4"""
+        profiles = presetLUT.get("profiles") or self._sceneManagerDefaults["defaultConversionLUT"].get("profiles", {})
+        outputs = profiles.get(presetLUT.get("profile", "mp4"))
+        if not outputs:
+            return [{"suffix": "", "type": "video"}]
+        return outputs
 
-    def _convertPreview(self, sourceFile, overwrite=True, deleteAfter=False, crf=None):
+    def _previewCommand(self, sourceFile, crf=None):
+        """
+        Prepares the ffmpeg command converting the given preview file with the active conversion profile.
+        All outputs of the profile are produced from a single decode of the source, splitting the
+        decoded frames in the filter graph.
+        :param sourceFile: (String) video file or a single member of an image sequence
+        :param crf: (Integer) compression value overriding the conversion LUT
+        :return: (List) command, (OrderedDict) {suffix: output file}, (List) source files. None if not convertible
+        """
         # abort if system is not supported or converter exe is missing
         compatibleVideos = [".avi", ".mov", ".mp4", ".flv", ".webm", ".mkv", ".mp4"]
         compatibleImages = [".tga", ".jpg", ".exr", ".png", ".pic"]
@@ -2295,47 +2961,396 @@ User(s): {7}
         # if the compression value passed, override the LUT dictionary with that value
         if crf:
             presetLUT["compression"] = "-crf %s" %crf
-        # set output file
         base, ext = os.path.splitext(sourceFile)
-        outputFile = "%s.mp4" %(base)
-        # deal with the existing output
-        if os.path.isfile(outputFile):
-            if overwrite:
-                os.remove(outputFile)
-            else:
-                self._info("Target path already exists. Aborting")
-                return False
 
         if ext in compatibleVideos:
             flagStart = ["%s" %ffmpeg, "-i", sourceFile]
+            sourceFiles = [sourceFile]
+            frameCount = None
 
         elif ext in compatibleImages:
             filename, startFrame, sourceSequence = self._formatImageSeq(sourceFile)
             flagStart = ["%s" %ffmpeg, '-start_number', str(startFrame), '-i', filename]
             presetLUT["audioCodec"] = ""
+            rootPath = os.path.split(os.path.normpath(sourceFile))[0]
+            sourceFiles = [os.path.join(rootPath, str(x)) for x in sourceSequence]
+            frameCount = len(sourceSequence)
+        else:
+            self._info("Unsupported preview format %s" %ext)
+            return
+
+        # the -vf filters of the LUT (eg. foolproof) are applied once, before the split
+        commonFilters = []
+        outputFlags = []
+        for key in ["resolution", "foolproof"]:
+            flags = presetLUT.get(key, "").split()
+            while "-vf" in flags:
+                index = flags.index("-vf")
+                commonFilters.append(flags[index+1])
+                del flags[index:index+2]
+            outputFlags += flags
+        videoFlags = presetLUT["videoCodec"].split() + presetLUT["compression"].split() + outputFlags
+        audioFlags = ["-map", "0:a?"] + presetLUT["audioCodec"].split() if presetLUT["audioCodec"] else ["-an"]
+
+        outputs = self._previewProfile(presetLUT)
+        graph = ["[0:v]%s%ssplit=%s%s" %(",".join(commonFilters), "," if commonFilters else "", len(outputs),
+                                         "".join("[s%s]" %i for i in range(len(outputs))))]
+        outputFiles = OrderedDict()
+        outputFlagList = []
+        for i, output in enumerate(outputs):
+            outputType = output.get("type", "video")
+            if outputType == "video":
+                scale = output.get("scale")
+                chain = "scale=trunc(iw*%s/2)*2:trunc(ih*%s/2)*2" %(scale, scale) if scale else "null"
+                flags = videoFlags + audioFlags
+                outputFile = "%s%s.mp4" %(base, output.get("suffix", ""))
+            elif outputType == "poster":
+                chain = "select=eq(n\\,%s)" %output.get("frame", 0)
+                flags = ["-frames:v", "1", "-q:v", "2", "-an"]
+                outputFile = "%s%s.jpg" %(base, output.get("suffix", ""))
+            elif outputType == "strip":
+                tiles = output.get("tiles", 8)
+                # evenly spread on the sequences. Videos are not probed, the step comes from the profile
+                step = max(1, frameCount // tiles) if frameCount else output.get("step", 12)
+                chain = "select=not(mod(n\\,%s)),scale=%s:-2,tile=%sx1" %(step, output.get("width", 160), tiles)
+                flags = ["-frames:v", "1", "-q:v", "2", "-an"]
+                outputFile = "%s%s.jpg" %(base, output.get("suffix", ""))
+            else:
+                self._info("Unknown preview output type %s" %outputType)
+                return
+            graph.append("[s%s]%s[o%s]" %(i, chain, i))
+            outputFlagList += ["-map", "[o%s]" %i] + flags + [str(outputFile)]
+            outputFiles[output.get("suffix", "")] = outputFile
+
+        fullFlagList = flagStart + ["-filter_complex", ";".join(graph)] + outputFlagList
+        return fullFlagList, outputFiles, sourceFiles
 
-        fullFlagList = flagStart + \
-                       presetLUT["videoCodec"].split() + \
-                       presetLUT["compression"].split() + \
-                       presetLUT["audioCodec"].split() + \
-                       presetLUT["resolution"].split() + \
-                       presetLUT["foolproof"].split() + \
-                       [str(outputFile)]
+    def _convertPreview(self, sourceFile, overwrite=True, deleteAfter=False, crf=None):
+        """
+        Converts the preview file with the active conversion profile and waits for it.
+        See _queuePreviewConversion for the background version
+        :return: (String) the main (first) output of the profile
+        """
+        command = self._previewCommand(sourceFile, crf=crf)
+        if not command:
+            return
+        fullFlagList, outputFiles, sourceFiles = command
+        # deal with the existing output
+        for outputFile in outputFiles.values():
+            if os.path.isfile(outputFile):
+                if overwrite:
+                    os.remove(outputFile)
+                else:
+                    self._info("Target path already exists. Aborting")
+                    return False
 
         if self.currentPlatform == "Windows":
             subprocess.check_call(fullFlagList, shell=False)
         else:
             subprocess.check_call(fullFlagList)
         if deleteAfter:
-            if ext in compatibleImages:
-                rootPath = os.path.split(os.path.normpath(sourceFile))[0]
-                for x in sourceSequence:
-                    imageP = os.path.join(rootPath, str(x))
-                    os.remove(imageP)
+            for x in sourceFiles:
+                os.remove(x)
+        return list(outputFiles.values())[0]
+
+    def _previewQueue(self):
+        """Returns the preview conversion queue of the session"""
+        return previewQueue.getQueue(os.path.join(self._pathsDict["userSettingsDir"], "previewQueue"))
+
+    def takePreviewFailures(self):
+        """
+        Returns the background preview conversions failed since the last call
+        :return: (List) messages naming the version, the previews and the reason
+        """
+        if not self._pathsDict.get("userSettingsDir"):
+            return []
+        return ["%s (%s)\n%s" % (os.path.basename(job.get("RelativePath", "")), ", ".join(sorted(job.get("Previews", {}))), message)
+                for job, message in self._previewQueue().takeFailures()]
+
+    def _queuePreviewConversion(self, sourceFile, databaseFile, relVersionName, previewName, projectPath=None, deleteAfter=False, crf=None, play=False):
+        """
+        Converts the preview file in the background and writes the outputs into the "Preview" entry of the version
+        when it is done. Returns immediately. The unconverted file should be registered as the preview until then.
+        Every output of the conversion profile is registered with its suffix appended to the preview name
+        (eg. "persp", "persp_proxy", "persp_poster")
+        :param sourceFile: (String) video file or a single member of an image sequence
+        :param databaseFile: (String) absolute path of the base scene database file
+        :param relVersionName: (String) relative path of the version scene file
+        :param previewName: (String) key of the preview (camera name)
+        :param projectPath: (String) project of the scene. Defaults to the current project
+        :param deleteAfter: (Boolean) deletes the source files after a successful conversion
+        :param crf: (Integer) compression value overriding the conversion LUT
+        :param play: (Boolean) plays the main output when it is ready
+        :return: (String) absolute path of the main output to come. None if the file cannot be converted
+        """
+        command = self._previewCommand(sourceFile, crf=crf)
+        if not command:
+            return
+        fullFlagList, outputFiles, sourceFiles = command
+        mainOutput = list(outputFiles.values())[0]
+        projectPath = projectPath or self.projectDir
+        job = {"Command": fullFlagList,
+               "Outputs": list(outputFiles.values()),
+               "DeleteFiles": sourceFiles if deleteAfter else [],
+               "DatabaseFile": databaseFile,
+               "RelativePath": relVersionName,
+               "Previews": dict(("%s%s" %(previewName, suffix), os.path.relpath(outputFile, start=projectPath))
+                                for suffix, outputFile in outputFiles.items()),
+               "Play": mainOutput if play else None}
+        self._previewQueue().submit(job, self._onPreviewConverted)
+        return mainOutput
+
+    def _onPreviewConverted(self, job):
+        """Registers the converted previews to their version. Called from the preview queue workers"""
+        logger.debug("Func: _onPreviewConverted")
+        # the GUI thread may be writing the same database. Nothing can slip between the load and the write
+        with self._databaseLock(job["DatabaseFile"]):
+            sceneInfo = self._loadSceneDatabase(job["DatabaseFile"])
+            if not isinstance(sceneInfo, dict):
+                raise Exception("Cannot read the database file %s" % job["DatabaseFile"])
+            versionNumber = None
+            for number, version in enumerate(sceneInfo["Versions"], 1):
+                if job["RelativePath"].replace("/", "\\") == version["RelativePath"].replace("/", "\\"):
+                    version["Preview"].update(job["Previews"])
+                    versionNumber = number
+            if not versionNumber:
+                # version is deleted in the meantime
+                return
+            self._writeSceneDatabase(job["DatabaseFile"], sceneInfo, versionNumber=versionNumber, versionKeys=["Preview"])
+        if job.get("Play"):
+            self.executeFile(job["Play"])
+
+    def createReviewReel(self, categoryAs=None, subProjectAs=None, outputFile=None, referenced=False, previewName=None, workers=2):
+        """
+        Stitches the latest preview of every base scene in the category into a single review reel.
+        Clips matching the reel format are joined with the ffmpeg concat demuxer without re-encoding.
+        Only the clips with a different codec, H.264 profile or level, resolution, frame rate, time base or audio layout
+        are converted first.
+        :param categoryAs: (String) category of the base scenes. Defaults to the category at cursor position
+        :param subProjectAs: (String or Integer) sub-project name or index. Defaults to the one at cursor position
+        :param outputFile: (String) absolute path of the reel. Defaults to a time stamped file in the previews folder
+        :param referenced: (Boolean) if True, the preview of the referenced version is used instead of the latest one
+        :param previewName: (String) preview (camera) to use. Defaults to the first video preview of the version
+        :param workers: (Integer) number of clips converted at the same time
+        :return: (String) absolute path of the reel or None if there is nothing to stitch
+        """
+        logger.debug("Func: createReviewReel")
+        ffmpeg = self.checkFFMPEG()
+        if not ffmpeg:
+            self._exception(201, "Cannot find ffmpeg")
+            return
+
+        category = categoryAs or self._categories[self.currentTabIndex]
+        subProject = subProjectAs if subProjectAs is not None else self.subProject
+        if type(subProject) == int:
+            subProject = self._subProjectsList[subProject]
+        # do not disturb the base scene list at cursor position
+        baseScenesInCategory = self._baseScenesInCategory
+        try:
+            baseScenes = self.scanBaseScenes(categoryAs=category, subProjectAs=subProject)
+        finally:
+            self._baseScenesInCategory = baseScenesInCategory
+
+        clips = []
+        for name in sorted(baseScenes):
+            clip = self._reelClip(self._loadSceneDatabase(baseScenes[name]), referenced, previewName)
+            if clip:
+                clips.append(clip)
             else:
-                os.remove(sourceFile)
+                logger.warning("No video preview found for %s. Skipping" % name)
+        if not clips:
+            self._info("There are no previews to stitch")
+            return
+
+        pool = None
+        if len(clips) > 1:
+            from multiprocessing.pool import ThreadPool
+            pool = ThreadPool(min(workers, len(clips)))
+        try:
+            probes = pool.map(self._probePreview, clips) if pool else [self._probePreview(clips[0])]
+            target = self._reelFormat(probes)
+
+            tempDir = tempfile.mkdtemp(prefix="reviewReel_")
+            try:
+                reelClips = []
+                conversions = []
+                for index, (clip, probe) in enumerate(zip(clips, probes)):
+                    if probe == target:
+                        reelClips.append(clip)
+                        continue
+                    convertedClip = os.path.join(tempDir, "clip_%04d.mp4" % index)
+                    conversions.append(self._reelConversionCommand(clip, probe, target, convertedClip))
+                    reelClips.append(convertedClip)
+                logger.info("Review reel: %s clips copied, %s converted" % (len(clips) - len(conversions), len(conversions)))
+                if pool:
+                    pool.map(self._callFFMPEG, conversions)
+                else:
+                    for command in conversions:
+                        self._callFFMPEG(command)
+
+                listFile = os.path.join(tempDir, "clips.txt")
+                with open(listFile, "w") as f:
+                    for clip in reelClips:
+                        f.write("file '%s'\n" % clip.replace("\\", "/").replace("'", "'\\''"))
+
+                if not outputFile:
+                    reelDir = os.path.join(self._pathsDict["previewsDir"], category)
+                    if subProject != self._subProjectsList[0]:
+                        reelDir = os.path.join(reelDir, subProject)
+                    self._folderCheck(reelDir)
+                    outputFile = os.path.join(reelDir, "reviewReel_%s.mp4" % datetime.datetime.now().strftime("%y%m%d_%H%M%S"))
+                if os.path.isfile(outputFile):
+                    os.remove(outputFile)
+                self._callFFMPEG([ffmpeg, "-hide_banner", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                                  "-i", listFile, "-c", "copy", "-movflags", "+faststart", outputFile])
+            finally:
+                shutil.rmtree(tempDir, ignore_errors=True)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
         return outputFile
 
+    def _reelClip(self, sceneInfo, referenced, previewName):
+        """Returns the absolute path of the video preview to use from the base scene or None"""
+        if not isinstance(sceneInfo, dict) or not sceneInfo["Versions"]:
+            return None
+        if referenced:
+            if not sceneInfo["ReferencedVersion"]:
+                return None
+            versions = [sceneInfo["Versions"][sceneInfo["ReferencedVersion"] - 1]]
+        else:
+            # latest version having a preview
+            versions = reversed(sceneInfo["Versions"])
+        videoFormats = [".avi", ".mp4", ".mov", ".mkv"]
+        for version in versions:
+            previews = version.get("Preview", {})
+            names = [previewName] if previewName else sorted(previews)
+            for name in names:
+                relPath = previews.get(name)
+                if not relPath or os.path.splitext(relPath)[1].lower() not in videoFormats:
+                    continue
+                absPath = os.path.normpath(os.path.join(self.projectDir, relPath.replace("\\", "/")))
+                if os.path.isfile(absPath):
+                    return absPath
+        return None
+
+    def _noWindowFlags(self):
+        """Returns the subprocess keyword arguments keeping ffmpeg from opening a console window on windows"""
+        return {"creationflags": previewQueue.CREATE_NO_WINDOW} if os.name == "nt" else {}
+
+    def _callFFMPEG(self, command):
+        """Runs the ffmpeg command without a console window. Raises CalledProcessError if it fails"""
+        subprocess.check_call(command, **self._noWindowFlags())
+
+    def _probePreview(self, filePath):
+        """
+        Reads the stream layout of the video file from the ffmpeg header dump. ffprobe is not shipped with ffmpeg.exe
+        :return: (Tuple) (videoCodec, profile, level, pixelFormat, width, height, fps, timeBase,
+                            audioCodec, sampleRate, channelLayout)
+        """
+        process = subprocess.Popen([self.checkFFMPEG(), "-hide_banner", "-i", filePath],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, **self._noWindowFlags())
+        header = process.communicate()[1].decode("utf-8", "replace")
+        video = re.search(r"Stream #\d+:\d+.*?: Video: (\w+)(?: \(([^)]*)\))?[^,]*, (\w+).*?, (\d+)x(\d+).*?, ([\d.]+) (?:fps|tbr)(?:.*?, ([\d.]+k?) tbn)?", header)
+        audio = re.search(r"Stream #\d+:\d+.*?: Audio: (\w+)[^,]*, (\d+) Hz, ([^,\s]+)", header)
+        if video:
+            codec, profile, pixelFormat, width, height, fps, timeBase = video.groups()
+            if codec == "h264":
+                # the level is not in the header dump
+                level = self._readAvcLevel(filePath)
+            else:
+                # parenthesis is the codec tag, not a profile
+                profile = level = None
+            video = (codec, profile, level, pixelFormat, width, height, fps, timeBase)
+        else:
+            video = (None,) * 8
+        return video + (audio.groups() if audio else (None,) * 3)
+
+    def _readAvcLevel(self, filePath):
+        """
+        Returns the H.264 level (eg. "4.0") from the avcC record of the mp4 or mov file. None for the other containers
+        """
+        try:
+            with open(filePath, "rb") as f:
+                fileSize = os.fstat(f.fileno()).st_size
+                offset = 0
+                # top level atoms. moov may be at the end of the file if it is not written with faststart
+                while offset + 8 <= fileSize:
+                    f.seek(offset)
+                    atomSize, atomType = struct.unpack(">I4s", f.read(8))
+                    headerSize = 8
+                    if atomSize == 1:
+                        atomSize = struct.unpack(">Q", f.read(8))[0]
+                        headerSize = 16
+                    elif atomSize == 0:
+                        atomSize = fileSize - offset
+                    if atomSize < headerSize:
+                        return None
+                    if atomType == b"moov":
+                        data = bytearray(f.read(atomSize - headerSize))
+                        index = data.find(b"avcC")
+                        # version, profile, profile compatibility, level
+                        if index == -1 or index + 8 > len(data):
+                            return None
+                        return "%.1f" % (data[index + 7] / 10.0)
+                    offset += atomSize
+        except (IOError, OSError, struct.error):
+            pass
+        return None
+
+    def _reelFormat(self, probes):
+        """
+        Returns the format the reel is stitched in. Resolution, frame rate and audio (or no audio) follow the majority
+        of the clips.
+        H.264 profile, level and time base follow the majority of the clips which are already in the reel format,
+        so they can be joined without re-encoding
+        """
+        def majority(values):
+            values = [value for value in values if value[0] is not None]
+            return max(set(values), key=values.count) if values else None
+        picture = majority([(probe[4], probe[5], probe[6]) for probe in probes]) or ("1920", "1080", "25")
+        # everything is converted to the codec of the conversion LUT (h264 yuv420p by default)
+        stream = majority([(probe[1], probe[2], probe[7]) for probe in probes
+                           if (probe[0], probe[3]) + probe[4:7] == ("h264", "yuv420p") + picture]) or (None, None, None)
+        # silent clips vote too. If most clips are silent the reel has no audio and they are joined as they are
+        audioVotes = [(probe[9], probe[10]) if probe[8] else (None, None) for probe in probes]
+        audio = max(set(audioVotes), key=audioVotes.count) if audioVotes else (None, None)
+        return (("h264",) + stream[:2] + ("yuv420p",) + picture + stream[2:] +
+                (("aac",) + audio if audio[0] else (None, None, None)))
+
+    def _reelConversionCommand(self, clip, probe, target, outputFile):
+        """Returns the ffmpeg command converting the clip to the reel format"""
+        presetLUT = self.loadConversionLUT()
+        profile, level = target[1:3]
+        width, height, fps, timeBase = target[4:8]
+        command = [self.checkFFMPEG(), "-hide_banner", "-loglevel", "error", "-y", "-i", clip]
+        if target[8] and not probe[8]:
+            # silent track, so the audio layout of the reel stays the same for every clip
+            command += ["-f", "lavfi", "-i", "anullsrc=channel_layout=%s:sample_rate=%s" % (target[10], target[9]),
+                        "-map", "0:v:0", "-map", "1:a:0", "-shortest"]
+        command += ["-vf", "scale=%s:%s:force_original_aspect_ratio=decrease,pad=%s:%s:(ow-iw)/2:(oh-ih)/2,setsar=1,fps=%s"
+                    % (width, height, width, height, fps)]
+        videoFlags = presetLUT["videoCodec"].split() + presetLUT["compression"].split()
+        command += videoFlags if "-pix_fmt" in videoFlags else videoFlags + ["-pix_fmt", "yuv420p"]
+        # same stream parameters with the clips joined as they are
+        profileFlag = {"Constrained Baseline": "baseline", "Baseline": "baseline", "Main": "main", "High": "high"}.get(profile)
+        if profileFlag:
+            command += ["-profile:v", profileFlag]
+        if level:
+            command += ["-level", level]
+        if timeBase:
+            timeScale = int(float(timeBase[:-1]) * 1000) if timeBase.endswith("k") else int(float(timeBase))
+            command += ["-video_track_timescale", str(timeScale)]
+        if target[8]:
+            command += presetLUT["audioCodec"].split() + ["-ar", target[9]]
+            channels = {"mono": "1", "stereo": "2"}.get(target[10])
+            if channels:
+                command += ["-ac", channels]
+        else:
+            command += ["-an"]
+        return command + [outputFile]
+
     def _formatImageSeq(self, filePath):
         """
         Checks the path if it belongs to a sequence and formats it ready to be passes to FFMPEG
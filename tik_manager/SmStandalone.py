@@ -335,6 +335,7 @@ class StandaloneManager(RootManager):
 
     def init_paths(self, nicename):
         """Overriden function"""
+        self.flushCurrents()
 
         self._pathsDict["userSettingsDir"] = os.path.normpath(os.path.join(self.getUserDir(), "TikManager"))
         self._folderCheck(os.path.join(self._pathsDict["userSettingsDir"], nicename))
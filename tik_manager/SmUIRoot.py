@@ -219,6 +219,12 @@ class MainUI(QtWidgets.QMainWindow):
 
         self.superUser = False
 
+        # background preview conversions fail on worker threads. Their failures are polled from here
+        self._previewFailureTimer = QtCore.QTimer(self)
+        self._previewFailureTimer.setInterval(2000)
+        self._previewFailureTimer.timeout.connect(self.showPreviewFailures)
+        self._previewFailureTimer.start()
+
     def buildUI(self):
         self.setObjectName(self.windowName)
         self.resize(680, 620)
@@ -1990,6 +1996,12 @@ class MainUI(QtWidgets.QMainWindow):
             if extra_versionCount_cb.isChecked():
                 newExtraColumns.append("Version Count")
             userSettings["extraColumns"] = newExtraColumns
+            userSettings["useSceneIndex"] = sceneIndex_cb.isChecked()
+            userSettings["compactJson"] = compactJson_cb.isChecked()
+            userSettings["fsyncJson"] = fsyncJson_cb.isChecked()
+            userSettings["useVersionJournal"] = versionJournal_cb.isChecked()
+            userSettings["transferWorkers"] = transferWorkers_sb.value()
+            userSettings["referenceStrategy"] = referenceStrategy_combo.currentText()
 
             # enteredPath = os.path.normpath(unicode(commonDir_lineEdit.text()).encode("utf-8"))
             enteredPath = os.path.normpath(compat.encode(commonDir_lineEdit.text()))
@@ -2075,6 +2087,54 @@ class MainUI(QtWidgets.QMainWindow):
 
         userSettings_formLayout.setLayout(row, QtWidgets.QFormLayout.FieldRole, extraColumns_layout)
 
+        row += 1
+        sceneIndex_label = QtWidgets.QLabel(text="Scene Index:")
+        userSettings_formLayout.setWidget(row, QtWidgets.QFormLayout.LabelRole, sceneIndex_label)
+        sceneIndex_cb = QtWidgets.QCheckBox(text="Use Scene Index")
+        sceneIndex_cb.setToolTip("Keeps the base scene information in a local index file (~/TikManager/sceneIndex.db).\nThe index is a per machine cache of the project databases and can be deleted at any time.\nRecommended for projects with crowded categories on slow networks")
+        sceneIndex_cb.setChecked(bool(userSettings.get("useSceneIndex")))
+        userSettings_formLayout.setWidget(row, QtWidgets.QFormLayout.FieldRole, sceneIndex_cb)
+
+        row += 1
+        databaseFiles_label = QtWidgets.QLabel(text="Database Files:")
+        userSettings_formLayout.setWidget(row, QtWidgets.QFormLayout.LabelRole, databaseFiles_label)
+        databaseFiles_layout = QtWidgets.QHBoxLayout()
+        compactJson_cb = QtWidgets.QCheckBox(text="Compact")
+        compactJson_cb.setToolTip("Writes the database files without indentation.\nSmaller files and faster saves for the base scenes with many versions")
+        compactJson_cb.setChecked(bool(userSettings.get("compactJson")))
+        databaseFiles_layout.addWidget(compactJson_cb)
+        fsyncJson_cb = QtWidgets.QCheckBox(text="Flush to Disk")
+        fsyncJson_cb.setToolTip("Waits until the database files are physically written before continuing.\nSafer against crashes and power cuts, slower on network drives")
+        fsyncJson_cb.setChecked(bool(userSettings.get("fsyncJson")))
+        databaseFiles_layout.addWidget(fsyncJson_cb)
+        versionJournal_cb = QtWidgets.QCheckBox(text="Version Journal")
+        versionJournal_cb.setToolTip("Appends new versions and edits to a small journal file next to the base scene database\ninstead of writing the whole database file on every save.\nJournals are merged into the database files automatically")
+        versionJournal_cb.setChecked(bool(userSettings.get("useVersionJournal")))
+        databaseFiles_layout.addWidget(versionJournal_cb)
+        userSettings_formLayout.setLayout(row, QtWidgets.QFormLayout.FieldRole, databaseFiles_layout)
+
+        row += 1
+        transferWorkers_label = QtWidgets.QLabel(text="Sequence Transfers:")
+        userSettings_formLayout.setWidget(row, QtWidgets.QFormLayout.LabelRole, transferWorkers_label)
+        transferWorkers_sb = QtWidgets.QSpinBox(minimum=1, maximum=32, minimumWidth=(65))
+        transferWorkers_sb.setValue(userSettings.get("transferWorkers", 4))
+        transferWorkers_sb.setToolTip("Number of files copied at the same time by the Image Viewer transfers.\nHigher values use the bandwidth of fast networks better.\nTransfers to local disks always use a single worker")
+        userSettings_formLayout.setWidget(row, QtWidgets.QFormLayout.FieldRole, transferWorkers_sb)
+
+        row += 1
+        referenceStrategy_label = QtWidgets.QLabel(text="Reference Files:")
+        userSettings_formLayout.setWidget(row, QtWidgets.QFormLayout.LabelRole, referenceStrategy_label)
+        referenceStrategy_combo = QtWidgets.QComboBox()
+        referenceStrategy_combo.addItems(["copy", "reflink", "hardlink", "symlink"])
+        referenceStrategy_combo.setCurrentText(userSettings.get("referenceStrategy", "copy"))
+        referenceStrategy_combo.setToolTip("How the forReference files are created.\n"
+                                           "copy: independent copy of the version\n"
+                                           "reflink: copy on write clone, no extra space on file systems supporting it (eg. btrfs, XFS)\n"
+                                           "hardlink: same file under two names, no extra space or write traffic\n"
+                                           "symlink: link pointing to the version file\n"
+                                           "Falls back to copy where the chosen method is not supported")
+        userSettings_formLayout.setWidget(row, QtWidgets.QFormLayout.FieldRole, referenceStrategy_combo)
+
 
         # form item 3 - Common Settings Directory
         row += 1
@@ -2310,6 +2370,12 @@ class MainUI(QtWidgets.QMainWindow):
         extra_ref_cb.stateChanged.connect(updateDictionary)
         extra_creator_cb.stateChanged.connect(updateDictionary)
         extra_versionCount_cb.stateChanged.connect(updateDictionary)
+        sceneIndex_cb.stateChanged.connect(updateDictionary)
+        compactJson_cb.stateChanged.connect(updateDictionary)
+        fsyncJson_cb.stateChanged.connect(updateDictionary)
+        versionJournal_cb.stateChanged.connect(updateDictionary)
+        transferWorkers_sb.valueChanged.connect(updateDictionary)
+        referenceStrategy_combo.currentIndexChanged.connect(updateDictionary)
         localFavorites_radiobutton.clicked.connect(updateDictionary)
         commonDir_lineEdit.editingFinished.connect(updateDictionary)
 
@@ -5140,7 +5206,7 @@ class MainUI(QtWidgets.QMainWindow):
             if not sceneInfo:
                 return
             jsonFile = sceneInfo["jsonFile"]
-            jsonInfo = self.manager._loadJson(jsonFile)
+            jsonInfo = self.manager._loadSceneDatabase(jsonFile)
 
             currentVersion = len(jsonInfo["Versions"]) + 1
             ## Naming Dictionary
@@ -5354,7 +5420,7 @@ class MainUI(QtWidgets.QMainWindow):
             if not sceneInfo:
                 return
             jsonFile = sceneInfo["jsonFile"]
-            jsonInfo = self.manager._loadJson(jsonFile)
+            jsonInfo = self.manager._loadSceneDatabase(jsonFile)
 
             currentVersion = len(jsonInfo["Versions"]) + 1
             ## Naming Dictionary
@@ -5504,6 +5570,24 @@ class MainUI(QtWidgets.QMainWindow):
         # self._vEnableDisable()
         self.onModeChange()
 
+    def showPreviewFailures(self):
+        """Tells the user about the failed background preview conversions"""
+        manager = getattr(self, "manager", None)
+        if not manager:
+            return
+        failures = manager.takePreviewFailures()
+        if failures:
+            self.infoPop(textTitle="Preview Conversion", textHeader="%s preview conversion(s) failed" % len(failures),
+                         textInfo="\n\n".join(failures), type="C")
+
+    def closeEvent(self, event):
+        self._previewFailureTimer.stop()
+        # cursor changes are written with a delay. Make sure nothing is waiting when the window is gone
+        for manager in set([self.manager, self._getManager()]):
+            if manager:
+                manager.flushCurrents()
+        super(MainUI, self).closeEvent(event)
+
     def refresh(self):
         # currentUserIndex = self.user_comboBox.currentIndex()
         # currentTabIndex = self
@@ -5800,16 +5884,13 @@ class MainUI(QtWidgets.QMainWindow):
         header = self.scenes_listWidget.headerItem()
         columnCount = header.columnCount()
         extraColumns = [header.text(x) for x in range(1, columnCount)]
-        baseScenesDict = manager.getBaseScenesInCategory()
         filter_word = self.scene_filter_lineEdit.text()
-        if filter_word:
-            baseScenesDict = dict(filter(lambda elem: filter_word.lower() in elem[0].lower(), baseScenesDict.items()))
 
         if self.reference_radioButton.isChecked():
-            for key in baseScenesDict:
-                if manager.checkReference(baseScenesDict[key]) == 1:
-                    timestamp = os.path.getmtime(baseScenesDict[key])
-                    timestampFormatted = datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+            summariesDict = manager.getSceneSummaries(nameFilter=filter_word)
+            for key, summary in summariesDict.items():
+                if summary["ReferenceCode"] == 1:
+                    timestampFormatted = datetime.datetime.fromtimestamp(summary["Date"]).strftime("%Y-%m-%d %H:%M:%S")
                     item = QtWidgets.QTreeWidgetItem(self.scenes_listWidget, [key, str(timestampFormatted)])
 
         else:
@@ -5818,41 +5899,22 @@ class MainUI(QtWidgets.QMainWindow):
                         0: QtGui.QColor(255, 255, 0, 255),
                         -2: QtGui.QColor(20, 20, 20, 255)}  # dictionary for color codes red, green, yellow
 
-            for key in baseScenesDict:
-                retCode = manager.checkReference(baseScenesDict[key],
-                                                 deepCheck=deepCheck)  # returns -1, 0 or 1 for color ref
-                color = codeDict[retCode]
-                # timestamp = os.path.getmtime(baseScenesDict[key])
-                # timestampFormatted = datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-                # item = QtWidgets.QTreeWidgetItem(self.scenes_listWidget, [key, str(timestampFormatted), str(34)])
+            summariesDict = manager.getSceneSummaries(deepCheck=deepCheck, nameFilter=filter_word)
+            for key, summary in summariesDict.items():
+                color = codeDict[summary["ReferenceCode"]]
 
                 columnData = [key]
                 if "Date" in extraColumns:
-                    timestamp = os.path.getmtime(baseScenesDict[key])
-                    timestampFormatted = datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+                    timestampFormatted = datetime.datetime.fromtimestamp(summary["Date"]).strftime("%Y-%m-%d %H:%M:%S")
                     columnData.append(timestampFormatted)
-
-                if "Ref. Version" in extraColumns or "Creator" in extraColumns or "Version Count" in extraColumns:
-                    manager.getBaseScenesInCategory()
-                    sInfo = manager.loadSceneInfo(asBaseScene=key)
-                    if 'Ref. Version' in extraColumns:
-                        refVersion = sInfo["ReferencedVersion"]
-                        refVersion = "" if not refVersion else str(refVersion)
-                        columnData.append(refVersion)
-                    if "Creator" in extraColumns:
-                        creator = sInfo["Creator"]
-                        columnData.append(creator)
-                    if "Version Count" in extraColumns:
-                        vCount = str(len(sInfo["Versions"]))
-                        columnData.append(vCount)
-
-                # if 'Ref. Version' in extraColumns:
-                #     manager.getBaseScenesInCategory()
-                #     refVersion = (manager.loadSceneInfo(asBaseScene=key)["ReferencedVersion"])
-                #     refVersion = "" if not refVersion else str(refVersion)
-                #     columnData.append(refVersion)
-
-
+                if 'Ref. Version' in extraColumns:
+                    refVersion = summary["ReferencedVersion"]
+                    refVersion = "" if not refVersion else str(refVersion)
+                    columnData.append(refVersion)
+                if "Creator" in extraColumns:
+                    columnData.append(summary["Creator"])
+                if "Version Count" in extraColumns:
+                    columnData.append(str(summary["VersionCount"]))
 
                 item = QtWidgets.QTreeWidgetItem(self.scenes_listWidget, columnData)
 
@@ -150,8 +150,14 @@ import shutil
 # import re
 
 import datetime
+import time
+import hashlib
+import math
+import threading
+from collections import OrderedDict
 
 from tik_manager.SmRoot import RootManager
+from tik_manager.sqliteCache import RACY_WINDOW
 import tik_manager.iconsSource as icons
 
 # FORCE_QT5 = bool(os.getenv("FORCE_QT5"))
@@ -186,6 +192,25 @@ logging.basicConfig()
 logger = logging.getLogger('AssetLibrary')
 logger.setLevel(logging.WARNING)
 
+# catalogue lives in a hidden sub folder, so that writing it does not change the mtime of the
+# library folder which the catalogue is validated against
+CATALOGUE_DIR = ".catalogue"
+CATALOGUE_FILE = "libraryCatalogue.json"
+CATALOGUE_VERSION = 1
+
+# fields of the asset json files which are kept in the catalogue
+SUMMARY_KEYS = ["sourceProject", "version", "objPath", "fbxPath", "abcPath", "thumbPath", "ssPath", "swPath",
+                "Faces/Triangles", "notes"]
+
+# edge length of the downscaled thumbnails in icon mode
+THUMB_SIZE = 100
+# oldest thumbnails are removed from the local cache above this count
+THUMB_CACHE_LIMIT = 20000
+# memory budget of the decoded screenshots and wireframes in bytes
+PREVIEW_CACHE_SIZE = 64 * 1024 * 1024
+# number of assets to prefetch before and after the selected one
+PREFETCH_RANGE = 2
+
 def getMainWindow():
     """This function should be overriden"""
     if BoilerDict["Environment"] == "Maya":
@@ -241,6 +266,8 @@ class AssetLibrary(AssetEditor, RootManager):
                          360: "Action not permitted"}
 
         self.assetsList=[]
+        self.catalogue = None
+        self._catalogueStamp = None
         self._pathsDict={}
         self.swName = self.getSwName()
         self.init_paths(self.swName)
@@ -318,7 +345,9 @@ class AssetLibrary(AssetEditor, RootManager):
 
     def scanAssets(self):
         """
-        Scans the directory for .json files, and gather info.
+        Collects the assets from the library catalogue. The catalogue is validated against the mtime of
+        the library directory and only the new asset folders are read when it is outdated. The catalogue
+        is read again if another session saved it.
         Args:
             directory: (Unicode) Default Library location. Default is predefined outside of this class
 
@@ -328,9 +357,116 @@ class AssetLibrary(AssetEditor, RootManager):
         """
         if not os.path.exists(self.directory):
             return
-        # first collect all the json files from second level subfolders
-        subDirs = next(os.walk(self.directory))[1]
-        self.assetsList = [d for d in subDirs if os.path.isfile(os.path.join(self.directory, d, "%s.json" %d))]
+        try:
+            dirMtime = os.stat(self.directory).st_mtime
+        except OSError:
+            return
+        if self.catalogue is None or self.catalogue["Mtime"] != dirMtime or self._catalogueChanged():
+            self.catalogue = self._loadCatalogue()
+        if self.catalogue["Mtime"] != dirMtime:
+            self._refreshCatalogue(dirMtime)
+        self.assetsList = sorted(self.catalogue["Assets"].keys())
+
+    def getAssetSummary(self, assetName):
+        """
+        Returns the summary fields of the asset from the catalogue. The entry is validated against the
+        mtime of the asset json, so the edits made outside of this session are picked up.
+        Args:
+            assetName: (String) Name of the asset
+
+        Returns:
+            (Dictionary) Keys of SUMMARY_KEYS plus "textureCount" and "jsonMtime"
+
+        """
+        if self.catalogue is None or self._catalogueChanged():
+            self.scanAssets()
+        try:
+            summary = self.catalogue["Assets"][assetName]
+        except (KeyError, TypeError):
+            summary = None
+        try:
+            jsonMtime = os.stat(os.path.join(self.directory, assetName, "%s.json" % assetName)).st_mtime
+        except OSError:
+            jsonMtime = None
+        if summary is None or summary.get("jsonMtime") != jsonMtime:
+            summary = self._getSummary(assetName)
+            self._updateCatalogue(assetName, summary)
+        return summary
+
+    def _getSummary(self, assetName, data=None):
+        """Returns the catalogue summary of the asset data. Data is read from the asset json if not given"""
+        if data is None:
+            data = self._getData(assetName)
+        summary = dict((key, data.get(key, "N/A")) for key in SUMMARY_KEYS)
+        summary["notes"] = data.get("notes", "")
+        summary["textureCount"] = len(data.get("textureFiles", []))
+        try:
+            summary["jsonMtime"] = os.stat(os.path.join(self.directory, assetName, "%s.json" % assetName)).st_mtime
+        except OSError:
+            summary["jsonMtime"] = None
+        return summary
+
+    def _catalogueChanged(self):
+        """Returns True if the catalogue file is saved by another session since it is read"""
+        try:
+            return os.stat(os.path.join(self.directory, CATALOGUE_DIR, CATALOGUE_FILE)).st_mtime != self._catalogueStamp
+        except OSError:
+            return False
+
+    def _loadCatalogue(self):
+        """Reads the catalogue file of the library. Returns an empty catalogue if it is missing or outdated"""
+        catalogueFile = os.path.join(self.directory, CATALOGUE_DIR, CATALOGUE_FILE)
+        try:
+            self._catalogueStamp = os.stat(catalogueFile).st_mtime
+            with open(catalogueFile, "r") as f:
+                catalogue = json.load(f)
+            if catalogue.get("Version") == CATALOGUE_VERSION:
+                return catalogue
+        except (IOError, OSError, ValueError, AttributeError):
+            self._catalogueStamp = None
+        return {"Version": CATALOGUE_VERSION, "Mtime": None, "Assets": {}}
+
+    def _refreshCatalogue(self, dirMtime):
+        """Brings the catalogue in line with the asset folders. Only the new asset folders are read"""
+        assets = self.catalogue["Assets"]
+        subDirs = [d for d in next(os.walk(self.directory))[1] if not d.startswith(".")]
+        for name in list(assets.keys()):
+            if name not in subDirs:
+                del assets[name]
+        for name in subDirs:
+            if name in assets or not os.path.isfile(os.path.join(self.directory, name, "%s.json" % name)):
+                continue
+            try:
+                assets[name] = self._getSummary(name)
+            except Exception:
+                logger.warning("Cannot read the asset data => %s" % name)
+        self.catalogue["Mtime"] = dirMtime
+        self._saveCatalogue()
+
+    def _updateCatalogue(self, assetName, summary):
+        """Updates (or removes if summary is None) the catalogue entry of the asset and saves the catalogue"""
+        if self.catalogue is None or self._catalogueChanged():
+            # another session wrote the catalogue in the meantime. Do not overwrite its entries
+            self.catalogue = self._loadCatalogue()
+        if summary is None:
+            self.catalogue["Assets"].pop(assetName, None)
+        else:
+            self.catalogue["Assets"][assetName] = summary
+        self._saveCatalogue()
+
+    def _saveCatalogue(self):
+        catalogueDir = os.path.join(self.directory, CATALOGUE_DIR)
+        if self.catalogue["Mtime"] and time.time() - self.catalogue["Mtime"] < RACY_WINDOW:
+            # validate again on next scan
+            self.catalogue["Mtime"] = -1
+        try:
+            self._folderCheck(catalogueDir)
+            catalogueFile = os.path.join(catalogueDir, CATALOGUE_FILE)
+            self._dumpJson(self.catalogue, catalogueFile)
+            self._catalogueStamp = os.stat(catalogueFile).st_mtime
+        except (IOError, OSError) as e:
+            # read-only libraries work without a catalogue file
+            logger.warning("Cannot save the library catalogue (%s)" % e)
 
     def loadAsset(self, assetName):
         assetData = self._getData(assetName)
@@ -377,17 +513,17 @@ class AssetLibrary(AssetEditor, RootManager):
         return thumbPath
 
     def getScreenShot(self, assetName):
-        data = self._getData(assetName)
+        data = self.getAssetSummary(assetName)
         ssPath = os.path.join(self.directory, assetName, data["ssPath"])
         return ssPath
 
     def getWireFrame(self, assetName):
-        data = self._getData(assetName)
+        data = self.getAssetSummary(assetName)
         swPath = os.path.join(self.directory, assetName, data["swPath"])
         return swPath
 
     def getAssetNotes(self, assetName):
-        data = self._getData(assetName)
+        data = self.getAssetSummary(assetName)
         try:
             notes = data["notes"]
         except KeyError:
@@ -430,6 +566,7 @@ class AssetLibrary(AssetEditor, RootManager):
     def _setData(self, assetName, data):
         jsonFile = os.path.join(self.directory, assetName, "%s.json" % assetName)
         self._dumpJson(data, jsonFile)
+        self._updateCatalogue(assetName, self._getSummary(assetName, data=data))
 
 
     def _savePreviews(self, name, assetDirectory, uvSnap=True, selectionOnly=True):
@@ -771,9 +908,17 @@ class MainUI(QtWidgets.QMainWindow):
                 libraryPaths.pop(libraryPaths.index(p))
                 self._dumpJson(libraryPaths, self.settingsFile)
                 tabIndexToRemove = self.tabWidget.currentIndex()
+                tab = self.tabWidget.widget(tabIndexToRemove)
                 self.tabWidget.removeTab(tabIndexToRemove)
+                tab.shutdown()
+                tab.deleteLater()
                 return
 
+    def closeEvent(self, event):
+        for index in range(self.tabWidget.count()):
+            self.tabWidget.widget(index).shutdown()
+        super(MainUI, self).closeEvent(event)
+
     def on_context_menu(self, point):
         # show context menu
         self.tabsRightMenu.exec_(self.mapToGlobal(point))
@@ -828,6 +973,18 @@ class LibraryTab(QtWidgets.QWidget):
 
         self.library = AssetLibrary(directory)
 
+        self._thumbLoader = ThumbnailLoader(os.path.join(self.library._pathsDict["userSettingsDir"], "thumbCache"))
+        self._thumbLoader.thumbReady.connect(self.onThumbReady)
+        self._thumbItems = {}
+        self._pendingThumbs = {}
+        placeholder = QtGui.QPixmap(THUMB_SIZE, THUMB_SIZE)
+        placeholder.fill(QtGui.QColor(60, 60, 60))
+        self._placeholderIcon = QtGui.QIcon(placeholder)
+
+        self._previewCache = PreviewCache()
+        self._previewCache.previewReady.connect(self.onPreviewReady)
+        self._previewPath = None
+
         if not self.library.swName:
             self.currentProject = ""
         else:
@@ -839,6 +996,12 @@ class LibraryTab(QtWidgets.QWidget):
             self.viewOnlyMode()
 
 
+    def shutdown(self):
+        """Stops the worker threads of the thumbnail loader and the preview cache"""
+        self._visibleTimer.stop()
+        self._thumbLoader.close()
+        self._previewCache.close()
+
     def buildTabUI(self):
         self.layout = QtWidgets.QVBoxLayout(self)
         self.splitter = QtWidgets.QSplitter(self)
@@ -1152,6 +1315,14 @@ class LibraryTab(QtWidgets.QWidget):
 
         self.assets_listWidget.currentItemChanged.connect(self.onAssetChange)
 
+        # thumbnails are requested for the visible rows after scrolling or resizing settles
+        self._visibleTimer = QtCore.QTimer(self)
+        self._visibleTimer.setSingleShot(True)
+        self._visibleTimer.setInterval(50)
+        self._visibleTimer.timeout.connect(self.requestVisibleThumbs)
+        self.assets_listWidget.verticalScrollBar().valueChanged.connect(self._visibleTimer.start)
+        self.assets_listWidget.verticalScrollBar().rangeChanged.connect(self._visibleTimer.start)
+
         # self.screenshot_label.clicked.connect(self.toggleWireframe)
         self.screenshot_label.leftClicked.connect(self.toggleWireframe)
         # self.screenshot_label.leftMouseButtonPressed.connect(self.toggleWireframe)
@@ -1386,7 +1557,7 @@ class LibraryTab(QtWidgets.QWidget):
         else:
             assetName = str(assetName)
 
-        assetData = self.library._getData(assetName)
+        assetData = self.library.getAssetSummary(assetName)
 
 
         if self.wireframeMode == -1:
@@ -1400,11 +1571,17 @@ class LibraryTab(QtWidgets.QWidget):
         # print screenshotPath
 
         # update preview image
-
-        self.tPixmap = QtGui.QPixmap(screenshotPath)
-
-
-        self.screenshot_label.setPixmap(self.tPixmap)
+        self._previewPath = screenshotPath
+        edge = PreviewCache.displayEdge(self.screenshot_label)
+        pixmap = self._previewCache.get(screenshotPath, edge)
+        if pixmap is None:
+            # shown by onPreviewReady
+            self.screenshot_label.clear()
+            self._previewCache.request(screenshotPath, edge)
+        else:
+            self.tPixmap = pixmap
+            self.screenshot_label.setPixmap(self.tPixmap)
+        self.prefetchPreviews(assetName, edge)
         # self.screenshot_label.setText(msg)
 
         # self.screenshot_label.setImage(self.tPixmap)
@@ -1416,7 +1593,7 @@ class LibraryTab(QtWidgets.QWidget):
         # get display data
         assetNotes = assetData["notes"]
         self.notes_textEdit.setText(assetNotes)
-        textures = len(assetData["textureFiles"])
+        textures = assetData["textureCount"]
         self.textures_label.setText("Textures: %s" %textures)
         facesTriangles = assetData["Faces/Triangles"]
         self.facesTriangles_label.setText("Faces/Triangles: %s" %facesTriangles)
@@ -1488,6 +1665,32 @@ class LibraryTab(QtWidgets.QWidget):
 
         return formats
 
+    def onPreviewReady(self, path):
+        if path != self._previewPath:
+            return
+        pixmap = self._previewCache.get(path, PreviewCache.displayEdge(self.screenshot_label))
+        if pixmap is not None:
+            self.tPixmap = pixmap
+            self.screenshot_label.setPixmap(self.tPixmap)
+
+    def prefetchPreviews(self, assetName, edge):
+        """Decodes the other view of the asset and the previews of the neighbouring assets in the list"""
+        if self.wireframeMode == -1:
+            self._previewCache.request(self.library.getWireFrame(assetName), edge)
+        else:
+            self._previewCache.request(self.library.getScreenShot(assetName), edge)
+        row = self.assets_listWidget.currentRow()
+        for offset in range(1, PREFETCH_RANGE + 1):
+            for neighbourRow in (row + offset, row - offset):
+                item = self.assets_listWidget.item(neighbourRow)
+                if neighbourRow < 0 or not item:
+                    continue
+                neighbourName = str(item.text())
+                if self.wireframeMode == -1:
+                    self._previewCache.request(self.library.getScreenShot(neighbourName), edge)
+                else:
+                    self._previewCache.request(self.library.getWireFrame(neighbourName), edge)
+
     def toggleWireframe(self):
         self.wireframeMode *= -1
         self.onAssetChange()
@@ -1501,6 +1704,9 @@ class LibraryTab(QtWidgets.QWidget):
         filterWord = str(self.filter_lineEdit.text())
 
         self.assets_listWidget.clear()
+        self._thumbLoader.reset()
+        self._thumbItems = {}
+        self._pendingThumbs = {}
         self.library.scanAssets()
 
 
@@ -1514,15 +1720,12 @@ class LibraryTab(QtWidgets.QWidget):
             # self.assets_listWidget.addItems(self.filterList(self.library.assetsList, filterWord))
             filteredItems = self.filterList(self.library.assetsList, filterWord)
             for itemName in filteredItems:
-                item = QtWidgets.QListWidgetItem(itemName)
-                thumbPath = self.library.getAssetThumbnail(itemName)
-
-
-                icon = QtGui.QIcon(thumbPath)
-
-                item.setIcon(icon)
-
+                # placeholder until the thumbnail is decoded in the background
+                item = QtWidgets.QListWidgetItem(self._placeholderIcon, itemName)
+                self._thumbItems[itemName] = item
+                self._pendingThumbs[itemName] = item
                 self.assets_listWidget.addItem(item)
+            self._visibleTimer.start()
 
         else:
             self.assets_listWidget.setViewMode(QtWidgets.QListWidget.ListMode)
@@ -1532,6 +1735,24 @@ class LibraryTab(QtWidgets.QWidget):
 
 
 
+    def requestVisibleThumbs(self):
+        """Requests the thumbnails of the visible rows and the ones within a page above and below"""
+        if self.viewModeState != 1 or not self._pendingThumbs:
+            return
+        viewRect = self.assets_listWidget.viewport().rect()
+        area = viewRect.adjusted(0, -viewRect.height(), 0, viewRect.height())
+        for itemName, item in list(self._pendingThumbs.items()):
+            if area.intersects(self.assets_listWidget.visualItemRect(item)):
+                del self._pendingThumbs[itemName]
+                self._thumbLoader.request(itemName, self.library.getAssetThumbnail(itemName))
+
+    def onThumbReady(self, generation, itemName, image):
+        if generation != self._thumbLoader.generation or image is None:
+            return
+        item = self._thumbItems.get(itemName)
+        if item:
+            item.setIcon(QtGui.QIcon(QtGui.QPixmap.fromImage(image)))
+
     def onMergeAsset(self):
         assetName = self._getCurrentAssetName()
         if assetName:
@@ -1625,6 +1846,7 @@ class LibraryTab(QtWidgets.QWidget):
         self.library.loadAsset(assetName)
 
     def _clearDisplayInfo(self):
+        self._previewPath = None
 
         self.notes_textEdit.clear()
         self.screenshot_label.clear()
@@ -1697,7 +1919,8 @@ class LibraryTab(QtWidgets.QWidget):
         if mode == "currentView":
             assetName = self._getCurrentAssetName()
             self.library.replaceWithCurrentView(assetName)
-            pass
+            self._previewCache.discard(self.library.getScreenShot(assetName))
+            self.onAssetChange()
         # if mode == "externalFile":
         #     fname = QtWidgets.QFileDialog.getOpenFileName(self, 'Open file', self.library.directory,"Image files (*.jpg *.gif)")[0]
         #     if not fname: # if dialog is canceled
@@ -1724,6 +1947,233 @@ class LibraryTab(QtWidgets.QWidget):
             # return False
 
 
+def readScaledImage(path, edge):
+    """Decodes the image file fitting into edge x edge pixels. Returns a QImage or None. Safe to use in threads"""
+    reader = QtGui.QImageReader(path)
+    fullSize = reader.size()
+    if fullSize.isValid() and (fullSize.width() > edge or fullSize.height() > edge):
+        # decoders like jpeg scale while decoding, much faster than scaling afterwards
+        reader.setScaledSize(fullSize.scaled(edge, edge, QtCore.Qt.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return None
+    return image
+
+
+class PreviewCache(QtCore.QObject):
+    """
+    Memory bounded LRU cache of the screenshot and wireframe pixmaps.
+    Images are decoded at the display size in worker threads and converted to pixmaps on the GUI thread.
+    Entries are stamped with the mtime of the image, failed decodes are not cached.
+    previewReady(path) is emitted when a requested image is in the cache.
+    """
+    # PyInstaller and Standalone version compatibility
+    if FORCE_QT5:
+        previewReady = QtCore.pyqtSignal(str)
+        _decoded = QtCore.pyqtSignal(object, object)
+    else:
+        previewReady = QtCore.Signal(str)
+        _decoded = QtCore.Signal(object, object)
+
+    def __init__(self, maxSize=PREVIEW_CACHE_SIZE, workers=2):
+        super(PreviewCache, self).__init__()
+        self.maxSize = maxSize
+        self.workers = workers
+        self._pixmaps = OrderedDict()
+        self._size = 0
+        self._inFlight = set()
+        self._pool = None
+        # queued to the thread of this object
+        self._decoded.connect(self._onDecoded)
+
+    @staticmethod
+    def displayEdge(widget):
+        """Returns the decode size for the widget. Rounded up so that small resizes still hit the cache"""
+        edge = max(widget.width(), widget.height())
+        return int(math.ceil(edge / 100.0)) * 100
+
+    def get(self, path, edge):
+        """Returns the cached pixmap or None. Entries of the images changed on the disk are dropped"""
+        key = (path, edge)
+        if not self._isFresh(key):
+            return None
+        entry = self._pixmaps.pop(key)
+        # move to the most recent end
+        self._pixmaps[key] = entry
+        return entry[1]
+
+    def request(self, path, edge):
+        """Decodes the image in the background if it is not cached or being decoded already"""
+        key = (path, edge)
+        if self._isFresh(key) or key in self._inFlight:
+            return
+        if self._pool is None:
+            from multiprocessing.pool import ThreadPool
+            self._pool = ThreadPool(self.workers)
+        self._inFlight.add(key)
+        self._pool.apply_async(self._load, (key,))
+
+    def discard(self, path):
+        """Drops all cached sizes of the given image"""
+        for key in [key for key in self._pixmaps if key[0] == path]:
+            self._drop(key)
+
+    def close(self):
+        if self._pool:
+            self._pool.close()
+            self._pool = None
+
+    def _isFresh(self, key):
+        """Returns True if the key is cached with the current mtime of the image"""
+        entry = self._pixmaps.get(key)
+        if entry is None:
+            return False
+        try:
+            mtime = os.stat(key[0]).st_mtime
+        except OSError:
+            mtime = None
+        if mtime != entry[0]:
+            # overwritten or deleted by another session
+            self._drop(key)
+            return False
+        return True
+
+    def _drop(self, key):
+        pixmap = self._pixmaps.pop(key)[1]
+        self._size -= pixmap.width() * pixmap.height() * 4
+
+    def _load(self, key):
+        try:
+            mtime = os.stat(key[0]).st_mtime
+            image = readScaledImage(key[0], key[1])
+        except Exception as e:
+            logger.warning("Cannot load the preview (%s) => %s" % (e, key[0]))
+            mtime, image = None, None
+        self._decoded.emit(key, (mtime, image))
+
+    def _onDecoded(self, key, result):
+        self._inFlight.discard(key)
+        mtime, image = result
+        if image is None:
+            # not cached. Tried again on the next request, the file may be written later
+            return
+        pixmap = QtGui.QPixmap.fromImage(image)
+        if key in self._pixmaps:
+            self._drop(key)
+        self._pixmaps[key] = (mtime, pixmap)
+        self._size += pixmap.width() * pixmap.height() * 4
+        while self._size > self.maxSize and len(self._pixmaps) > 1:
+            self._drop(next(iter(self._pixmaps)))
+        self.previewReady.emit(key[0])
+
+
+class ThumbnailLoader(QtCore.QObject):
+    """
+    Decodes the asset thumbnails in a pool of worker threads and sends them as QImages.
+    Downscaled copies are kept in a local cache folder keyed by the source path and mtime, so that the
+    next visit reads a small local file instead of the full size thumbnail on the library.
+    """
+    # PyInstaller and Standalone version compatibility
+    if FORCE_QT5:
+        thumbReady = QtCore.pyqtSignal(int, str, object)
+    else:
+        thumbReady = QtCore.Signal(int, str, object)
+
+    def __init__(self, cacheDir, size=THUMB_SIZE, workers=4):
+        super(ThumbnailLoader, self).__init__()
+        self.cacheDir = cacheDir
+        self.size = size
+        self.workers = workers
+        self.generation = 0
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def request(self, key, path):
+        """Queues the thumbnail. Result is sent with thumbReady(generation, key, image or None)"""
+        if self._pool is None:
+            from multiprocessing.pool import ThreadPool
+            self._pool = ThreadPool(self.workers)
+            self._pool.apply_async(self.pruneCache)
+        self._pool.apply_async(self._load, (self.generation, key, path))
+
+    def reset(self):
+        """Drops the queued requests. Results of the ones being decoded are ignored by the receiver"""
+        with self._lock:
+            self.generation += 1
+
+    def close(self):
+        self.reset()
+        if self._pool:
+            self._pool.close()
+            self._pool = None
+
+    def _load(self, generation, key, path):
+        if generation != self.generation:
+            return
+        try:
+            image = self.loadThumbnail(path)
+        except Exception as e:
+            logger.warning("Cannot load the thumbnail (%s) => %s" % (e, path))
+            image = None
+        with self._lock:
+            if generation == self.generation:
+                self.thumbReady.emit(generation, key, image)
+
+    def loadThumbnail(self, path):
+        """Returns the downscaled QImage of the given image file from the cache. Creates it if missing"""
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        key = hashlib.md5((u"%s|%s|%s" % (path, mtime, self.size)).encode("utf-8")).hexdigest()
+        cacheFile = os.path.join(self.cacheDir, "%s.jpg" % key)
+        if os.path.isfile(cacheFile):
+            image = QtGui.QImage(cacheFile)
+            if not image.isNull():
+                try:
+                    # keep the recently used ones at pruning
+                    os.utime(cacheFile, None)
+                except OSError:
+                    pass
+                return image
+
+        image = readScaledImage(path, self.size)
+        if image is None:
+            return None
+        try:
+            if not os.path.isdir(self.cacheDir):
+                os.makedirs(self.cacheDir)
+            tempFile = "%s_%s_%s.tmp" % (cacheFile, os.getpid(), threading.current_thread().ident)
+            if image.save(tempFile, "JPG"):
+                compat.replace(tempFile, cacheFile)
+        except OSError:
+            # the cache is optional
+            pass
+        return image
+
+    def pruneCache(self):
+        """Removes the least recently used thumbnails above THUMB_CACHE_LIMIT"""
+        try:
+            names = os.listdir(self.cacheDir)
+        except OSError:
+            return
+        if len(names) <= THUMB_CACHE_LIMIT:
+            return
+        stamps = []
+        for name in names:
+            cacheFile = os.path.join(self.cacheDir, name)
+            try:
+                stamps.append((os.path.getmtime(cacheFile), cacheFile))
+            except OSError:
+                pass
+        stamps.sort()
+        for _, cacheFile in stamps[:len(stamps) - THUMB_CACHE_LIMIT]:
+            try:
+                os.remove(cacheFile)
+            except OSError:
+                pass
+
+
 class ImageWidget(QtWidgets.QLabel):
     """Custom class for thumbnail section. Keeps the aspect ratio when resized."""
     # Mouse button signals emit image scene (x, y) coordinates.
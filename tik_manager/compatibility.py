@@ -1,5 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import os
+import sys
 
 def encode(data):
     try: return unicode(data).encode("utf-8")
@@ -15,7 +17,30 @@ def decode(data):
             return data
 
 
-
-
-
-
+def replace(src, dst):
+    """
+    Moves src over dst in one step. Readers see either the old or the new dst, never a missing one.
+    python 2.7 has no os.replace and os.rename fails on windows if dst exists, MoveFileExW is used there instead
+    """
+    try: return os.replace(src, dst)
+    except AttributeError:
+        if os.name == "nt":
+            return _moveFileEx(src, dst)
+        os.rename(src, dst)
+
+
+def _widePath(path):
+    if isinstance(path, bytes):
+        try: return path.decode("utf-8")
+        except UnicodeDecodeError: return path.decode(sys.getfilesystemencoding())
+    return path
+
+
+def _moveFileEx(src, dst):
+    """Atomic replace of python 2.7 on windows"""
+    import ctypes
+    MOVEFILE_REPLACE_EXISTING = 0x1
+    MOVEFILE_WRITE_THROUGH = 0x8
+    if not ctypes.windll.kernel32.MoveFileExW(_widePath(src), _widePath(dst),
+                                              MOVEFILE_REPLACE_EXISTING | MOVEFILE_WRITE_THROUGH):
+        raise ctypes.WinError()
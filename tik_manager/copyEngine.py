@@ -0,0 +1,617 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------------------------
+# Copyright (c) 2017-2018, Arda Kutlu (ardakutlu@gmail.com)
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#  - Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+#  - Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+#  - Neither the name of the software nor the names of its contributors
+#    may be used to endorse or promote products derived from this software
+#    without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+
+"""
+Multi threaded file copy engine for the sequence transfers.
+
+Files are copied by a pool of worker threads in chunks, so many frames are on the way at the same
+time and the progress is counted in bytes. Every file is written to a temporary ".part" file next to
+the destination and moved in place once it is complete, then stamped with the mtime of the source.
+Destination files with the same size and mtime with the source are skipped, so running a cancelled
+or failed transfer again resumes where it is left.
+
+When a hash algorithm is given, a digest of every file is computed while it is copied and the result
+can be saved as a transfer manifest (relative path, size, mtime and hash of every file). A manifest
+can be verified against the destination later with the same engine in verify mode, and the files
+failing the verification can be copied again.
+
+The engine has no GUI dependency. Widgets start it with start() and poll progress() with a timer.
+"""
+
+import os
+import time
+import errno
+import json
+import shutil
+import hashlib
+import datetime
+import threading
+import logging
+
+import tik_manager.compatibility as compat
+
+__author__ = "Arda Kutlu"
+__copyright__ = "Copyright 2018, Tik Manager Copy Engine"
+__credits__ = []
+__license__ = "GPL"
+__maintainer__ = "Arda Kutlu"
+__email__ = "ardakutlu@gmail.com"
+__status__ = "Development"
+
+logging.basicConfig()
+logger = logging.getLogger('copyEngine')
+logger.setLevel(logging.WARNING)
+
+# read and write size of a single chunk
+BUFFER_SIZE = 4 * 1024 * 1024
+
+# file systems like FAT and some SMB shares keep the mtime with 2 seconds resolution
+MTIME_TOLERANCE = 2.0
+
+# streaming hash of the manifests. Available in every python version the DCCs ship with
+HASH_NAME = "md5"
+
+# linux ioctl request of FICLONE. Shares the data blocks of the source on btrfs, XFS and similar
+FICLONE = 0x40049409
+
+# errors of the kernel copy functions meaning "not supported here". Anything else is a real I/O error
+FALLBACK_ERRORS = set(getattr(errno, name) for name in ("ENOSYS", "EXDEV", "EINVAL", "ENOTSUP", "EOPNOTSUPP")
+                      if hasattr(errno, name))
+
+# file systems served over the network. Only these get more than one worker, see workerCount
+NETWORK_FILE_SYSTEMS = ("nfs", "nfs4", "cifs", "smbfs", "smb3", "afpfs", "9p", "fuse.sshfs", "ceph", "glusterfs",
+                        "lustre", "beegfs", "gpfs")
+
+# GetDriveTypeW result of the mapped network drives
+DRIVE_REMOTE = 4
+
+# job states
+WAITING = "Waiting"
+COPIED = "Copied"
+SKIPPED = "Skipped"
+FAILED = "Failed"
+CANCELLED = "Cancelled"
+VERIFIED = "Verified"
+
+
+def copyChunks(sourceFile, targetFile, bufferSize=BUFFER_SIZE, hasher=None):
+    """
+    Copies an open file to another in chunks and yields the byte count of each chunk.
+    Uses the kernel copy functions where available (copy_file_range, sendfile) and falls
+    back to a plain read and write loop with a single reused buffer. Only "not supported" errors
+    of the kernel functions cause a fallback, real I/O errors (eg. EIO, ENOSPC) are raised.
+    :param sourceFile: (file) source opened in "rb" mode
+    :param targetFile: (file) target opened in "wb" mode
+    :param bufferSize: (Integer) size of a single chunk
+    :param hasher: (hashlib object) if given, updated with every chunk. Disables the kernel copy
+    """
+    offset = 0
+    if hasher is None and os.name != "nt":
+        sourceNo = sourceFile.fileno()
+        targetNo = targetFile.fileno()
+        for kernelCopy in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+            if kernelCopy is None:
+                continue
+            # copy_file_range works on explicit offsets, sendfile writes at the file position
+            os.lseek(targetNo, offset, os.SEEK_SET)
+            try:
+                while True:
+                    if kernelCopy is os.sendfile:
+                        count = kernelCopy(targetNo, sourceNo, offset, bufferSize)
+                    else:
+                        count = kernelCopy(sourceNo, targetNo, bufferSize, offset, offset)
+                    if not count:
+                        break
+                    offset += count
+                    yield count
+            except OSError as e:
+                if e.errno not in FALLBACK_ERRORS:
+                    raise
+                # not supported between these file systems. Try the next one
+                continue
+            if offset:
+                return
+            # nothing copied. Either an empty file or a file system answering 0 for unsupported copies
+    if offset:
+        sourceFile.seek(offset)
+        targetFile.seek(offset)
+    buffer = bytearray(bufferSize)
+    view = memoryview(buffer)
+    while True:
+        count = sourceFile.readinto(buffer)
+        if not count:
+            return
+        targetFile.write(view[:count])
+        if hasher:
+            # hashed while the chunk is in memory, the file is not read again
+            hasher.update(view[:count])
+        yield count
+
+
+def isNetworkPath(path):
+    """
+    Returns True if the path is on a network share. Paths which do not exist yet are checked by
+    their nearest existing parent
+    :param path: (String) absolute path
+    :return: (Boolean) None if it cannot be told on this platform
+    """
+    path = os.path.abspath(path)
+    if os.name == "nt":
+        if path.startswith("\\\\"):
+            # UNC path
+            return True
+        drive = os.path.splitdrive(path)[0]
+        if not drive:
+            return None
+        try:
+            import ctypes
+            return ctypes.windll.kernel32.GetDriveTypeW(u"%s\\" % drive) == DRIVE_REMOTE
+        except (ImportError, AttributeError):
+            return None
+    try:
+        with open("/proc/mounts", "r") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except (IOError, OSError):
+        # not linux
+        return None
+    while not os.path.exists(path) and os.path.dirname(path) != path:
+        path = os.path.dirname(path)
+    path = os.path.realpath(path)
+    fileSystem = None
+    matched = ""
+    for mountPoint, mountType in mounts:
+        # spaces in mount points are escaped as octal
+        mountPoint = mountPoint.replace("\\040", " ")
+        if len(mountPoint) > len(matched) and (path == mountPoint or path.startswith(mountPoint.rstrip("/") + "/")):
+            matched = mountPoint
+            fileSystem = mountType
+    return fileSystem in NETWORK_FILE_SYSTEMS
+
+
+def workerCount(destination, workers):
+    """
+    Returns the number of workers to copy to the destination. Parallel copies pay off when every
+    file waits for the network round trips. On a local disk they compete for the same disk and
+    gave no gain over a single worker in the measurements, so local destinations get one worker
+    :param destination: (String) absolute path of the destination folder
+    :param workers: (Integer) configured number of workers for network destinations
+    :return: (Integer)
+    """
+    if isNetworkPath(destination) is False:
+        return 1
+    return max(1, int(workers))
+
+
+def cloneFile(sourcePath, targetPath):
+    """
+    Makes a copy on write clone of the file. The clone takes no extra space until one of the files changes.
+    :return: (Bool) False if the platform or the file system does not support cloning. Nothing is left behind
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(sourcePath, "rb") as sourceFile:
+            with open(targetPath, "wb") as targetFile:
+                fcntl.ioctl(targetFile.fileno(), FICLONE, sourceFile.fileno())
+        return True
+    except (IOError, OSError):
+        if os.path.isfile(targetPath):
+            os.remove(targetPath)
+        return False
+
+
+def fileDigest(filePath, hashName=HASH_NAME, bufferSize=BUFFER_SIZE):
+    """Returns the hex digest of the file"""
+    hasher = hashlib.new(hashName)
+    buffer = bytearray(bufferSize)
+    view = memoryview(buffer)
+    with open(filePath, "rb") as f:
+        while True:
+            count = f.readinto(buffer)
+            if not count:
+                break
+            hasher.update(view[:count])
+    return hasher.hexdigest()
+
+
+class CopyJob(object):
+    """Single file to copy"""
+    __slots__ = ("source", "destination", "group", "size", "mtime", "status", "message", "digest",
+                 "expectedDigest", "force", "hashed")
+
+    def __init__(self, source, destination, group=None, stat=None, size=None, mtime=None, expectedDigest=None,
+                 force=False):
+        self.source = source
+        self.destination = destination
+        self.group = group
+        self.status = WAITING
+        self.message = ""
+        self.digest = None
+        self.hashed = 0
+        self.expectedDigest = expectedDigest
+        self.force = force
+        if size is not None:
+            # known from a manifest
+            self.size = size
+            self.mtime = mtime
+            return
+        try:
+            stat = stat or os.stat(source)
+            self.size = stat.st_size
+            self.mtime = stat.st_mtime
+        except OSError as e:
+            self.size = 0
+            self.mtime = None
+            self.status = FAILED
+            self.message = str(e)
+
+
+class CopyEngine(object):
+    """
+    Copies the added jobs with a pool of worker threads
+    :param workers: (Integer) number of files processed at the same time
+    :param bufferSize: (Integer) size of a single read in bytes
+    :param hashName: (String) hashlib algorithm name. If given, digests are computed while copying
+    :param verify: (Boolean) if True, nothing is copied. Destination files are checked against the
+                    size and expected digest of the jobs
+    """
+    def __init__(self, workers=4, bufferSize=BUFFER_SIZE, hashName=None, verify=False):
+        super(CopyEngine, self).__init__()
+        self.workers = max(1, int(workers))
+        self.bufferSize = bufferSize
+        self.hashName = hashName
+        self.verify = verify
+        self.jobs = []
+        self.groups = []
+        self._groupTotals = {}
+        self._groupDone = {}
+        self._bytesTotal = 0
+        self._bytesDone = 0
+        self._counts = {COPIED: 0, SKIPPED: 0, FAILED: 0, CANCELLED: 0, VERIFIED: 0}
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._cancelledGroups = set()
+        self._createdFolders = set()
+        self._thread = None
+        self._startTime = None
+        self._endTime = None
+
+    def addJob(self, source, destination, group=None, stat=None, **kwargs):
+        """
+        Adds a file to the copy list. Jobs are started in the order they are added
+        :param source: (String) absolute path of the source file
+        :param destination: (String) absolute path of the destination file
+        :param group: (String) optional group name, eg. the sequence name. Groups can be cancelled separately
+        :param stat: (os.stat_result) stat of the source if it is already known
+        :param kwargs: size, mtime and expectedDigest known from a manifest. force=True copies the
+                        file even if the destination looks identical
+        :return: (CopyJob)
+        """
+        job = CopyJob(source, destination, group=group, stat=stat, **kwargs)
+        self.jobs.append(job)
+        if group not in self._groupTotals:
+            self.groups.append(group)
+            self._groupTotals[group] = 0
+            self._groupDone[group] = 0
+        self._groupTotals[group] += job.size
+        self._bytesTotal += job.size
+        return job
+
+    def start(self):
+        """Starts copying in the background"""
+        self._thread = threading.Thread(target=self.run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def run(self):
+        """Copies all jobs and returns when they are finished"""
+        from multiprocessing.pool import ThreadPool
+        self._startTime = time.time()
+        pool = ThreadPool(self.workers)
+        try:
+            for _ in pool.imap_unordered(self._process, self.jobs):
+                pass
+        finally:
+            pool.terminate()
+            self._endTime = time.time()
+
+    def wait(self, timeout=None):
+        """Blocks until the background copy is finished"""
+        if self._thread:
+            self._thread.join(timeout)
+
+    def isRunning(self):
+        return bool(self._thread) and self._thread.is_alive()
+
+    def isFinished(self):
+        return self._endTime is not None
+
+    def cancel(self, group=None):
+        """Cancels the given group or all jobs. Files being copied are stopped after the current chunk"""
+        if group is None:
+            self._cancelled.set()
+        else:
+            with self._lock:
+                self._cancelledGroups.add(group)
+
+    def isCancelled(self, group=None):
+        return self._cancelled.is_set() or (group is not None and group in self._cancelledGroups)
+
+    def progress(self):
+        """
+        Returns a snapshot of the progress
+        :return: (Dictionary) bytesDone, bytesTotal, current group and its done and total bytes,
+                    number of jobs per state and the transfer speed in bytes per second
+        """
+        with self._lock:
+            current = None
+            for group in self.groups:
+                if self._groupDone[group] < self._groupTotals[group] and group not in self._cancelledGroups:
+                    current = group
+                    break
+            elapsed = ((self._endTime or time.time()) - self._startTime) if self._startTime else 0
+            return {"bytesDone": self._bytesDone,
+                    "bytesTotal": self._bytesTotal,
+                    "group": current,
+                    "groupDone": self._groupDone.get(current, 0),
+                    "groupTotal": self._groupTotals.get(current, 0),
+                    "counts": dict(self._counts),
+                    "jobCount": len(self.jobs),
+                    "speed": self._bytesDone / elapsed if elapsed else 0}
+
+    def _addBytes(self, job, count):
+        with self._lock:
+            self._bytesDone += count
+            self._groupDone[job.group] += count
+
+    def _finishJob(self, job, status, message="", remaining=0):
+        """Sets the final state of the job. Bytes which are not copied are counted as done to complete the progress"""
+        remaining = max(0, remaining)
+        with self._lock:
+            job.status = status
+            job.message = message
+            self._counts[status] += 1
+            self._bytesDone += remaining
+            self._groupDone[job.group] += remaining
+
+    def _makeFolder(self, folder):
+        if folder in self._createdFolders:
+            return
+        try:
+            os.makedirs(folder)
+        except OSError:
+            # created by another worker in the meantime
+            if not os.path.isdir(folder):
+                raise
+        self._createdFolders.add(folder)
+
+    def isSame(self, job):
+        """Returns True if the destination has the same size and mtime with the source"""
+        try:
+            stat = os.stat(job.destination)
+        except OSError:
+            return False
+        return stat.st_size == job.size and abs(stat.st_mtime - job.mtime) <= MTIME_TOLERANCE
+
+    def hashFile(self, filePath, job=None):
+        """
+        Returns the hex digest of the file. Progress is added to the job if given and the hashed bytes
+        are kept on job.hashed. Returns None if the group of the job is cancelled
+        """
+        hasher = hashlib.new(self.hashName)
+        buffer = bytearray(self.bufferSize)
+        view = memoryview(buffer)
+        with open(filePath, "rb") as f:
+            while True:
+                count = f.readinto(buffer)
+                if not count:
+                    break
+                hasher.update(view[:count])
+                if job:
+                    job.hashed += count
+                    self._addBytes(job, count)
+                    if self.isCancelled(job.group):
+                        return None
+        return hasher.hexdigest()
+
+    def _verify(self, job):
+        """Checks the destination file against the size and digest of the job"""
+        try:
+            size = os.stat(job.destination).st_size
+        except OSError:
+            self._finishJob(job, FAILED, "missing", remaining=job.size)
+            return job
+        if size != job.size:
+            self._finishJob(job, FAILED, "size mismatch ({0} bytes, expected {1})".format(size, job.size),
+                            remaining=job.size)
+            return job
+        if job.expectedDigest:
+            try:
+                job.digest = self.hashFile(job.destination, job=job)
+            except (IOError, OSError) as e:
+                self._finishJob(job, FAILED, str(e), remaining=job.size - job.hashed)
+                return job
+            if job.digest is None:
+                self._finishJob(job, CANCELLED, "skipped by user", remaining=job.size - job.hashed)
+                return job
+            if job.digest != job.expectedDigest:
+                self._finishJob(job, FAILED, "hash mismatch")
+                return job
+        else:
+            self._addBytes(job, job.size)
+        self._finishJob(job, VERIFIED)
+        return job
+
+    def _process(self, job):
+        if job.status == FAILED:
+            # could not be read when added
+            self._finishJob(job, FAILED, job.message)
+            return job
+        if self.isCancelled(job.group):
+            self._finishJob(job, CANCELLED, "skipped by user", remaining=job.size)
+            return job
+        if self.verify:
+            return self._verify(job)
+        if not job.force and self.isSame(job):
+            if self.hashName:
+                # the manifest describes the destination, hash what is already there
+                try:
+                    job.digest = self.hashFile(job.destination)
+                except (IOError, OSError) as e:
+                    self._finishJob(job, FAILED, str(e), remaining=job.size)
+                    return job
+            self._finishJob(job, SKIPPED, "identical file exists", remaining=job.size)
+            return job
+
+        partFile = "%s.part" % job.destination
+        copied = 0
+        hasher = hashlib.new(self.hashName) if self.hashName else None
+        try:
+            self._makeFolder(os.path.dirname(job.destination))
+            with open(job.source, "rb") as sourceFile, open(partFile, "wb") as partHandle:
+                for count in copyChunks(sourceFile, partHandle, self.bufferSize, hasher=hasher):
+                    copied += count
+                    self._addBytes(job, count)
+                    if self.isCancelled(job.group):
+                        break
+            if self.isCancelled(job.group):
+                os.remove(partFile)
+                self._finishJob(job, CANCELLED, "skipped by user", remaining=job.size - copied)
+                return job
+            if copied != job.size:
+                # changed while it is copied or a short copy. Never mark an incomplete file as copied
+                raise IOError("%s of %s bytes copied" % (copied, job.size))
+            # mtime of the source is what makes the file skippable next time
+            shutil.copystat(job.source, partFile)
+            compat.replace(partFile, job.destination)
+        except (IOError, OSError) as e:
+            try:
+                os.remove(partFile)
+            except OSError:
+                pass
+            logger.warning("Cannot copy %s => %s" %(job.source, e))
+            self._finishJob(job, FAILED, str(e), remaining=job.size - copied)
+            return job
+        if hasher:
+            job.digest = hasher.hexdigest()
+        self._finishJob(job, COPIED)
+        return job
+
+
+def writeManifest(engine, manifestFile, destinationRoot):
+    """
+    Saves the copy results of the engine as a transfer manifest
+    :param engine: (CopyEngine) finished engine. Expected to have a hash algorithm
+    :param manifestFile: (String) absolute path of the json file
+    :param destinationRoot: (String) folder which the manifest paths are relative to
+    :return: (Dictionary) manifest data
+    """
+    files = []
+    for job in engine.jobs:
+        files.append({"Path": os.path.relpath(job.destination, destinationRoot),
+                      "Source": job.source,
+                      "Group": job.group,
+                      "Size": job.size,
+                      "Mtime": job.mtime,
+                      "Hash": job.digest,
+                      "Status": job.status})
+    manifest = {"Algorithm": engine.hashName,
+                "Date": datetime.datetime.now().strftime("%d/%m/%Y-%H:%M"),
+                "Destination": destinationRoot,
+                "Files": files}
+    saveManifest(manifest, manifestFile)
+    return manifest
+
+
+def saveManifest(manifest, manifestFile):
+    tempFile = "%s.tmp" % manifestFile
+    with open(tempFile, "w") as f:
+        json.dump(manifest, f, indent=4)
+    compat.replace(tempFile, manifestFile)
+
+
+def loadManifest(manifestFile):
+    with open(manifestFile, "r") as f:
+        return json.load(f)
+
+
+def verifyEngine(manifest, destinationRoot=None, workers=4):
+    """
+    Returns a verify mode engine checking the files of the manifest. Files which could not be
+    copied in the first place (no hash) fail as they are
+    :param manifest: (Dictionary) manifest data
+    :param destinationRoot: (String) if the transferred files are moved, their new root folder
+    :param workers: (Integer) number of files checked at the same time
+    :return: (CopyEngine) not started
+    """
+    destinationRoot = destinationRoot or manifest["Destination"]
+    engine = CopyEngine(workers=workers, hashName=manifest["Algorithm"], verify=True)
+    for entry in manifest["Files"]:
+        job = engine.addJob(entry["Source"], os.path.join(destinationRoot, entry["Path"]), group=entry["Group"],
+                            size=entry["Size"], mtime=entry["Mtime"], expectedDigest=entry["Hash"])
+        if not entry["Hash"]:
+            job.status = FAILED
+            job.message = "not transferred (%s)" % entry["Status"]
+    return engine
+
+
+def retryEngine(manifest, paths, destinationRoot=None, workers=4):
+    """
+    Returns an engine copying the given manifest files again from their sources
+    :param manifest: (Dictionary) manifest data
+    :param paths: (List) relative paths of the files to copy, eg. the failed ones of a verification
+    :param destinationRoot: (String) if the transferred files are moved, their new root folder
+    :param workers: (Integer) number of files copied at the same time
+    :return: (CopyEngine) not started
+    """
+    destinationRoot = destinationRoot or manifest["Destination"]
+    paths = set(paths)
+    engine = CopyEngine(workers=workers, hashName=manifest["Algorithm"])
+    for entry in manifest["Files"]:
+        if entry["Path"] in paths:
+            engine.addJob(entry["Source"], os.path.join(destinationRoot, entry["Path"]), group=entry["Group"],
+                          force=True)
+    return engine
+
+
+def updateManifest(manifest, engine, destinationRoot=None):
+    """Updates the manifest entries with the results of a retry engine"""
+    destinationRoot = destinationRoot or manifest["Destination"]
+    results = dict((os.path.relpath(job.destination, destinationRoot), job) for job in engine.jobs)
+    for entry in manifest["Files"]:
+        job = results.get(entry["Path"])
+        if job and job.status == COPIED:
+            entry.update({"Size": job.size, "Mtime": job.mtime, "Hash": job.digest, "Status": job.status})
+    return manifest
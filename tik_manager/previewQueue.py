@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------------------------
+# Copyright (c) 2017-2018, Arda Kutlu (ardakutlu@gmail.com)
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#  - Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+#  - Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+#  - Neither the name of the software nor the names of its contributors
+#    may be used to endorse or promote products derived from this software
+#    without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+
+"""
+Background queue of the preview conversions.
+
+Every job is a small json file in a local per user folder (eg. ~/TikManager/previewQueue) named
+after the job and the process working on it. The mtime of the job files is refreshed while the
+session is alive, so the jobs left from a crashed or closed session are picked up by the next
+one after STALE_AGE. Conversions run on a bounded pool of worker threads shared by all managers
+of the session; the caller gets the control back as soon as the job file is written.
+"""
+
+import os
+import time
+import json
+import uuid
+import threading
+import subprocess
+import logging
+
+import tik_manager.compatibility as compat
+
+__author__ = "Arda Kutlu"
+__copyright__ = "Copyright 2018, Tik Manager Preview Queue"
+__credits__ = []
+__license__ = "GPL"
+__maintainer__ = "Arda Kutlu"
+__email__ = "ardakutlu@gmail.com"
+__status__ = "Development"
+
+logging.basicConfig()
+logger = logging.getLogger('previewQueue')
+logger.setLevel(logging.WARNING)
+
+# number of conversions running at the same time
+DEFAULT_WORKERS = 2
+
+# job files of the live sessions are touched with this interval (seconds)
+HEARTBEAT = 10.0
+
+# job files untouched longer than this are considered abandoned (seconds)
+STALE_AGE = 60.0
+
+# keeps ffmpeg from opening a console window on windows
+CREATE_NO_WINDOW = 0x08000000
+
+# format of the job files. Version 1 jobs (no "JobVersion" key) had a single "Output" file
+JOB_VERSION = 2
+
+
+class PreviewQueue(object):
+    """Persistent queue running the conversion commands in the background"""
+    def __init__(self, queueDir, workers=DEFAULT_WORKERS):
+        super(PreviewQueue, self).__init__()
+        self.queueDir = queueDir
+        self.workers = workers
+        self._pool = None
+        self._heartbeat = None
+        self._lock = threading.Lock()
+        self._active = {}  # {jobId: jobFile}
+        self._failures = []  # [(job, message)]
+
+    def _jobFile(self, jobId):
+        return os.path.join(self.queueDir, "%s.%s.job" % (jobId, os.getpid()))
+
+    def submit(self, job, callback):
+        """
+        Adds the conversion job to the queue and returns immediately
+        :param job: (Dictionary) "Command": (List) the conversion command,
+                                 "Outputs": (List) absolute paths of the converted files,
+                                 "DeleteFiles": (List) files to delete after a successful conversion.
+                                 Any other json compatible data is passed to the callback as it is
+        :param callback: (Function) called with the job dictionary from the worker thread when
+                        the conversion is finished successfully. Failed jobs are kept for takeFailures
+        :return: (String) job id
+        """
+        job = dict(job)
+        job["Id"] = uuid.uuid4().hex
+        job["JobVersion"] = JOB_VERSION
+        if not os.path.isdir(self.queueDir):
+            os.makedirs(self.queueDir)
+        jobFile = self._jobFile(job["Id"])
+        tempFile = "%s.tmp" % jobFile
+        with open(tempFile, "w") as f:
+            json.dump(job, f)
+        compat.replace(tempFile, jobFile)
+        self._start(jobFile, job, callback)
+        return job["Id"]
+
+    def resume(self, callback):
+        """
+        Picks up the abandoned jobs of the closed or crashed sessions
+        :param callback: (Function) see submit
+        :return: (Integer) number of resumed jobs
+        """
+        try:
+            fileNames = os.listdir(self.queueDir)
+        except OSError:
+            return 0
+        count = 0
+        now = time.time()
+        for fileName in fileNames:
+            parts = fileName.split(".")
+            if len(parts) != 3 or parts[2] != "job" or parts[0] in self._active:
+                continue
+            jobFile = os.path.join(self.queueDir, fileName)
+            try:
+                if now - os.path.getmtime(jobFile) < STALE_AGE:
+                    continue  # a live session is working on it
+                # rename is atomic. Only one session can win the job
+                claimedFile = self._jobFile(parts[0])
+                os.rename(jobFile, claimedFile)
+                with open(claimedFile, "r") as f:
+                    job = json.load(f)
+                if not self._isCompatible(jobFile, claimedFile, job):
+                    continue
+            except (IOError, OSError, ValueError):
+                continue
+            self._start(claimedFile, job, callback)
+            count += 1
+        return count
+
+    def _isCompatible(self, jobFile, claimedFile, job):
+        """
+        Checks the format version of a claimed job. Jobs of older versions are removed; their unconverted
+        previews stay registered. Jobs of newer versions are given back for the newer sessions
+        """
+        jobVersion = job.get("JobVersion", 1)
+        if jobVersion == JOB_VERSION:
+            return True
+        if jobVersion < JOB_VERSION:
+            logger.warning("Skipping the preview conversion job of an older version (%s) => %s"
+                           % (jobVersion, job.get("Outputs") or job.get("Output")))
+            os.remove(claimedFile)
+        else:
+            os.rename(claimedFile, jobFile)
+        return False
+
+    def pending(self):
+        """Returns the number of waiting and running jobs of this session"""
+        return len(self._active)
+
+    def takeFailures(self):
+        """
+        Returns the jobs failed since the last call and forgets them. Failures happen on the worker
+        threads, widgets poll this to tell the user
+        :return: (List) (job, message) tuples
+        """
+        with self._lock:
+            failures = self._failures
+            self._failures = []
+        return failures
+
+    def _fail(self, job, message):
+        logger.warning(message)
+        with self._lock:
+            self._failures.append((job, message))
+
+    def _start(self, jobFile, job, callback):
+        with self._lock:
+            if self._pool is None:
+                from multiprocessing.pool import ThreadPool
+                self._pool = ThreadPool(self.workers)
+            self._active[job["Id"]] = jobFile
+            if not self._heartbeat or not self._heartbeat.is_alive():
+                self._heartbeat = threading.Thread(target=self._touchJobs)
+                self._heartbeat.daemon = True
+                self._heartbeat.start()
+        self._pool.apply_async(self._run, (jobFile, job, callback))
+
+    def _touchJobs(self):
+        """Keeps the job files of this session fresh, including the ones waiting for a worker"""
+        while True:
+            time.sleep(HEARTBEAT)
+            with self._lock:
+                jobFiles = list(self._active.values())
+                if not jobFiles:
+                    self._heartbeat = None
+                    return
+            for jobFile in jobFiles:
+                try:
+                    os.utime(jobFile, None)
+                except OSError:
+                    pass
+
+    def _run(self, jobFile, job, callback):
+        logFile = "%s.log" % os.path.splitext(jobFile)[0]
+        try:
+            try:
+                for outputFile in job["Outputs"]:
+                    if os.path.isfile(outputFile):
+                        os.remove(outputFile)
+                kwargs = {"creationflags": CREATE_NO_WINDOW} if os.name == "nt" else {}
+                with open(logFile, "w") as log:
+                    returnCode = subprocess.call(job["Command"], stdout=log, stderr=log, **kwargs)
+            except (IOError, OSError, KeyError, TypeError) as e:
+                # KeyError and TypeError are malformed jobs
+                returnCode = e
+            if returnCode != 0:
+                # not retried. The unconverted file stays as the preview
+                self._fail(job, "Preview conversion failed (%s). See %s" % (returnCode, logFile))
+                return
+            os.remove(logFile)
+            try:
+                callback(job)
+            except Exception as e:
+                self._fail(job, "Cannot register the converted previews %s (%s)" % (job["Outputs"], e))
+                return
+            # sources are deleted only after the database points to the converted file
+            for filePath in job.get("DeleteFiles", []):
+                try:
+                    os.remove(filePath)
+                except OSError:
+                    pass
+        finally:
+            with self._lock:
+                self._active.pop(job["Id"], None)
+            try:
+                os.remove(jobFile)
+            except OSError:
+                pass
+
+
+_queues = {}
+_queuesLock = threading.Lock()
+
+
+def getQueue(queueDir, workers=DEFAULT_WORKERS):
+    """Returns the queue of the folder. Shared by all managers of the session, so the worker count stays bounded"""
+    queueDir = os.path.normpath(queueDir)
+    with _queuesLock:
+        if queueDir not in _queues:
+            _queues[queueDir] = PreviewQueue(queueDir, workers=workers)
+        return _queues[queueDir]
@@ -122,14 +122,18 @@ from tik_manager.SmRoot import RootManager
 
 # import pyseq as seq
 
-# import json
+import json
 import datetime
+import time
+from collections import OrderedDict
+import threading
 # from shutil import copyfile
 import shutil
 import logging
 
 ## DO NOT REMOVE THIS:
 import tik_manager.iconsSource as icons
+from tik_manager import copyEngine
 ## DO NOT REMOVE THIS:
 
 logging.basicConfig()
@@ -144,7 +148,9 @@ __maintainer__ = "Arda Kutlu"
 __email__ = "ardakutlu@gmail.com"
 __status__ = "Development"
 
-
+# per category index of the material database files. Not a .json file, so that it is never
+# listed as a material
+MATERIALS_INDEX = "materials.index"
 
 ColorStyleDict = {"Storyboard": "border: 2px solid #ff7b00",
              "Brief": "border: 2px solid #faff00",
@@ -450,10 +456,21 @@ class QtImageViewer(QtWidgets.QGraphicsView):
 
 class CopyProgress(QtWidgets.QWidget):
     """Custom Widget for visualizing progress of file transfer"""
+    # Copying runs in a worker thread. Progress reaches the widgets through these signals
+    if FORCE_QT5:
+        fileProgress = QtCore.pyqtSignal(int)
+        overallProgress = QtCore.pyqtSignal(int)
+        copyFinished = QtCore.pyqtSignal()
+    else:
+        fileProgress = QtCore.Signal(int)
+        overallProgress = QtCore.Signal(int)
+        copyFinished = QtCore.Signal()
 
-    def __init__(self, logPath=None):
+    def __init__(self, logPath=None, workers=4):
         super(CopyProgress, self).__init__()
         self.logPath = logPath
+        self.workers = workers
+        self.engine = None
         self.logger = None
         # self.src = src
         # self.dest = dest
@@ -497,6 +514,8 @@ class CopyProgress(QtWidgets.QWidget):
         self.setWindowTitle('File copy')
         self.cancelButton.clicked.connect(self.terminate)
         self.cancelAllButton.clicked.connect(lambda: self.terminate(all=True))
+        self.fileProgress.connect(self.pb.setValue)
+        self.overallProgress.connect(self.pbOverall.setValue)
         self.show()
 
     def results_ui(self, status, color="white", logPath=None, destPath=None):
@@ -562,6 +581,13 @@ class CopyProgress(QtWidgets.QWidget):
         """Terminate the progress"""
         self.terminated = True
         self.cancelAll = all
+        if not self.engine:
+            return
+        if all:
+            self.engine.cancel()
+        else:
+            # skip the item being copied
+            self.engine.cancel(group=self.engine.progress()["group"])
 
     # def safeLog(self, msg):
     #     try:
@@ -570,50 +596,25 @@ class CopyProgress(QtWidgets.QWidget):
     #         pass
 
     def masterCopy(self, srcList, dst):
-        # logName = "fileTransferLog_{0}.txt".format(now.strftime("%Y.%m.%d.%H.%M"))
-        # logFile = os.path.join(logPath, logName)
-        # self.logger = self.setupLogger(logFile)
-        totalCount = len(srcList)
-        current = 0
-        copiedPathList = []
-        for sel in srcList:
-            if self.cancelAll:
-                # self.safeLog("ALL CANCELED")
-                break
-            # self.logger.debug(
-            #     "---------------------------------------------\n"
-            #     "Copy Progress - {0}\n"
-            #     "---------------------------------------------".format(
-            #         sequenceData[sel]))
-            percent = (100 * current) / totalCount
-            self.pbOverall.setValue(percent)
-            current += 1
-            # tFilesList = [i.path for i in sequenceData[sel]]
-            # subPath = os.path.split(os.path.relpath(tFilesList[0], root))[0]  ## get the relative path
-            # currentDate = now.strftime("%y%m%d")
-            # targetPath = os.path.join(destination, currentDate, subPath)
-
-            if os.path.isdir(sel):
-                # re-define dst starting from the folder name
-                newDst = os.path.join(dst, os.path.basename(sel))
-                # if not os.path.isdir(os.path.normpath(newDst)):
-                #     os.makedirs(os.path.normpath(newDst))
-                newDst = self.strip_accents(newDst)
-                # if not os.path.isdir(os.path.normpath(newDst)):
-                #     os.makedirs(os.path.normpath(newDst))
-
-                copiedPathList.append(self.copyFolder(src=sel, dst=newDst))
-
-            else:
-                dst = self.strip_accents(dst)
-
-                if not os.path.isdir(os.path.normpath(dst)):
-                    os.makedirs(os.path.normpath(dst))
-
-                copiedPathList.append(self.copyItem(src=sel, dst=dst))
-
-        # self.deleteLogger(self.logger)
-
+        """
+        Copies the files and folders into the destination folder. Planning and copying run in a
+        worker thread while the GUI keeps responding. Returns when all items are copied
+        :param srcList: (List) absolute paths of the files and folders
+        :param dst: (String) absolute path of the destination folder
+        :return: (List) absolute paths of the copied items. None for the failed ones
+        """
+        self._copiedPathList = []
+        loop = QtCore.QEventLoop()
+        self.copyFinished.connect(loop.quit)
+        worker = threading.Thread(target=self._copyAll, args=(srcList, dst))
+        worker.daemon = True
+        worker.start()
+        # quit is queued to this thread, so it is not missed even if the worker is already finished
+        loop.exec_()
+        worker.join()
+        self.copyFinished.disconnect(loop.quit)
+
+        dst = self.strip_accents(dst)
         self.close()
         if self.cancelAll:
             self.results_ui("Canceled by user", logPath=self.logPath, destPath=dst)
@@ -621,106 +622,112 @@ class CopyProgress(QtWidgets.QWidget):
             self.results_ui("Finished with Error(s)", color="red", logPath=self.logPath, destPath=dst)
         else:
             self.results_ui("Success", logPath=self.logPath, destPath=dst)
-        return copiedPathList
-
-    def copyFolder(self, src, dst):
-
-        # src = os.path.normpath(src.replace(" ", "_"))
-        # dst = os.path.normpath(dst.replace(" ", "_"))
-        dst = self.uniqueFolderName(os.path.normpath(dst.replace(" ", "_")))
-        if not os.path.isdir(dst):
-            os.makedirs(dst)
+        return self._copiedPathList
 
-        self.pb.setValue(0)
-        self.terminated = False  # reset the termination status
-        totalCount = self.countFiles(src)
-        current = 0
-        QtWidgets.QApplication.processEvents()
-
-        for path, dirs, filenames in os.walk(src):
-            for directory in dirs:
-
-                destDir = path.replace(src, dst)
-                targetDir = os.path.join(destDir, directory)
-                targetDir = self.strip_accents(targetDir)
-
-                if not os.path.isdir(targetDir):
-                    os.makedirs(targetDir)
-
-            for sfile in filenames:
-                srcFile = os.path.join(path, sfile)
-
-                destFile = os.path.join(path.replace(src, dst), sfile)
-                self.copyItem(srcFile, os.path.split(destFile)[0])
-
-                # destFile = os.path.join(path.replace(src, dst), sfile)
-                # destFile = self.strip_accents(destFile)
-                # try:
-                #     # self.copyItem(srcFile, destFile)
-                #     shutil.copyfile(srcFile, destFile)
-                #
-                # except:
-                #     self.errorFlag = True
-                #     #     # self.safeLog("FAILED - unknown error")
-                #     return None
-                percent = (100 * current) / totalCount
-                # self.pb.setValue(percent)
-                self.pbOverall.setValue(percent)
-                current += 1
-                QtWidgets.QApplication.processEvents()
-                # self.safeLog("Success - {0}".format(targetPath))
-                if self.terminated or self.cancelAll:
+    def _copyAll(self, srcList, dst):
+        """Worker thread of masterCopy. Must not touch the widgets directly"""
+        try:
+            plan = self.planCopy(srcList, dst)
+            if self.cancelAll:
+                return
+            self.engine = copyEngine.CopyEngine(workers=self.workers)
+            for index, entry in enumerate(plan):
+                for folder in entry["folders"]:
+                    if not os.path.isdir(folder):
+                        os.makedirs(folder)
+                for sourceFile, targetFile in entry["files"]:
+                    self.engine.addJob(sourceFile, targetFile, group=index)
+            self.engine.start()
+            while not self.engine.isFinished():
+                self._emitProgress()
+                self.engine.wait(0.1)
+            self._emitProgress()
+
+            for index, entry in enumerate(plan):
+                states = set(job.status for job in self.engine.jobs if job.group == index)
+                if copyEngine.FAILED in states:
                     self.errorFlag = True
-                    # self.safeLog("FAILED - skipped by user")
-                    return None
-                    # break
-
-        return dst
-
-    def copyItem(self, src, dst):
-        src = os.path.normpath(src)
-        dst = os.path.normpath(dst)
-        length = 8*1024
-        self.pb.setValue(0)
-        self.terminated = False  # reset the termination status
-        totalCount = self.countFiles(src)
-        current = 0
-        QtWidgets.QApplication.processEvents()
-
-        # Prevent progress callback from being made each cycle
-        c = 0
-        c_max = 50
+                if copyEngine.CANCELLED in states or (copyEngine.FAILED in states and not entry["folders"]):
+                    self._copiedPathList.append(None)
+                else:
+                    self._copiedPathList.append(entry["target"])
+            if self.engine.progress()["counts"][copyEngine.CANCELLED]:
+                self.errorFlag = True
+        except (IOError, OSError) as e:
+            logger.error("Copy failed => %s" % e)
+            self.errorFlag = True
+        finally:
+            self.copyFinished.emit()
+
+    def _emitProgress(self):
+        progress = self.engine.progress()
+        if progress["groupTotal"]:
+            self.fileProgress.emit(int(100 * progress["groupDone"] / progress["groupTotal"]))
+        if progress["bytesTotal"]:
+            self.overallProgress.emit(int(100 * progress["bytesDone"] / progress["bytesTotal"]))
+
+    def planCopy(self, srcList, dst):
+        """
+        Scans the sources once and resolves every destination before anything is copied.
+        Unique names are resolved against a single listing of each destination folder.
+        :param srcList: (List) absolute paths of the files and folders
+        :param dst: (String) absolute path of the destination folder
+        :return: (List) a dictionary for each source with the keys "source", "target" (copied file or
+                    folder), "folders" (folders to create) and "files" (list of (source, target) file pairs)
+        """
+        dst = self.strip_accents(os.path.normpath(dst))
+        taken = self._listNames(dst)
+        plan = []
+        for sel in srcList:
+            sel = os.path.normpath(sel)
+            baseName = os.path.basename(sel)
+            if os.path.isdir(sel):
+                target = os.path.join(dst, self._uniqueName(self.strip_accents(baseName.replace(" ", "_")), taken))
+                folders = []
+                files = []
+                # a new folder, names only need to be unique against each other
+                takenInFolder = {}
+                for path, dirs, filenames in os.walk(sel):
+                    relPath = os.path.relpath(path, sel)
+                    targetDir = os.path.normpath(os.path.join(target, self.strip_accents(relPath)))
+                    folders.append(targetDir)
+                    names = takenInFolder.setdefault(targetDir, set())
+                    for fileName in filenames:
+                        uniqueName = self._uniqueName(self.strip_accents(fileName), names)
+                        files.append((os.path.join(path, fileName), os.path.join(targetDir, uniqueName)))
+                plan.append({"source": sel, "target": target, "folders": folders, "files": files})
+            else:
+                target = os.path.join(dst, self._uniqueName(self.strip_accents(baseName), taken))
+                plan.append({"source": sel, "target": target, "folders": [dst], "files": [(sel, target)]})
+        return plan
 
-        # try:
-        fileLocation = self.uniqueFileName(os.path.join(dst, os.path.basename(src)))
-        fileLocation = self.strip_accents(fileLocation)
-        with open(src, 'rb') as fsrc:
-            with open(fileLocation, 'wb') as fdst:
-                copied = 0
-                while self.errorFlag==False:
-                    buf = fsrc.read(length)
-                    if not buf:
-                        break
-                    fdst.write(buf)
-                    copied += len(buf)
-                    c += 1
-                    if c == c_max:
-                        size_src = os.stat(fsrc.name).st_size
-                        size_dst =os.stat(fdst.name).st_size
-                        float_src = float(size_src)
-                        float_dst = float(size_dst)
-                        percentage = int(float_dst/float_src*100)
-                        self.pb.setValue(percentage)
-                        c = 0
-                        QtWidgets.QApplication.processEvents()
-                    if self.terminated or self.cancelAll:
-
-                        self.errorFlag = True
-        if self.errorFlag:
-            os.remove(fileLocation)
-            return None
-        else:
-            return fileLocation
+    @staticmethod
+    def _listNames(directory):
+        """Returns the names in the directory as a set of keys for _uniqueName"""
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return set()
+        if os.name == "nt":
+            return set(name.lower() for name in names)
+        return set(names)
+
+    @staticmethod
+    def _uniqueName(baseName, taken, max_iter=100):
+        """
+        Returns a name which is not in the taken set by adding _sm(n) suffixes and adds it to the set
+        """
+        niceName, ext = os.path.splitext(baseName)
+        name = baseName
+        count = 0
+        # windows file names are case insensitive
+        key = name.lower() if os.name == "nt" else name
+        while key in taken and count < max_iter:
+            count += 1
+            name = "{0}_sm({1}){2}".format(niceName, count, ext)
+            key = name.lower() if os.name == "nt" else name
+        taken.add(key)
+        return name
 
     # def copyItem(self, src, dst):
     #     src = os.path.normpath(src)
@@ -742,44 +749,6 @@ class CopyProgress(QtWidgets.QWidget):
     #         # self.safeLog("FAILED - unknown error")
     #         return None
 
-    def uniqueFolderName(self, folderLocation):
-        count = 0
-        max_iter = 100
-        while os.path.isdir(folderLocation) and count < max_iter:
-            count += 1
-            directory, baseName = os.path.split(folderLocation)
-            niceName, ext = os.path.splitext(baseName)
-            if niceName.endswith("_sm({0})".format(count - 1)):
-                niceName = niceName.replace("_sm({0})".format(str(count - 1)), "_sm({0})".format(str(count)))
-            else:
-                niceName = "{0}_sm({1})".format(niceName, str(count))
-            folderLocation = os.path.join(directory, "{0}{1}".format(niceName, ext))
-        return folderLocation
-
-    def uniqueFileName(self, fileLocation):
-        count = 0
-        max_iter = 100
-        while os.path.isfile(fileLocation) and count < max_iter:
-            count += 1
-            directory, baseName = os.path.split(fileLocation)
-            niceName, ext = os.path.splitext(baseName)
-            if niceName.endswith("_sm({0})".format(count - 1)):
-                niceName = niceName.replace("_sm({0})".format(str(count - 1)), "_sm({0})".format(str(count)))
-            else:
-                niceName = "{0}_sm({1})".format(niceName, str(count))
-            fileLocation = os.path.join(directory, "{0}{1}".format(niceName, ext))
-        return fileLocation
-
-    def countFiles(self, directory):
-        files = []
-
-        if os.path.isdir(directory):
-            for path, dirs, filenames in os.walk(directory):
-                files.extend(filenames)
-            return len(files)
-        else:
-            return 1
-
     # def copysequence(self, sequenceData, selectionList, destination, logPath, root):
     #     """
     #     Copies the sequences to the destination
@@ -937,6 +906,7 @@ class ProjectMaterials(RootManager, CoreFunctions):
         self._currentsDict = {"currentSubIndex": 0}  # default is 0 as "None"
 
         self.materialsInCategory = {}  # empty materials directory
+        self.materialsIndex = {}  # index entries of the materials in category
         self.currentMaterialInfo = None
 
     @property
@@ -1002,7 +972,11 @@ class ProjectMaterials(RootManager, CoreFunctions):
         # copy the files and collect returned absolute paths in a list
         absPaths = copier.masterCopy(pathList, targetLocation)
 
+        newEntries = {}
         for item in absPaths:
+            if not item:
+                # failed or cancelled
+                continue
             # build a dictionary
             baseName = os.path.basename(item)
             # niceName = os.path.splitext(baseName)[0]
@@ -1017,6 +991,9 @@ class ProjectMaterials(RootManager, CoreFunctions):
             }
             matDatabaseFile = os.path.join(matDatabaseDir, "%s.json" % niceName)
             self._dumpJson(dictItem, matDatabaseFile)
+            newEntries[niceName] = self._indexEntry(matDatabaseFile, dictItem, time.time())
+        if newEntries:
+            self._updateMaterialsIndex(matDatabaseDir, add=newEntries)
 
     def deleteMaterial(self, dbPath):
 
@@ -1031,24 +1008,111 @@ class ProjectMaterials(RootManager, CoreFunctions):
             os.remove(material_absPath)
 
         os.remove(dbPath)
+        self._updateMaterialsIndex(os.path.dirname(dbPath), remove=[self.niceName(dbPath)])
         return True
 
     def scanMaterials(self, materialType, sortBy="date"):
+        """
+        Lists the materials of the given category from the materials index
+        :param materialType: (String) Material category
+        :param sortBy: (String) "date", "size" or "name"
+        :return: (OrderedDict) {niceName: material database file} in sorted order
+        """
         # materialType = str(materialType)
         subProject = "" if self.currentSubIndex == 0 else self.subProject
         # matDatabaseDir = os.path.join(self._pathsDict["databaseDir"], materialType, subProject, dateDir)
         searchDir = os.path.join(self._pathsDict["databaseDir"], materialType, subProject)
 
-        dbFiles = glob(os.path.join(searchDir, '*.json'))
+        self.materialsIndex = self._loadMaterialsIndex(searchDir)
+        names = list(self.materialsIndex.keys())
         if sortBy == "date":
-            dbFiles.sort(key=os.path.getmtime)
+            names.sort(key=lambda name: self.materialsIndex[name]["entryTime"])
         elif sortBy == "size":
-            dbFiles.sort(key=os.path.getsize)
+            names.sort(key=lambda name: self.materialsIndex[name]["size"])
         elif sortBy == "name":
-            dbFiles.sort()
-        self.materialsInCategory = {self.niceName(file): file for file in glob(os.path.join(searchDir, '*.json'))}
+            names.sort()
+        self.materialsInCategory = OrderedDict(
+            (name, os.path.join(searchDir, self.materialsIndex[name]["dbFile"])) for name in names)
         return self.materialsInCategory
 
+    def _materialSize(self, absPath):
+        """Returns the total size of the material file or folder in bytes"""
+        if not os.path.isdir(absPath):
+            try:
+                return os.path.getsize(absPath)
+            except OSError:
+                return 0
+        total = 0
+        for path, dirs, files in os.walk(absPath):
+            for fileName in files:
+                try:
+                    total += os.path.getsize(os.path.join(path, fileName))
+                except OSError:
+                    pass
+        return total
+
+    def _indexEntry(self, dbFile, dictItem, entryTime):
+        """Builds the materials index entry of the given material database file"""
+        absPath = os.path.join(self._pathsDict["projectDir"], dictItem["relativePath"].replace("\\", "/"))
+        return {"dbFile": os.path.basename(dbFile),
+                "relativePath": dictItem["relativePath"],
+                "size": self._materialSize(absPath),
+                "entryTime": entryTime}
+
+    def _loadMaterialsIndex(self, searchDir, pending=None):
+        """
+        Returns the materials index of the category folder as {niceName: entry}
+        Index is checked against a single listing of the folder. Database files which are missing
+        in the index (eg. saved by an older version) are read once and added.
+        :param pending: (Dictionary) entries which are about to be added. These are not read from the disk
+        """
+        pending = pending or {}
+        indexFile = os.path.join(searchDir, MATERIALS_INDEX)
+        index = {}
+        if os.path.isfile(indexFile):
+            try:
+                index = self._loadJson(indexFile) or {}
+            except Exception:
+                # corrupted index is built again from the database files
+                index = {}
+        try:
+            dbFiles = dict((self.niceName(fileName), fileName) for fileName in os.listdir(searchDir)
+                           if fileName.endswith(".json") and not fileName.startswith("."))
+        except OSError:
+            return {}
+
+        changed = False
+        for name in list(index.keys()):
+            if name not in dbFiles:
+                # deleted in the meantime
+                del index[name]
+                changed = True
+        for name, fileName in dbFiles.items():
+            if name in index or name in pending:
+                continue
+            dbFile = os.path.join(searchDir, fileName)
+            try:
+                with open(dbFile, "r") as f:
+                    dictItem = json.load(f)
+                entryTime = os.path.getmtime(dbFile)
+            except (IOError, OSError, ValueError):
+                logger.warning("Corrupted material database file => %s" % dbFile)
+                continue
+            index[name] = self._indexEntry(dbFile, dictItem, entryTime)
+            changed = True
+        if changed:
+            self._dumpJson(index, indexFile)
+        return index
+
+    def _updateMaterialsIndex(self, searchDir, add=None, remove=None):
+        """Adds and removes the given entries in the materials index of the category folder"""
+        index = self._loadMaterialsIndex(searchDir, pending=add)
+        for name in remove or []:
+            index.pop(name, None)
+        index.update(add or {})
+        self._dumpJson(index, os.path.join(searchDir, MATERIALS_INDEX))
+        return index
+
     def execute(self):
         if not self.currentMaterialInfo:
             msg = "No material selected"
@@ -1586,7 +1650,7 @@ class MainUI(QtWidgets.QMainWindow):
 
         treewidget.clear()
         for x in materials.items():
-            timestamp = os.path.getmtime(x[1])
+            timestamp = self.promat.materialsIndex[x[0]]["entryTime"]
             timestampFormatted = datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
             item = QtWidgets.QTreeWidgetItem(treewidget, [x[0], str(timestampFormatted)])
         # sort by date default
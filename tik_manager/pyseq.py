@@ -35,6 +35,8 @@
 # Modification History:
     # added filtering to the 'walk method'
     # minor optimizations considering it will only work as a module for imageViewer
+    # slotted Item class and CompactSequence for very large scans
+    # CompactSequence.from_frames for rebuilding cached sequences
 # -----------------------------------------------------------------------------
 
 """PySeq is a python module that finds groups of items that follow a naming
@@ -57,6 +59,8 @@ Docs and latest version available for download at
 
 import os
 import re
+import sys
+from array import array
 import logging
 import warnings
 import functools
@@ -85,8 +89,8 @@ format_re = re.compile(r'%(?P<pad>\d+)?(?P<var>\w+)')
 range_join = os.environ.get('PYSEQ_RANGE_SEP', ', ')
 
 __all__ = [
-    'SequenceError', 'FormatError', 'Item', 'Sequence', 'diff', 'uncompress',
-    'getSequences', 'get_sequences', 'walk'
+    'SequenceError', 'FormatError', 'Item', 'Sequence', 'CompactSequence',
+    'diff', 'uncompress', 'getSequences', 'get_sequences', 'walk'
 ]
 
 # logging handlers
@@ -111,6 +115,16 @@ else:
     bytes = str
     basestring = basestring
 
+# directory iterator of python 3.5+ or its backport. walk uses os.listdir if
+# none is available
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
 
 def _natural_key(x):
     """ Splits a string into characters and digits.  This helps in sorting file
@@ -142,6 +156,22 @@ def natural_sort(items):
     return sorted(items, key=_natural_key)
 
 
+try:
+    _intern = sys.intern
+except AttributeError:  # python 2.7
+    _intern = intern
+
+
+def _shared(text):
+    """Returns the interned copy of the string, so that the items living in
+    the same directory share one directory name instead of a copy each.
+    """
+    try:
+        return _intern(text)
+    except TypeError:  # unicode strings cannot be interned in python 2.7
+        return text
+
+
 class SequenceError(Exception):
     """Special exception for Sequence errors
     """
@@ -172,18 +202,46 @@ class Item(str):
 
     :param item: Path to file.
     """
-
-    def __init__(self, item):
+    # no per instance __dict__. Walking render outputs creates millions of
+    # items. Other attributes are looked up on the source item (__getattr__)
+    # python 2.7 does not support __slots__ on str subclasses
+    if sys.version_info[0] > 2:
+        __slots__ = ('item', 'frame', 'head', 'tail', 'pad', '__path',
+                     '__dirname', '__filename', '__digits', '__parts',
+                     '__stat')
+
+    def __new__(cls, item, stat=None):
+        return super(Item, cls).__new__(cls, item)
+
+    def __init__(self, item, stat=None):
+        """
+        :param item: Path to file.
+        :param stat: os.stat result of the file if it is already known (eg.
+                     from os.scandir). Saves a stat call for size and mtime.
+        """
         super(Item, self).__init__()
         log.debug('adding %s', item)
-        self.item = item
-        self.__path = getattr(item, 'path', None)
-        if self.__path is None:
-            self.__path = os.path.abspath(str(item))
-        self.__dirname, self.__filename = os.path.split(self.__path)
-        self.__digits = digits_re.findall(self.name)
-        self.__parts = digits_re.split(self.name)
-        self.__stat = None
+        if type(item) is Item:
+            # re-wrapping an item, reuse what is already parsed
+            self.item = item.item
+            self.__path = item.path
+            self.__dirname = item.dirname
+            self.__filename = item.name
+            self.__digits = item._Item__digits
+            self.__parts = item._Item__parts
+            self.__stat = item._Item__stat
+        else:
+            self.item = item
+            path = getattr(item, 'path', None)
+            if path is None:
+                path = os.path.abspath(str(item))
+            dirname, self.__filename = os.path.split(path)
+            self.__dirname = _shared(dirname)
+            self.__path = path
+            # parsed on first use
+            self.__digits = None
+            self.__parts = None
+            self.__stat = stat
 
         # modified by self.is_sibling()
         self.frame = None
@@ -216,6 +274,9 @@ class Item(str):
         return '<pyseq.Item "%s">' % self.name
 
     def __getattr__(self, key):
+        if key == 'item':
+            # not set yet (eg. while unpickling)
+            raise AttributeError(key)
         return getattr(self.item, key)
 
     @property
@@ -240,12 +301,16 @@ class Item(str):
     def digits(self):
         """Numerical components of item name.
         """
+        if self.__digits is None:
+            self.__digits = digits_re.findall(self.__filename)
         return self.__digits
 
     @property
     def parts(self):
         """Non-numerical components of item name
         """
+        if self.__parts is None:
+            self.__parts = digits_re.split(self.__filename)
         return self.__parts
 
     @property
@@ -320,15 +385,15 @@ class Sequence(list):
         file.1-3.jpg
         >>> s.append('file.0006.jpg')
         >>> print(s.format('%4l %h%p%t %R'))
-           4 file.%04d.jpg 1-3 6
+           4 file.%04d.jpg [1-3, 6]
         >>> s.includes('file.0009.jpg')
         True
         >>> s.includes('file.0009.pic')
         False
         >>> s.contains('file.0006.jpg')
-        False
+        True
         >>> print(s.format('%h%p%t %r (%R)'))
-        file.%04d.jpg 1-6 (1-3 6)
+        file.%04d.jpg 1-6 ([1-3, 6])
     """
 
     def __init__(self, items):
@@ -646,6 +711,16 @@ class Sequence(list):
         else:
             raise SequenceError('Item is not a member of this sequence')
 
+    def _append_member(self, item):
+        """Adds an item which is already tested with includes(), without
+        testing it again.
+
+        :param item: pyseq.Item object.
+        """
+        super(Sequence, self).append(item)
+        self.__frames = None
+        self.__missing = None
+
     def insert(self, index, item):
         """ Add another member to the sequence at the given index.
             :param item: pyseq.Item object.
@@ -682,7 +757,7 @@ class Sequence(list):
     def reIndex(self, offset, padding=None):
         """Renames and reindexes the items in the sequence, e.g. ::
 
-            >>> seq.reIndex(offset=100)
+            >>> seq.reIndex(offset=100)  # doctest: +SKIP
 
         will add a 100 frame offset to each Item in `seq`, and rename
         the files on disk.
@@ -791,16 +866,199 @@ class Sequence(list):
         return sorted(list(set(frames).symmetric_difference(r)))
 
 
+class CompactSequence(Sequence):
+    """Sequence which keeps its frame numbers in an integer array instead of
+    a list of Item objects. Only the first item is stored, the other items are
+    created when they are accessed. Meant for scans with millions of frames.
+    Item objects have __slots__ only on python 3. On python 2.7 the saving
+    comes from the frame array alone.
+
+    For example:
+
+        >>> s = CompactSequence(['file.0001.jpg', 'file.0002.jpg', 'file.0004.jpg'])
+        >>> print(s.format('%h%p%t %R'))
+        file.%04d.jpg [1-2, 4]
+        >>> len(s)
+        3
+        >>> s[-1]
+        <pyseq.Item "file.0004.jpg">
+        >>> s.append('file.0005.jpg')
+        >>> print(s)
+        file.1-5.jpg
+    """
+
+    def __init__(self, items):
+        """
+        Create a new CompactSequence class object.
+
+        :param: items: Sequence instance or sequential list of items.
+
+        :return: pyseq.CompactSequence class instance.
+        """
+        if not isinstance(items, Sequence):
+            items = Sequence(items)
+        first = items[0]
+        for item in items:
+            if not self._fits(first, item) or (len(items) > 1 and item.frame is None):
+                raise SequenceError("Item (%s) does not share the head, tail "
+                                    "and padding of the sequence." % item)
+        # base state from the first item only. Nothing is appended, so the
+        # frame array is not needed yet
+        self.__count = 1
+        super(CompactSequence, self).__init__([first])
+        # the base wraps it again, keep the parsed head, tail and padding
+        list.__setitem__(self, 0, first)
+        self.__count = len(items)
+        if first.frame is None:
+            self.__frameArray = array('l')
+        else:
+            self.__frameArray = array('l', (i.frame for i in items))
+
+    @classmethod
+    def from_frames(cls, dirname, head, pad, tail, frames):
+        """Creates the sequence from its frame numbers, without parsing the
+        item names. Counterpart of a (head, pad, tail, frames) record kept
+        in a cache.
+
+            >>> s = CompactSequence.from_frames('.', 'file.', 4, '.jpg', [1, 2, 4])
+            >>> print(s.format('%h%p%t %R'))
+            file.%04d.jpg [1-2, 4]
+
+        :return: pyseq.CompactSequence class instance.
+        """
+        seq = cls([os.path.join(dirname, '%s%0*d%s' % (head, pad, frames[0], tail))])
+        first = list.__getitem__(seq, 0)
+        first.frame = frames[0]
+        first.pad = pad
+        first.head = head
+        first.tail = tail
+        seq.__frameArray = array('l', frames)
+        seq.__count = len(frames)
+        return seq
+
+    @staticmethod
+    def _fits(first, item):
+        """Returns True if the item can be rebuilt from its frame number"""
+        return (item.head, item.tail, item.pad) == (first.head, first.tail, first.pad)
+
+    def __len__(self):
+        return self.__count
+
+    def __iter__(self):
+        for index in range(self.__count):
+            yield self.__item(index)
+
+    def __reversed__(self):
+        for index in range(self.__count - 1, -1, -1):
+            yield self.__item(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.__item(i) for i in range(*index.indices(self.__count))]
+        if index < 0:
+            index += self.__count
+        if not 0 <= index < self.__count:
+            raise IndexError("sequence index out of range")
+        return self.__item(index)
+
+    def __getslice__(self, start, end):
+        # python 2.7 calls this for simple slices
+        return self.__getitem__(slice(start, end))
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __item(self, index):
+        """Creates the Item object at the given index"""
+        first = list.__getitem__(self, 0)
+        if index == 0:
+            return first
+        frame = self.__frameArray[index]
+        name = '%s%0*d%s' % (first.head, first.pad, frame, first.tail)
+        item = Item(os.path.join(first.dirname, name))
+        item.frame = frame
+        item.pad = first.pad
+        item.head = first.head
+        item.tail = first.tail
+        return item
+
+    def __setitem__(self, index, item):
+        raise SequenceError("CompactSequence items cannot be replaced. "
+                            "Use expand() first.")
+
+    def __setslice__(self, start, end, item):
+        raise SequenceError("CompactSequence items cannot be replaced. "
+                            "Use expand() first.")
+
+    def insert(self, index, item):
+        raise SequenceError("CompactSequence items cannot be inserted. "
+                            "Use expand() first.")
+
+    def append(self, item):
+        """Adds another member to the sequence.
+
+        :param item: pyseq.Item object.
+
+        :exc:`SequenceError` raised if item is not a sequence member.
+        """
+        if type(item) is not Item:
+            item = Item(item)
+
+        if not self.includes(item):
+            raise SequenceError('Item is not a member of this sequence')
+        first = list.__getitem__(self, 0)
+        if not self._fits(first, item) or item.frame is None:
+            raise SequenceError("Item (%s) does not share the head, tail and "
+                                "padding of the sequence. Use expand() first."
+                                % item)
+        if not self.__frameArray:
+            # frame of the first item is known only after it found a sibling
+            self.__frameArray.append(first.frame)
+        self.__frameArray.append(item.frame)
+        self.__count += 1
+
+    def extend(self, items):
+        """ Add members to the sequence.
+            :param items: list of pyseq.Item objects.
+            :exc: `SequenceError` raised if any items are not a sequence
+                  member.
+        """
+        for item in items:
+            self.append(item)
+
+    def reIndex(self, offset, padding=None):
+        """Renames and reindexes the items in the sequence. See
+        Sequence.reIndex
+        """
+        seq = self.expand()
+        seq.reIndex(offset, padding=padding)
+        self.__init__(seq)
+
+    def expand(self):
+        """:return: regular Sequence holding Item objects."""
+        return Sequence(list(self))
+
+    def _get_frames(self):
+        """finds the sequence indexes from item names
+        """
+        return list(self.__frameArray)
+
+
 def diff(f1, f2):
     """Examines diffs between f1 and f2 and deduces numerical sequence number.
 
     For example ::
 
         >>> diff('file01_0040.rgb', 'file01_0041.rgb')
-        [{'frames': ('0040', '0041'), 'start': 7, 'end': 11}]
+        [{'start': 7, 'end': 11, 'frames': ('0040', '0041')}]
 
         >>> diff('file3.03.rgb', 'file4.03.rgb')
-        [{'frames': ('3', '4'), 'start': 4, 'end': 5}]
+        [{'start': 4, 'end': 5, 'frames': ('3', '4')}]
 
     :param f1: pyseq.Item object.
     :param f2: pyseq.Item object, for comparison.
@@ -999,7 +1257,7 @@ def getSequences(source):
     return get_sequences(source)
 
 
-def get_sequences(source):
+def get_sequences(source, compact=False):
     """Returns a list of Sequence objects given a directory or list that contain
     sequential members.
 
@@ -1018,9 +1276,12 @@ def get_sequences(source):
         bnc01_TinkSO_tx_1_ty_1.101-105.tif
         file.1-2.tif
         file.info.03.rgb
+        file01.1-4.j2k
         file01_40-43.rgb
         file02_44-47.rgb
         file1-4.03.rgb
+        fileA.1-3.jpg
+        fileA.1-3.png
         file_02.tif
         z1_001_v1.1-4.png
         z1_002_v1.1-4.png
@@ -1036,11 +1297,13 @@ def get_sequences(source):
 
     Get sequences from a list of objects, preserving object attrs:
 
-        >>> seqs = get_sequences(repo.files())
-        >>> seqs[0].date
+        >>> seqs = get_sequences(repo.files())  # doctest: +SKIP
+        >>> seqs[0].date  # doctest: +SKIP
         datetime.datetime(2011, 3, 21, 17, 31, 24)
 
     :param source: Can be directory path, list of strings, or sortable list of objects.
+    :param compact: return pyseq.CompactSequence objects which keep the frame
+                    numbers instead of the items.
 
     :return: List of pyseq.Sequence class objects.
     """
@@ -1067,18 +1330,33 @@ def get_sequences(source):
 
     log.debug('Found %s files' % len(items))
 
+    # sequences keyed by the non-numerical parts of their items. Siblings always
+    # share the same parts, so an item is only tested against the sequences in
+    # its own group, newest first, which gives the same result as testing all
+    groups = {}
+
     # organize the items into sequences
-    while items:
-        item = Item(items.pop(0))
+    for item in items:
+        item = Item(item)
+        candidates = groups.setdefault(tuple(item.parts), [])
         found = False
-        for seq in seqs[::-1]:
+        for seq in reversed(candidates):
             if seq.includes(item):
-                seq.append(item)
+                seq._append_member(item)
                 found = True
                 break
         if not found:
             seq = Sequence([item])
             seqs.append(seq)
+            candidates.append(seq)
+
+    if compact:
+        for index, seq in enumerate(seqs):
+            try:
+                seqs[index] = CompactSequence(seq)
+            except SequenceError:
+                # members with a different frame position. Keep the items
+                pass
 
     log.debug('time: %s' % (datetime.now() - start))
 
@@ -1164,7 +1442,55 @@ def iget_sequences(source):
     log.debug("time: %s", datetime.now() - start)
 
 
-def walk(source, level=-1, topdown=True, onerror=None, followlinks=False, hidden=False, includes=()):
+def _list_dir(path, hidden, include_re):
+    """Lists the given directory in one pass.
+
+    :return: (sub directory names, names of the symlinked ones, matching
+             files as pyseq.Item objects)
+    """
+    dirs = []
+    links = set()
+    files = []
+    # stat data of the listing is free on windows only. Elsewhere DirEntry.stat
+    # is a syscall of its own, so leave it to the items
+    keep_stat = os.name == 'nt'
+    if scandir is not None:
+        for entry in scandir(path):
+            name = entry.name
+            if not hidden and name[0] == '.':
+                continue
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                dirs.append(name)
+                if entry.is_symlink():
+                    links.add(name)
+            elif include_re.match(name):
+                stat = None
+                if keep_stat:
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        pass
+                files.append(Item(entry.path, stat=stat))
+    else:
+        for name in os.listdir(path):
+            if not hidden and name[0] == '.':
+                continue
+            full_path = os.path.join(path, name)
+            if os.path.isdir(full_path):
+                dirs.append(name)
+                if os.path.islink(full_path):
+                    links.add(name)
+            elif include_re.match(name):
+                files.append(Item(full_path))
+    return dirs, links, files
+
+
+def walk(source, level=-1, topdown=True, onerror=None, followlinks=False, hidden=False, includes=(), compact=False,
+         workers=0):
     """Generator that traverses a directory structure starting at
     source looking for sequences.
 
@@ -1175,34 +1501,68 @@ def walk(source, level=-1, topdown=True, onerror=None, followlinks=False, hidden
     :param onerror: callable to handle os.listdir errors
     :param followlinks: whether to follow links
     :param hidden: include hidden files and dirs
+    :param compact: yield pyseq.CompactSequence objects
+    :param workers: if > 0, sub directories are listed ahead by that many
+                    threads. Pays off on network drives
 
     Args:
         includes: (List) List of extensions to filter down
     """
-    # transform glob patterns to regular expressions
-    includes = r'|'.join([fnmatch.translate(x) for x in includes])
+    # transform glob patterns to a single regular expression
+    include_re = re.compile(r'|'.join([fnmatch.translate(x) for x in includes]))
     start = datetime.now()
     assert isinstance(source, basestring) is True
     assert os.path.exists(source) is True
     source = os.path.abspath(source)
 
-    for root, dirs, files in os.walk(source, topdown, onerror, followlinks):
+    pool = None
+    if workers > 0:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(workers)
 
-        if not hidden:
-            files = [f for f in files if not f[0] == '.']
-            dirs[:] = [d for d in dirs if not d[0] == '.']
+    def request(path):
+        """Starts listing the path on the pool. None if there is no pool"""
+        if pool is None:
+            return None
+        return pool.apply_async(_list_dir, (path, hidden, include_re))
 
-        files = [os.path.join(root, f) for f in files if re.match(includes,f)]
-        # files = [f for f in files if re.match(includes, f)]
-        ##
+    def walk_dir(root, depth, pending):
+        try:
+            if pending is None:
+                dirs, links, files = _list_dir(root, hidden, include_re)
+            else:
+                dirs, links, files = pending.get()
+        except OSError as err:
+            if onerror is not None:
+                onerror(err)
+            return
 
         if topdown is True:
-            parts = root.replace(source, "").split(os.sep)
-            while "" in parts:
-                parts.remove("")
-            if len(parts) == level - 1:
+            if depth == level - 1:
                 del dirs[:]
+            # list the siblings while the caller works on this one
+            requests = dict((d, request(os.path.join(root, d))) for d in dirs)
+            yield root, dirs, get_sequences(files, compact=compact)
+        else:
+            requests = {}
+
+        # dirs may be modified by the caller
+        for d in dirs:
+            if not followlinks and d in links:
+                continue
+            path = os.path.join(root, d)
+            pending = requests[d] if d in requests else request(path)
+            for result in walk_dir(path, depth + 1, pending):
+                yield result
+
+        if topdown is not True:
+            yield root, dirs, get_sequences(files, compact=compact)
 
-        yield root, dirs, get_sequences(files)
+    try:
+        for result in walk_dir(source, 0, request(source)):
+            yield result
+    finally:
+        if pool is not None:
+            pool.terminate()
 
     log.debug('time: %s' % (datetime.now() - start))
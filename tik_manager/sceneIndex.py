@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------------------------
+# Copyright (c) 2017-2018, Arda Kutlu (ardakutlu@gmail.com)
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#  - Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+#  - Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+#  - Neither the name of the software nor the names of its contributors
+#    may be used to endorse or promote products derived from this software
+#    without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+"""
+Persistent index of the base scene database files.
+
+The index is a single sqlite file in the local user settings folder (eg. ~/TikManager/sceneIndex.db),
+since sqlite locking is not reliable on network shares. Rows are keyed by absolute paths, so one file
+serves every project. Every row holds the header fields of one base scene json together with the
+(mtime, size) stamp of the file at the time it is read. Folder listings are stamped with the folder
+mtime, so an unchanged category is answered without touching the share. Files and folders modified
+within the RACY_WINDOW are stored without a valid stamp and read again on the next request.
+
+Content digests of the scene files are kept in a separate table, stamped with the (mtime, size) of
+the hashed file, so that a reference check does not read the same unchanged file again.
+
+The json files always stay as the master data. The index is only a cache and can be deleted at
+any time.
+"""
+
+import os
+import time
+import json
+import logging
+
+from tik_manager.sqliteCache import SqliteCache, sqlite3, RACY_WINDOW
+
+__author__ = "Arda Kutlu"
+__copyright__ = "Copyright 2018, Tik Manager Scene Index"
+__credits__ = []
+__license__ = "GPL"
+__maintainer__ = "Arda Kutlu"
+__email__ = "ardakutlu@gmail.com"
+__status__ = "Development"
+
+logging.basicConfig()
+logger = logging.getLogger('sceneIndex')
+logger.setLevel(logging.WARNING)
+
+# bump this when the table layout changes. Older index files will be rebuilt
+SCHEMA_VERSION = 2
+
+
+class SceneIndex(SqliteCache):
+    """Sqlite backed index of the base scene database files"""
+    label = "Scene index"
+    schemaVersion = SCHEMA_VERSION
+    tables = ("folders", "scenes", "digests")
+    schema = """
+        CREATE TABLE folders (path TEXT PRIMARY KEY, mtime REAL);
+        CREATE TABLE scenes (path TEXT PRIMARY KEY,
+                             folder TEXT,
+                             name TEXT,
+                             category TEXT,
+                             subProject TEXT,
+                             creator TEXT,
+                             referenceFile TEXT,
+                             referencedVersion INTEGER,
+                             versionCount INTEGER,
+                             mtime REAL,
+                             size INTEGER,
+                             data TEXT);
+        CREATE INDEX scenes_folder ON scenes (folder);
+        CREATE TABLE digests (path TEXT PRIMARY KEY, mtime REAL, size INTEGER, algorithm TEXT, hash TEXT);
+        """
+
+    def _record(self, jsonFile, folder, stat, data):
+        """Returns the row tuple for the given scene data"""
+        if data:
+            row = (data.get("Name"),
+                   data.get("Category"),
+                   data.get("SubProject"),
+                   data.get("Creator"),
+                   data.get("ReferenceFile"),
+                   data.get("ReferencedVersion"),
+                   len(data.get("Versions", [])),
+                   json.dumps(data))
+        else: # unreadable file. Keep it listed, it will be read again on request
+            row = (None, None, None, None, None, None, None, None)
+        mtime = stat.st_mtime if time.time() - stat.st_mtime >= RACY_WINDOW else -1
+        return (jsonFile, folder) + row[:-1] + (mtime, stat.st_size, row[-1])
+
+    def scanFolder(self, searchDir, loader):
+        """
+        Returns the base scene database files in the given folder as {niceName: absolutePath}
+        Only the entries whose mtime or size are changed will be read again with the loader.
+        :param searchDir: (String) absolute path of the category or sub-project database folder
+        :param loader: (Function) reads and returns the json data of the given file
+        :return: (Dictionary) or None if the index is not usable
+        """
+        if not self.enabled:
+            return None
+        try:
+            folderMtime = os.stat(searchDir).st_mtime
+            connection = self._connect()
+            row = connection.execute("SELECT mtime FROM folders WHERE path=?", (searchDir,)).fetchone()
+            if row and row[0] == folderMtime:
+                return dict((os.path.splitext(os.path.basename(path))[0], path) for (path,) in
+                            connection.execute("SELECT path FROM scenes WHERE folder=?", (searchDir,)))
+
+            fileNames = os.listdir(searchDir)
+            stamps = dict((path, (mtime, size)) for path, mtime, size in
+                          connection.execute("SELECT path, mtime, size FROM scenes WHERE folder=?", (searchDir,)))
+            baseScenes = {}
+            for fileName in fileNames:
+                # same rules with the glob pattern *.json
+                if fileName.startswith(".") or not fileName.endswith(".json"):
+                    continue
+                jsonFile = os.path.join(searchDir, fileName)
+                try:
+                    stat = os.stat(jsonFile)
+                except OSError: # deleted in the meantime
+                    continue
+                baseScenes[os.path.splitext(fileName)[0]] = jsonFile
+                if stamps.pop(jsonFile, None) == (stat.st_mtime, stat.st_size):
+                    continue
+                try:
+                    data = loader(jsonFile)
+                except Exception:
+                    data = None
+                connection.execute("INSERT OR REPLACE INTO scenes VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+                                   self._record(jsonFile, searchDir, stat, data))
+            # whatever left in stamps is deleted from the disk
+            connection.executemany("DELETE FROM scenes WHERE path=?", [(path,) for path in stamps])
+            if time.time() - folderMtime < RACY_WINDOW:
+                folderMtime = -1
+            connection.execute("INSERT OR REPLACE INTO folders VALUES (?,?)", (searchDir, folderMtime))
+            connection.commit()
+            return baseScenes
+        except OSError:
+            # problem is on the folder itself, not on the index
+            return None
+        except sqlite3.Error as e:
+            self._disable(e)
+            return None
+
+    def getSceneInfo(self, jsonFile, loader):
+        """
+        Returns the scene data of the given database file. The stored data is validated against the
+        mtime and size of the file and read again with the loader if it is outdated.
+        Loader errors (missing or corrupted files) are passed to the caller as they are.
+        :param jsonFile: (String) absolute path of the base scene database file
+        :param loader: (Function) reads and returns the json data of the given file
+        :return: (Dictionary)
+        """
+        if not self.enabled:
+            return loader(jsonFile)
+        jsonFile = os.path.normpath(jsonFile)
+        try:
+            stat = os.stat(jsonFile)
+        except OSError:
+            return loader(jsonFile)
+        try:
+            connection = self._connect()
+            row = connection.execute("SELECT mtime, size, data FROM scenes WHERE path=?", (jsonFile,)).fetchone()
+            if row and row[2] and (row[0], row[1]) == (stat.st_mtime, stat.st_size):
+                return json.loads(row[2])
+        except sqlite3.Error as e:
+            self._disable(e)
+            return loader(jsonFile)
+
+        data = loader(jsonFile)
+        try:
+            connection.execute("INSERT OR REPLACE INTO scenes VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+                               self._record(jsonFile, os.path.dirname(jsonFile), stat, data))
+            connection.commit()
+        except sqlite3.Error as e:
+            self._disable(e)
+        return data
+
+    def discard(self, jsonFile):
+        """Removes the given file from the index. Next request will read it from the disk"""
+        if not self.enabled:
+            return
+        jsonFile = os.path.normpath(jsonFile)
+        try:
+            connection = self._connect()
+            connection.execute("DELETE FROM scenes WHERE path=?", (jsonFile,))
+            connection.execute("DELETE FROM folders WHERE path=?", (os.path.dirname(jsonFile),))
+            connection.commit()
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def getDigest(self, filePath, stat, algorithm):
+        """
+        Returns the stored digest of the file if it is hashed with the same (mtime, size) stamp
+        :param filePath: (String) absolute path of the file
+        :param stat: (os.stat_result) current stat of the file
+        :param algorithm: (String) hashlib name of the digest
+        :return: (String) hex digest or None
+        """
+        if not self.enabled:
+            return None
+        try:
+            row = self._connect().execute("SELECT mtime, size, algorithm, hash FROM digests WHERE path=?",
+                                          (os.path.normpath(filePath),)).fetchone()
+        except sqlite3.Error as e:
+            self._disable(e)
+            return None
+        if row and row[0] != -1 and (row[0], row[1], row[2]) == (stat.st_mtime, stat.st_size, algorithm):
+            return row[3]
+        return None
+
+    def setDigests(self, records):
+        """
+        Stores the digests of the files. Files modified within the RACY_WINDOW are stored without a valid
+        stamp like the scenes, they are hashed again on the next request.
+        :param records: (List) (filePath, mtime, size, algorithm, hexDigest) tuples
+        :return: None
+        """
+        if not self.enabled or not records:
+            return
+        now = time.time()
+        rows = [(os.path.normpath(filePath), mtime if now - mtime >= RACY_WINDOW else -1, size, algorithm, digest)
+                for filePath, mtime, size, algorithm, digest in records]
+        try:
+            connection = self._connect()
+            connection.executemany("INSERT OR REPLACE INTO digests VALUES (?,?,?,?,?)", rows)
+            connection.commit()
+        except sqlite3.Error as e:
+            self._disable(e)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------------------------
+# Copyright (c) 2017-2018, Arda Kutlu (ardakutlu@gmail.com)
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#  - Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+#  - Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+#  - Neither the name of the software nor the names of its contributors
+#    may be used to endorse or promote products derived from this software
+#    without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+
+"""
+Persistent per directory cache of the image sequences for the Image Viewer.
+
+The cache is a single sqlite file in the local user settings folder (eg. ~/TikManager/sequenceCache.db).
+Every row holds the sub folders and the pyseq grouping of all files of one folder, stamped with the
+folder mtime. Adding, removing or renaming files changes the folder mtime, so an unchanged folder is
+answered with a single stat call.
+
+Extension filters are applied over the cached grouping. The cache is capped in size and the least
+recently used folders are dropped first. It can be deleted at any time.
+"""
+
+import os
+import re
+import time
+import json
+import fnmatch
+import logging
+
+import tik_manager.pyseq as seq
+from tik_manager.sqliteCache import SqliteCache, sqlite3, RACY_WINDOW
+
+__author__ = "Arda Kutlu"
+__copyright__ = "Copyright 2018, Tik Manager Sequence Cache"
+__credits__ = []
+__license__ = "GPL"
+__maintainer__ = "Arda Kutlu"
+__email__ = "ardakutlu@gmail.com"
+__status__ = "Development"
+
+logging.basicConfig()
+logger = logging.getLogger('sequenceCache')
+logger.setLevel(logging.WARNING)
+
+# bump this when the table layout or the record format changes. Older cache files will be rebuilt
+SCHEMA_VERSION = 1
+
+# total size of the stored records in bytes
+MAX_SIZE = 64 * 1024 * 1024
+
+# empty pattern matches every file name
+ALL_FILES = re.compile(r'')
+
+
+def _listFolder(path, cachedMtime):
+    """
+    Lists and groups the given folder unless its mtime is the same with the cached one
+    :param path: (String) absolute folder path
+    :param cachedMtime: (Float) mtime of the cached record or None
+    :return: (Tuple) (mtime, record). Record is None if the cached one is still valid
+    """
+    mtime = os.stat(path).st_mtime
+    if mtime == cachedMtime:
+        return mtime, None
+    # same listing with pyseq.walk without any include pattern
+    dirs, links, files = seq._list_dir(path, False, ALL_FILES)
+    sequences = []
+    for sequence in seq.get_sequences(files, compact=True):
+        first = sequence[0]
+        if isinstance(sequence, seq.CompactSequence) and first.frame is not None:
+            sequences.append({"h": first.head, "p": first.pad, "t": first.tail, "f": sequence.frames()})
+        else:
+            sequences.append({"n": [item.name for item in sequence]})
+    return mtime, {"dirs": dirs, "links": list(links), "sequences": sequences}
+
+
+class SequenceCache(SqliteCache):
+    """Sqlite backed cache of the sequences per folder"""
+    label = "Sequence cache"
+    schemaVersion = SCHEMA_VERSION
+    tables = ("folders",)
+    schema = """
+        CREATE TABLE folders (path TEXT PRIMARY KEY,
+                              mtime REAL,
+                              lastUsed REAL,
+                              size INTEGER,
+                              data TEXT);
+        CREATE INDEX folders_lastUsed ON folders (lastUsed);
+        """
+
+    def __init__(self, cacheFile, maxSize=MAX_SIZE):
+        super(SequenceCache, self).__init__(cacheFile)
+        self.maxSize = maxSize
+
+    def _getRecord(self, path):
+        """Returns the cached (mtime, record) of the folder or (None, None)"""
+        if not self.enabled:
+            return None, None
+        try:
+            row = self._connect().execute("SELECT mtime, data FROM folders WHERE path=?", (path,)).fetchone()
+        except sqlite3.Error as e:
+            self._disable(e)
+            return None, None
+        if not row:
+            return None, None
+        return row[0], row[1]
+
+    def _store(self, path, mtime, data):
+        if not self.enabled:
+            return
+        if time.time() - mtime < RACY_WINDOW:
+            mtime = -1
+        try:
+            self._connect().execute("INSERT OR REPLACE INTO folders VALUES (?,?,?,?,?)",
+                                    (path, mtime, time.time(), len(data), data))
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def _commit(self, usedPaths):
+        """Stamps the used folders and drops the least recently used ones exceeding the size limit"""
+        if not self.enabled:
+            return
+        try:
+            connection = self._connect()
+            now = time.time()
+            connection.executemany("UPDATE folders SET lastUsed=? WHERE path=?", [(now, p) for p in usedPaths])
+            total = connection.execute("SELECT SUM(size) FROM folders").fetchone()[0] or 0
+            if total > self.maxSize:
+                dropList = []
+                for path, size in connection.execute("SELECT path, size FROM folders ORDER BY lastUsed"):
+                    if total <= self.maxSize:
+                        break
+                    dropList.append((path,))
+                    total -= size
+                connection.executemany("DELETE FROM folders WHERE path=?", dropList)
+            connection.commit()
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def clear(self):
+        """Removes all cached folders"""
+        if not self.enabled:
+            return
+        try:
+            connection = self._connect()
+            connection.execute("DELETE FROM folders")
+            connection.commit()
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    @staticmethod
+    def _buildSequences(root, record, includeRe):
+        """Creates the sequences of the cached record which match the include patterns"""
+        sequences = []
+        for entry in record["sequences"]:
+            if "f" in entry:
+                # members differ only by the frame number. Extension patterns give the same result for all
+                if not includeRe.match("%s%0*d%s" % (entry["h"], entry["p"], entry["f"][0], entry["t"])):
+                    continue
+                sequences.append(seq.CompactSequence.from_frames(root, entry["h"], entry["p"], entry["t"], entry["f"]))
+            else:
+                names = [n for n in entry["n"] if includeRe.match(n)]
+                if names:
+                    sequences.extend(seq.get_sequences([os.path.join(root, n) for n in names], compact=True))
+        return sequences
+
+    def walk(self, source, level=-1, includes=(), followlinks=False, workers=0):
+        """
+        Generator with the same output of pyseq.walk (top down, hidden files excluded).
+        Unchanged folders are served from the cache, others are listed and stored.
+        :param source: (String) folder to traverse
+        :param level: (Integer) if < 0 traverse entire structure otherwise traverse to given depth
+        :param includes: (List) glob patterns of the file names. Matched against the first member of each sequence
+        :param followlinks: (Boolean) whether to follow symlinked folders
+        :param workers: (Integer) if > 0, sub folders are listed ahead by that many threads
+        """
+        includeRe = re.compile(r'|'.join([fnmatch.translate(x) for x in includes]))
+        source = os.path.abspath(source)
+
+        pool = None
+        if workers > 0:
+            from multiprocessing.pool import ThreadPool
+            pool = ThreadPool(workers)
+
+        usedPaths = []
+
+        def request(path):
+            """Starts validating the folder on the pool. The cache itself is only used from this thread"""
+            cachedMtime, cachedData = self._getRecord(path)
+            if pool is None:
+                return path, cachedMtime, cachedData, None
+            return path, cachedMtime, cachedData, pool.apply_async(_listFolder, (path, cachedMtime))
+
+        def walkFolder(pending, depth):
+            root, cachedMtime, cachedData, result = pending
+            try:
+                mtime, record = result.get() if result else _listFolder(root, cachedMtime)
+            except OSError:
+                return
+            if record is None:
+                record = json.loads(cachedData)
+                usedPaths.append(root)
+            else:
+                self._store(root, mtime, json.dumps(record))
+
+            dirs = list(record["dirs"])
+            if depth == level - 1:
+                del dirs[:]
+            # list the siblings while the caller works on this one
+            requests = [request(os.path.join(root, d)) for d in dirs
+                        if followlinks or d not in record["links"]]
+            yield root, dirs, self._buildSequences(root, record, includeRe)
+
+            for pending in requests:
+                # dirs may be modified by the caller
+                if os.path.basename(pending[0]) not in dirs:
+                    continue
+                for result in walkFolder(pending, depth + 1):
+                    yield result
+
+        try:
+            for result in walkFolder(request(source), 0):
+                yield result
+        finally:
+            if pool is not None:
+                pool.terminate()
+            self._commit(usedPaths)
@@ -183,6 +183,11 @@ def nukeSetup(prompt=True):
                 "SmUIRoot.py",
                 "SmNuke.py",
                 "SmRoot.py",
+                "sqliteCache.py",
+                "sceneIndex.py",
+                "sequenceCache.py",
+                "copyEngine.py",
+                "previewQueue.py",
                 "projectMaterials.py",
                 ]
     for file in fileList:
@@ -290,6 +295,11 @@ def mayaSetup(prompt=True):
                 "SmUIRoot.py",
                 "SmMaya.py",
                 "SmRoot.py",
+                "sqliteCache.py",
+                "sceneIndex.py",
+                "sequenceCache.py",
+                "copyEngine.py",
+                "previewQueue.py",
                 "projectMaterials.py",
                 ]
     for file in fileList:
@@ -350,8 +360,7 @@ def mayaSetup(prompt=True):
         "def smUpdate(*args):\n",
         "    try:\n",
         "        from tik_manager import SmMaya\n",
-        "        m = SmMaya.MayaManager()\n",
-        "        m.saveCallback()\n",
+        "        SmMaya.saveCallback()\n",
         "    except:\n",
         "        pass\n",
         "\n",
@@ -594,6 +603,11 @@ def houdiniSetup(prompt=True):
                 "ImageViewer.py",
                 "SmUIRoot.py",
                 "SmRoot.py",
+                "sqliteCache.py",
+                "sceneIndex.py",
+                "sequenceCache.py",
+                "copyEngine.py",
+                "previewQueue.py",
                 "projectMaterials.py",
                 ]
     for file in fileList:
@@ -647,6 +661,7 @@ def houdiniSetup(prompt=True):
         "# start Scene Manager\n",
         "import os\n"
         "import sys\n"
+        "import hou\n"
         "\n"
         "def initFolder(targetFolder):\n"
         "    if targetFolder in sys.path:\n"
@@ -655,7 +670,21 @@ def houdiniSetup(prompt=True):
         "        print ('Path is not valid (%s)' % targetFolder)\n"
         "    sys.path.append(targetFolder)\n"
         "\n"
+        "def smUpdate(eventType):\n"
+        "    if eventType != hou.hipFileEventType.AfterSave:\n"
+        "        return\n"
+        "    try:\n"
+        "        from tik_manager import SmHoudini\n"
+        "        SmHoudini.saveCallback()\n"
+        "    except:\n"
+        "        pass\n"
+        "\n"
         "initFolder('{0}')\n".format((upNetworkDir.replace("\\", "//"))),
+        "# 456.py runs on every scene load, do not stack the callbacks\n"
+        "for cb in hou.hipFile.eventCallbacks():\n"
+        "    if cb.__name__ == 'smUpdate':\n"
+        "        hou.hipFile.removeEventCallback(cb)\n"
+        "hou.hipFile.addEventCallback(smUpdate)\n",
         "# end Scene Manager\n"
     ]
 
@@ -750,6 +779,11 @@ def maxSetup(prompt=True):
                 "ImageViewer.py",
                 "SmUIRoot.py",
                 "SmRoot.py",
+                "sqliteCache.py",
+                "sceneIndex.py",
+                "sequenceCache.py",
+                "copyEngine.py",
+                "previewQueue.py",
                 "Sm3dsMax.py",
                 "projectMaterials.py",
                 "assetLibrary.py",
@@ -846,7 +880,7 @@ python.Execute "import sys"
 python.Execute "import os"
 python.Execute "import MaxPlus"
 python.Execute "sys.path.append(os.path.normpath('{0}'))"
-python.Execute "def smUpdate(*args):\\n    try:\\n        from tik_manager import Sm3dsMax\\n        m = Sm3dsMax.MaxManager()\\n        m.saveCallback()\\n    except:\\n        pass"
+python.Execute "def smUpdate(*args):\\n    try:\\n        from tik_manager import Sm3dsMax\\n        Sm3dsMax.saveCallback()\\n    except:\\n        pass"
 python.Execute "MaxPlus.NotificationManager.Register(14, smUpdate)"
 """.format(upNetworkDir.replace("\\", "//"))
 
@@ -128,8 +128,7 @@ addButton("assetLibrary", command=cmd, icon=icon )
 # def smUpdate(*args):
 #    try:
 #        from tik_manager import SmMaya
-#        m = SmMaya.MayaManager()
-#        m.saveCallback()
+#        SmMaya.saveCallback()
 #    except:
 #        pass
 #
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------------------------
+# Copyright (c) 2017-2018, Arda Kutlu (ardakutlu@gmail.com)
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#  - Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+#  - Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+#  - Neither the name of the software nor the names of its contributors
+#    may be used to endorse or promote products derived from this software
+#    without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+"""
+Common base of the sqlite backed caches (scene index, sequence cache).
+
+Cache files are meant to live in a local folder (eg. ~/TikManager). sqlite locking is not reliable on
+network shares. Each thread gets its own connection, since sqlite connections can not be shared between
+threads. Any sqlite error turns the cache off for the rest of the session and the callers fall back to
+the file system. The cache files can be deleted at any time.
+"""
+
+import threading
+import logging
+
+try:
+    import sqlite3
+except ImportError: # some embedded interpreters ship without sqlite
+    sqlite3 = None
+
+__author__ = "Arda Kutlu"
+__copyright__ = "Copyright 2018, Tik Manager Sqlite Cache"
+__credits__ = []
+__license__ = "GPL"
+__maintainer__ = "Arda Kutlu"
+__email__ = "ardakutlu@gmail.com"
+__status__ = "Development"
+
+logging.basicConfig()
+logger = logging.getLogger('sqliteCache')
+logger.setLevel(logging.WARNING)
+
+# folders modified within this window are not trusted, since a second write
+# inside the same timestamp resolution would go unnoticed
+RACY_WINDOW = 2.0
+
+
+class SqliteCache(object):
+    """Sqlite file with a versioned table layout"""
+    # name used in the log messages
+    label = "Cache"
+    # bump this in the subclass when the table layout changes. Older files will be rebuilt
+    schemaVersion = 1
+    # tables dropped before the schema script runs on an outdated file
+    tables = ()
+    # script creating the tables
+    schema = ""
+
+    def __init__(self, cacheFile):
+        super(SqliteCache, self).__init__()
+        self.cacheFile = cacheFile
+        self._local = threading.local()
+        self.enabled = sqlite3 is not None
+
+    def _connect(self):
+        """Opens the cache file for the current thread and makes sure the tables are up to date"""
+        connection = getattr(self._local, "connection", None)
+        if connection:
+            return connection
+        connection = sqlite3.connect(self.cacheFile, timeout=5)
+        userVersion = connection.execute("PRAGMA user_version").fetchone()[0]
+        if userVersion != self.schemaVersion:
+            connection.executescript("".join("DROP TABLE IF EXISTS %s;" % table for table in self.tables) +
+                                     self.schema +
+                                     "PRAGMA user_version = %s;" % self.schemaVersion)
+            connection.commit()
+        self._local.connection = connection
+        return connection
+
+    def _disable(self, error):
+        """Turns the cache off for the rest of the session"""
+        logger.warning("%s disabled (%s) => %s" % (self.label, error, self.cacheFile))
+        self.enabled = False
+        self.close()
+
+    def close(self):
+        """Closes the connection of the current thread"""
+        connection = getattr(self._local, "connection", None)
+        if connection:
+            try:
+                connection.close()
+            except sqlite3.Error:
+                pass
+        self._local.connection = None